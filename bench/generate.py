@@ -0,0 +1,96 @@
+"""Synthetic Markdown documents for benchmarks
+
+    python -m bench.generate --epics 1000 --tasks 9 --subtasks 10 -o big.md
+
+writes a 100,000-issue document (epics * (1 + tasks * (1 + subtasks))).
+"""
+
+import argparse
+import random
+import sys
+
+WORDS = (
+    'user account session token login password email profile role admin '
+    'request response cache index query page report export import sync '
+    'service client server queue worker retry timeout limit batch stream'
+).split()
+
+STATUSES = (' ', 'x', '>', ' ', ' ')
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def description(rng, lines):
+    """Yield about `lines` lines of Markdown mixing prose, lists, code and links"""
+    written = 0
+    while written < lines:
+        kind = rng.random()
+        if kind < 0.5:
+            block = [sentence(rng)]
+        elif kind < 0.7:
+            block = ['* {}'.format(sentence(rng, 6)) for _ in range(3)]
+        elif kind < 0.8:
+            block = ['See [the {} doc](https://example.com/{}) and **{}**.'.format(
+                rng.choice(WORDS), written, rng.choice(WORDS))]
+        elif kind < 0.9:
+            block = ['```python', '# {}'.format(sentence(rng, 4)), 'def f(x):', '    return x', '```']
+        else:
+            block = ['| Field | Value |', '|-------|-------|', '| {} | {} |'.format(rng.choice(WORDS), written)]
+        for line in block:
+            yield line
+        yield ''
+        written += len(block) + 1
+
+def generate(epics=10, tasks=5, subtasks=3, checklist_items=3, description_lines=6, seed=0):
+    """Yield the lines of a document with the given shape
+
+    Every Task and Sub-task gets `checklist_items` checklist lines; every
+    issue gets roughly `description_lines` lines of description.
+    """
+    rng = random.Random(seed)
+
+    def body():
+        for line in description(rng, description_lines):
+            yield line + '\n'
+
+    def checklist():
+        for item in range(checklist_items):
+            yield '* [{}] {} {}\n'.format(rng.choice(STATUSES), sentence(rng, 5), item)
+
+    for e in range(epics):
+        yield '# Epic {} {}\n\n'.format(e, rng.choice(WORDS))
+        yield from body()
+        for t in range(tasks):
+            yield '## Task {}.{} {}\n\n'.format(e, t, rng.choice(WORDS))
+            yield from body()
+            yield from checklist()
+            for s in range(subtasks):
+                yield '### Sub-task {}.{}.{} {}\n\n'.format(e, t, s, rng.choice(WORDS))
+                yield from body()
+                yield from checklist()
+            yield '\n'
+
+def issue_count(epics, tasks, subtasks):
+    return epics * (1 + tasks * (1 + subtasks))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--epics', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=5, help='Tasks per Epic')
+    parser.add_argument('--subtasks', type=int, default=3, help='Sub-tasks per Task')
+    parser.add_argument('--checklist', type=int, default=3, help='Checklist items per Task and Sub-task')
+    parser.add_argument('--description', type=int, default=6, help='Description lines per issue')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    lines = generate(args.epics, args.tasks, args.subtasks, args.checklist, args.description, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.writelines(lines)
+        print('{}: {} issues'.format(args.output, issue_count(args.epics, args.tasks, args.subtasks)))
+    else:
+        sys.stdout.writelines(lines)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Throughput benchmark for the Markdown -> Jira wiki converter
+
+Converts a large synthetic description (paragraphs, nested lists, tables,
+fenced code, links and emphasis) and reports lines per second, next to the
+per-line, link-only converter md2jira used before src/wiki.py.
+
+    python -m bench.md2wiki [--lines 200000] [--repeat 3]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from src.wiki import md_to_wiki
+
+SNIPPETS = [
+    ['Plain paragraph text describing the work in a sentence or two.'],
+    ['See [the design doc](https://example.com/design) and **the notes**.'],
+    ['#### Details', ''],
+    ['- first item', '  - nested `code` item', '    1. deep ordered item', '- second item'],
+    ['| Field | Type |', '|-------|------|', '| email | ~~string~~ |', '| age | int |'],
+    ['```python', '# not a header', 'def f(x):', '    return x * 2', '```'],
+    ['{code:sql}', 'SELECT * FROM users;', '{code}'],
+    ['> quoted requirement', '---'],
+    ['*As a user*, I want to log in so that I can see my data.'],
+    [''],
+]
+
+def synthetic_lines(count, seed=0):
+    """Return about `count` lines of mixed Markdown"""
+    rng   = random.Random(seed)
+    lines = []
+    while len(lines) < count:
+        lines.extend(rng.choice(SNIPPETS))
+    return lines
+
+def legacy_md2wiki(_str):
+    """The previous converter: rebuilds its table and converts links only, per line"""
+    text_replacements = {
+        'link': {
+            'match': re.compile(r'^(.*)\[([^\]]+)\]\(([^\)]+)\)(.*)$'),
+            'pattern': re.compile(r'\[([^\]]+)\]\(([^)]+)\)'),
+            'replacement': r'[\1|\2]'
+        }
+    }
+    for _token_type, _replacement_info in text_replacements.items():
+        _match, _pattern, _replacement = _replacement_info.values()
+        matches = re.match(_match, _str)
+        if matches is not None:
+            _str = _pattern.sub(_replacement, _str)
+    return _str
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    lines   = synthetic_lines(args.lines)
+    current = best_of(args.repeat, lambda: md_to_wiki(lines))
+    legacy  = best_of(args.repeat, lambda: [legacy_md2wiki(line.strip()) for line in lines])
+
+    print('{:>10} lines'.format(len(lines)))
+    print('md_to_wiki:     {:>12,.0f} lines/s'.format(len(lines) / current))
+    print('legacy md2wiki: {:>12,.0f} lines/s (links only)'.format(len(lines) / legacy))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Memory benchmark for the parsed data model
+
+Parses a generated document into Issues and keeps all of them, as plan
+and apply do, then reports the memory they hold next to the size of the
+text.  The default shape is 100,000 issues with 10 checklist items per
+Task and Sub-task (about 1,000,000 items).
+
+    python -m bench.model [--epics 1000] [--checklist 10] [--description 6]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.generate import generate, issue_count
+from src.md2jira import ChecklistItem, Issue, IssueType, MarkdownParser
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--epics', type=int, default=1000)
+    parser.add_argument('--tasks', type=int, default=9, help='Tasks per Epic')
+    parser.add_argument('--subtasks', type=int, default=10, help='Sub-tasks per Task')
+    parser.add_argument('--checklist', type=int, default=10, help='Checklist items per Task and Sub-task')
+    parser.add_argument('--description', type=int, default=6, help='Description lines per issue')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.md')
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.writelines(generate(args.epics, args.tasks, args.subtasks, args.checklist, args.description))
+        size = os.path.getsize(path)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, encoding='utf-8') as fh:
+            issues = list(MarkdownParser(checklist_enabled=True).iter_issues(fh))
+        seconds        = time.perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    items = sum(len(issue.checklist.items) for issue in issues)
+    assert len(issues) == issue_count(args.epics, args.tasks, args.subtasks)
+    print('{:>12,} issues, {:,} checklist items, {:,.1f} MB of Markdown'.format(len(issues), items, size / 2 ** 20))
+    print('parse:       {:>9.2f} s (traced)'.format(seconds))
+    print('retained:    {:>9,.1f} MB  ({:.2f}x the text)'.format(retained / 2 ** 20, retained / size))
+    print('peak:        {:>9,.1f} MB  ({:.2f}x the text)'.format(peak / 2 ** 20, peak / size))
+    print('per issue:   {:>9,.0f} B   (Issue object {} B)'.format(
+        retained / len(issues), sys.getsizeof(Issue(IssueType.Task))))
+    print('per item:    {:>9} B   (ChecklistItem object)'.format(sys.getsizeof(ChecklistItem('item', ' '))))
+
+if __name__ == '__main__':
+    main()
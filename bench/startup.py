@@ -0,0 +1,87 @@
+"""Startup benchmark for the network-free commands
+
+Times `main.py validate`, `convert` and `plan --offline` on a small
+document as separate processes, next to a bare interpreter, and reports
+which of the heavy modules (urllib3, dotenv, sqlite3) each one imported.
+
+    python -m bench.startup [--repeat 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, 'main.py')
+
+DOCUMENT = '''# Epic
+
+Epic description with **bold** and [a link](https://example.com).
+
+## Task
+
+- one
+- two
+
+### Sub-task
+
+Sub-task description
+'''
+
+COMMANDS = [
+    ('python -c pass', []),
+    ('validate',       ['validate', '-i', 'doc.md']),
+    ('convert',        ['convert', '-i', 'doc.md', '-o', 'out.json']),
+    ('plan --offline', ['plan', '--offline', '-i', 'doc.md', '-o', 'plan.json']),
+]
+
+HEAVY_MODULES = ('urllib3', 'dotenv', 'sqlite3')
+
+# Runs main.py in-process, then prints which heavy modules it pulled in
+PROBE = '''import runpy, sys
+sys.path.insert(0, {root!r})
+sys.argv = [{main!r}] + sys.argv[1:]
+try:
+    runpy.run_path({main!r}, run_name="__main__")
+except SystemExit:
+    pass
+sys.stderr.write(" ".join(m for m in {modules!r} if m in sys.modules) + "\\n")
+'''
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run(argv, cwd, env):
+    return subprocess.run(argv, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          text=True, check=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    # Credentials are never used by these commands, but MD2Jira reads them
+    env = dict(os.environ, JIRA_PROJECT_KEY='BENCH', JIRA_BASE_URL='http://127.0.0.1:9',
+               JIRA_AUTH_KEY='eDp4')
+    probe = PROBE.format(root=ROOT, main=MAIN, modules=HEAVY_MODULES)
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'doc.md'), 'w', encoding='utf-8') as fh:
+            fh.write(DOCUMENT)
+        for name, command in COMMANDS:
+            argv = [sys.executable, MAIN] + command if command else [sys.executable, '-c', 'pass']
+            # Warm the bytecode cache and the OS page cache first
+            run(argv, directory, env)
+            elapsed  = best_of(args.repeat, lambda: run(argv, directory, env))
+            imported = run([sys.executable, '-c', probe] + command, directory, env).stderr.strip() if command else ''
+            print('{:<16} {:>7.1f} ms   heavy imports: {}'.format(name, elapsed * 1000, imported or 'none'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""Scale benchmarks for md2jira
+
+Generates a synthetic document (see bench/generate.py) and measures the
+parser, the Markdown and ADF converters, the sync cache and full syncs
+against an in-process Jira stub, or over HTTP against src/fake_jira.py
+with injected latency and throttling.  For every case it reports wall time,
+throughput, requests per issue and peak memory, and can compare the
+results with a stored baseline:
+
+    python -m bench.suite                          # small document
+    python -m bench.suite --size large             # 100,000 issues
+    python -m bench.suite --compare bench/baseline.json
+    python -m bench.suite --save bench/baseline.json
+
+With --compare the exit status is 1 when any case is slower, bigger or
+chattier than the baseline by more than --tolerance.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from bench.generate import generate, issue_count
+from src.adf import adf_to_text, canonical_adf, wiki_to_adf
+from src.fake_jira import FakeJira
+from src.sync_cache import SyncCache
+from src.wiki import md_to_wiki
+
+SIZES = {
+    'small':  dict(epics=20, tasks=5, subtasks=4),
+    'medium': dict(epics=100, tasks=9, subtasks=10),
+    'large':  dict(epics=1000, tasks=9, subtasks=10),
+}
+
+# Lookup windows depend on how far the parser runs ahead of the sync stage,
+# so the number of searches varies slightly between identical runs
+REQUEST_SLACK = 0.05
+
+# What the fake server injects in the sync_server / sync_throttled cases
+SERVER_LATENCY = 0.002
+SERVER_RATE    = 100
+
+ENVIRONMENT = {
+    'JIRA_PROJECT_SUBDOMAIN':     'bench',
+    'JIRA_AUTH_KEY':              'YmVuY2g6YmVuY2g=',
+    'JIRA_PROJECT_KEY':           'BENCH',
+    'JIRA_CHECKLIST_CUSTOMFIELD': 'customfield_10100',
+}
+
+class StubJira:
+    """Answers MD2Jira.jira_http_call in-process: creates every issue, finds nothing"""
+
+    def __init__(self):
+        self.requests = 0
+        self.created  = 0
+        self.lock     = threading.Lock()
+
+    def __call__(self, url, verb='GET', body=''):
+        with self.lock:
+            self.requests += 1
+            if 'search' in url:
+                payload = {'issues': [], 'isLast': True}
+            elif url.endswith('/issue/bulk'):
+                count   = len(json.loads(body)['issueUpdates'])
+                payload = {'issues': [{'key': self._key()} for _ in range(count)], 'errors': []}
+            elif verb == 'POST':
+                payload = {'key': self._key()}
+            else:
+                payload = {}
+        return StubResponse(204 if verb == 'PUT' else 201, json.dumps(payload).encode('utf-8'))
+
+    def _key(self):
+        self.created += 1
+        return 'BENCH-{}'.format(self.created)
+
+class StubResponse:
+    def __init__(self, status, data):
+        self.status  = status
+        self.data    = data
+        self.headers = {}
+
+class Context:
+    """The generated document and what the cases share"""
+
+    def __init__(self, shape, workdir):
+        self.shape   = shape
+        self.workdir = workdir
+        self.path    = os.path.join(workdir, 'bench.md')
+        with open(self.path, 'w', encoding='utf-8') as fh:
+            fh.writelines(generate(**shape))
+        self.issues  = issue_count(shape['epics'], shape['tasks'], shape['subtasks'])
+
+    def md2jira(self, **options):
+        from src.md2jira import MD2Jira
+        args = argparse.Namespace(INFILE=[self.path], JIRA_PROJECT_KEY='BENCH', verbose=False, **options)
+        return MD2Jira(args)
+
+    @contextlib.contextmanager
+    def sandbox(self):
+        """Run in an empty directory so no cache or section index carries over"""
+        cwd  = os.getcwd()
+        path = tempfile.mkdtemp(dir=self.workdir)
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(path)
+
+class Measure:
+    """Time (and, while tracemalloc runs, peak memory of) one block of work"""
+
+    def __enter__(self):
+        self.peak = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        if tracemalloc.is_tracing():
+            self.peak = tracemalloc.get_traced_memory()[1] - self.base
+
+# ---------------------------------------------------------------------------
+# Cases: each returns (Measure, items processed, requests sent or None)
+# ---------------------------------------------------------------------------
+
+def case_parse(ctx):
+    from src.md2jira import MarkdownParser
+    parser = MarkdownParser(checklist_enabled=True)
+    with open(ctx.path, encoding='utf-8') as fh, Measure() as measure:
+        count = sum(1 for _ in parser.iter_issues(fh))
+    return measure, count, None
+
+def case_md2wiki(ctx):
+    with open(ctx.path, encoding='utf-8') as fh:
+        lines = fh.read().split('\n')
+    with Measure() as measure:
+        md_to_wiki(lines)
+    return measure, len(lines), None
+
+def _adf_documents(ctx):
+    from src.md2jira import MarkdownParser
+    with open(ctx.path, encoding='utf-8') as fh:
+        return [wiki_to_adf(issue.description) for issue in MarkdownParser(True).iter_issues(fh)]
+
+def case_adf_to_text(ctx):
+    documents = _adf_documents(ctx)
+    with Measure() as measure:
+        for document in documents:
+            adf_to_text(document)
+    return measure, len(documents), None
+
+def case_canonical_adf(ctx):
+    documents = _adf_documents(ctx)
+    with Measure() as measure:
+        for document in documents:
+            canonical_adf(document)
+    return measure, len(documents), None
+
+def case_cache(ctx):
+    """put + flush, then reload + is_current, for one entry per issue"""
+    with ctx.sandbox() as path:
+        keys = ['BENCH-{}'.format(i) for i in range(ctx.issues)]
+        with Measure() as measure:
+            cache = SyncCache(os.path.join(path, 'cache.tsv'))
+            for key in keys:
+                cache.put(key, 'Summary of ' + key, key[::-1], source_file='bench.md', header_path=key)
+            cache.flush()
+            cache = SyncCache(os.path.join(path, 'cache.tsv'))
+            for key in keys:
+                cache.is_current(key, key[::-1])
+    return measure, ctx.issues, None
+
+def _sync(ctx, runs, **options):
+    with ctx.sandbox():
+        for run in range(runs):
+            md2j = ctx.md2jira(**options)
+            md2j.jira_http_call = stub = StubJira()
+            if run < runs - 1:
+                md2j.parse_markdown()
+                continue
+            with Measure() as measure:
+                md2j.parse_markdown()
+    return measure, ctx.issues, stub.requests
+
+def case_sync_create(ctx):
+    """First sync of the whole document into an empty project"""
+    return _sync(ctx, 1)
+
+def case_sync_bulk(ctx):
+    return _sync(ctx, 1, bulk=True)
+
+def case_sync_noop(ctx):
+    """Re-sync of an unchanged document"""
+    return _sync(ctx, 2)
+
+def _sync_server(ctx, **faults):
+    with FakeJira(project='BENCH', latency=SERVER_LATENCY, **faults) as jira, ctx.sandbox():
+        previous = os.environ.get('JIRA_BASE_URL')
+        os.environ['JIRA_BASE_URL'] = jira.url
+        try:
+            md2j = ctx.md2jira(jobs=8)
+        finally:
+            if previous is None:
+                del os.environ['JIRA_BASE_URL']
+            else:
+                os.environ['JIRA_BASE_URL'] = previous
+        with Measure() as measure:
+            md2j.parse_markdown()
+    return measure, ctx.issues, sum(jira.requests.values())
+
+def case_sync_server(ctx):
+    """First sync over HTTP, 8 jobs, against the fake server with per-request latency"""
+    return _sync_server(ctx)
+
+def case_sync_throttled(ctx):
+    """As sync_server, with the server answering 429 above SERVER_RATE requests/s"""
+    return _sync_server(ctx, rate_limit=SERVER_RATE, retry_after=1)
+
+CASES = {
+    'parse':          case_parse,
+    'md2wiki':        case_md2wiki,
+    'adf_to_text':    case_adf_to_text,
+    'canonical_adf':  case_canonical_adf,
+    'cache':          case_cache,
+    'sync_create':    case_sync_create,
+    'sync_bulk':      case_sync_bulk,
+    'sync_noop':      case_sync_noop,
+    'sync_server':    case_sync_server,
+    'sync_throttled': case_sync_throttled,
+}
+
+# ---------------------------------------------------------------------------
+# Running, reporting and comparing
+# ---------------------------------------------------------------------------
+
+def run_case(ctx, case, memory=True, repeat=3):
+    """Return the metrics of one case: best of `repeat` timed runs, then one traced run for memory"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        runs    = [case(ctx) for _ in range(max(1, repeat))]
+        seconds = min(measure.seconds for measure, _items, _requests in runs)
+        _measure, items, requests = runs[-1]
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                peak = case(ctx)[0].peak
+            finally:
+                tracemalloc.stop()
+    return {
+        'items':              items,
+        'seconds':            round(seconds, 4),
+        'throughput':         round(items / seconds, 1) if seconds else None,
+        'requests_per_issue': round(requests / ctx.issues, 4) if requests is not None else None,
+        'peak_mb':            round(peak / 2 ** 20, 2) if peak is not None else None,
+    }
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regressions against `baseline`"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if before.get('throughput') and result['throughput'] and \
+                result['throughput'] < before['throughput'] * (1 - tolerance):
+            regressions.append('{}: throughput {:,.0f}/s < baseline {:,.0f}/s'.format(
+                name, result['throughput'], before['throughput']))
+        if before.get('peak_mb') and result['peak_mb'] and \
+                result['peak_mb'] > before['peak_mb'] * (1 + tolerance):
+            regressions.append('{}: peak memory {} MB > baseline {} MB'.format(
+                name, result['peak_mb'], before['peak_mb']))
+        if before.get('requests_per_issue') is not None and result['requests_per_issue'] is not None and \
+                result['requests_per_issue'] > before['requests_per_issue'] + REQUEST_SLACK:
+            regressions.append('{}: {} requests/issue > baseline {}'.format(
+                name, result['requests_per_issue'], before['requests_per_issue']))
+    return regressions
+
+def print_table(results, baseline=None):
+    header = '{:<14} {:>9} {:>9} {:>12} {:>9} {:>9}'.format(
+        'case', 'items', 'wall s', 'items/s', 'req/issue', 'peak MB')
+    if baseline:
+        header += ' {:>9}'.format('vs base')
+    print(header)
+    for name, r in results.items():
+        line = '{:<14} {:>9} {:>9.3f} {:>12,.0f} {:>9} {:>9}'.format(
+            name, r['items'], r['seconds'], r['throughput'] or 0,
+            '-' if r['requests_per_issue'] is None else r['requests_per_issue'],
+            '-' if r['peak_mb'] is None else r['peak_mb'])
+        before = (baseline or {}).get(name)
+        if before and before.get('throughput') and r['throughput']:
+            line += ' {:>8.2f}x'.format(r['throughput'] / before['throughput'])
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--case', action='append', choices=sorted(CASES),
+                        help='Run only this case (repeatable)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case; the fastest is reported')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced peak-memory runs')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare with a baseline JSON file')
+    parser.add_argument('--save', metavar='BASELINE', help='Store the results in a baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown / memory growth before --compare fails')
+    args = parser.parse_args()
+
+    for name, value in ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    shape   = dict(SIZES[args.size], checklist_items=3, description_lines=6)
+    workdir = tempfile.mkdtemp(prefix='md2jira-bench-')
+    try:
+        ctx = Context(shape, workdir)
+        print('{} document: {:,} issues, {:,} bytes'.format(args.size, ctx.issues, os.path.getsize(ctx.path)))
+        results = {}
+        for name in args.case or CASES:
+            results[name] = run_case(ctx, CASES[name], memory=not args.no_memory, repeat=args.repeat)
+    finally:
+        shutil.rmtree(workdir)
+
+    stored   = {}
+    baseline = None
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare, encoding='utf-8') as fh:
+            stored = json.load(fh)
+        baseline = stored.get(args.size)
+    print_table(results, baseline)
+
+    if args.save:
+        if os.path.exists(args.save):
+            with open(args.save, encoding='utf-8') as fh:
+                stored = json.load(fh)
+        stored[args.size] = results
+        with open(args.save, 'w', encoding='utf-8') as fh:
+            json.dump(stored, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print('REGRESSION {}'.format(regression))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,173 @@
 import argparse
+import sys
 from src import md2jira
+from src.plan import load_plan
+from src.sync_cache import MIRROR_FILE
+
+COMMANDS = ('sync', 'plan', 'apply', 'export', 'validate', 'convert', 'targets')
 
 def main():
     """MD2Jira: Convert Markdown into corresponding JIRA issues"""
+    if args.command == 'targets':
+        from src.targets import TargetError, sync_targets
+        try:
+            sys.exit(1 if sync_targets(args.CONFIG, args) else 0)
+        except TargetError as e:
+            sys.exit('ERROR: {}'.format(e))
     md2j = md2jira.MD2Jira(args)
-    md2j.parse_markdown()
+    if args.command == 'plan':
+        md2j.plan_markdown(args.output)
+    elif args.command == 'apply':
+        md2j.apply_plan(load_plan(args.PLAN))
+    elif args.command == 'validate':
+        sys.exit(1 if md2j.validate_markdown() else 0)
+    elif args.command == 'convert':
+        md2j.convert_markdown(args.output)
+    elif args.command == 'export':
+        md2j.export_markdown(args.jql or 'project = {}'.format(md2j.PROJECT_KEY), args.output)
+    elif getattr(args, 'watch', False):
+        md2j.watch_markdown()
+    else:
+        md2j.parse_markdown()
+
+def command_line(argv):
+    """Run `sync` when no command is given, so `md2jira -i doc.md` keeps working"""
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        return ['sync'] + argv
+    return argv
+
+parser = argparse.ArgumentParser(description=main.__doc__,
+    epilog='Without a command, md2jira runs "sync".')
 
-parser = argparse.ArgumentParser(description=main.__doc__)
+inputs = argparse.ArgumentParser(add_help=False)
+inputs.add_argument('-i',
+    dest='INFILE',
+    type=str,
+    nargs='+',
+    required=True,
+    help='Input markdown file(s); globs and directories (searched for *.md) are accepted'
+)
 
-parser.add_argument('-i', dest='INFILE', type=str, help='Input markdown file', required=True)
-parser.add_argument('-p',
+options = argparse.ArgumentParser(add_help=False)
+options.add_argument('-p',
     dest='JIRA_PROJECT_KEY',
     help='"KEY" of target JIRA project',
     type=str
 )
-parser.add_argument('-v', '--verbose',
+options.add_argument('-v', '--verbose',
     action='store_true',
     default=False,
     help='Enable verbose output (show diff details during update detection)'
 )
-args = parser.parse_args()
+options.add_argument('--bulk',
+    action='store_true',
+    default=False,
+    help='Create new issues through the bulk-create API, one hierarchy level at a time'
+)
+options.add_argument('-j', '--jobs',
+    type=int,
+    default=1,
+    help='Number of issues synced in parallel; independent Epics and their children run concurrently'
+)
+options.add_argument('--state-db',
+    dest='state_db',
+    type=str,
+    help='Keep sync state in this SQLite database instead of .md2jira_cache.py.tsv (also MD2JIRA_STATE_DB)'
+)
+options.add_argument('--mirror',
+    nargs='?',
+    const=MIRROR_FILE,
+    metavar='PATH',
+    help='Keep a local mirror of the project\'s issues and answer lookups from it, refreshing only what changed '
+         'since the last run (default: {}; also MD2JIRA_MIRROR)'.format(MIRROR_FILE)
+)
+options.add_argument('--full',
+    action='store_true',
+    default=False,
+    help='Re-parse every section instead of skipping header blocks unchanged since the last sync, and rescan the whole project into --mirror'
+)
+options.add_argument('--adf',
+    action='store_true',
+    default=False,
+    help='Create and update issues through the v3 API with descriptions in Atlassian Document Format (also JIRA_WRITE_ADF)'
+)
+options.add_argument('--rate',
+    type=float,
+    help='Send at most this many requests per second (also JIRA_RATE_LIMIT); 429s are always retried'
+)
+options.add_argument('--profile',
+    nargs='?',
+    const='md2jira-profile.json',
+    metavar='PATH',
+    help='Write per-phase timings, per-endpoint request metrics and cache hit rates as JSON (default: md2jira-profile.json)'
+)
+
+commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+sync_parser = commands.add_parser('sync',
+    parents=[inputs, options],
+    help='Create and update Jira issues from Markdown (default)'
+)
+sync_parser.add_argument('--watch',
+    action='store_true',
+    default=False,
+    help='Keep running and re-sync each input file as soon as it is saved (inotify, or polling elsewhere)'
+)
+plan_parser = commands.add_parser('plan',
+    parents=[inputs, options],
+    help='Resolve remote state and write a create/update/skip plan without changing anything'
+)
+plan_parser.add_argument('-o', '--output',
+    default='md2jira-plan.json',
+    help='Where to write the plan as JSON; "-" for stdout (default: md2jira-plan.json)'
+)
+plan_parser.add_argument('--offline',
+    action='store_true',
+    default=False,
+    help='Decide from the local sync state only, without contacting Jira (the plan cannot be applied)'
+)
+apply_parser = commands.add_parser('apply',
+    parents=[options],
+    help='Execute a saved plan with batched, parallel writes (use -j for parallelism)'
+)
+apply_parser.add_argument('PLAN',
+    help='Plan file written by "md2jira plan"'
+)
+export_parser = commands.add_parser('export',
+    parents=[options],
+    help='Write the issues matching a JQL query to Markdown, grouped Epic > Task > Sub-task (use -j for parallelism)'
+)
+export_parser.add_argument('--jql',
+    help='Issues to export (default: every issue of the project)'
+)
+export_parser.add_argument('-o', '--output',
+    required=True,
+    help='Markdown file to write; syncing it back afterwards sends no requests'
+)
+commands.add_parser('validate',
+    parents=[inputs],
+    help='Check documents for structural problems without contacting Jira; exits 1 on errors'
+)
+convert_parser = commands.add_parser('convert',
+    parents=[inputs],
+    help='Write the Jira markup each issue would get, as JSON, without contacting Jira'
+)
+convert_parser.add_argument('--adf',
+    action='store_true',
+    default=False,
+    help='Convert descriptions to Atlassian Document Format instead of wiki markup'
+)
+convert_parser.add_argument('-o', '--output',
+    default='-',
+    help='Where to write the JSON (default: stdout)'
+)
+targets_parser = commands.add_parser('targets',
+    parents=[options],
+    help='Sync into every (site, project) target of a JSON config at once, each with its own credentials and rate limit'
+)
+targets_parser.add_argument('CONFIG',
+    help='JSON file listing the targets and their inputs; options given here apply to every target'
+)
+args = parser.parse_args(command_line(sys.argv[1:]))
 
 if __name__=="__main__":
     main()
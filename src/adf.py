@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+
+import re
+
+from .wiki import md_to_wiki
+
+# Block containers whose children are themselves blocks, joined by newlines in adf_to_text()
+BLOCK_CONTAINERS = frozenset((
+    'doc', 'blockquote',
+    'bulletList', 'orderedList', 'listItem',
+    'table', 'tableRow', 'tableCell', 'tableHeader',
+    'mediaSingle',
+))
+# Node attributes that change what a document says; ids, layout and the
+# like are added by Jira on write and ignored when comparing
+SIGNIFICANT_ATTRS = {
+    'heading':    ('level',),
+    'codeBlock':  ('language',),
+    'media':      ('url',),
+    'panel':      ('panelType',),
+    'mention':    ('id',),
+    'emoji':      ('shortName',),
+    'status':     ('text',),
+    'inlineCard': ('url',),
+}
+SIGNIFICANT_MARK_ATTRS = {
+    'link':      ('href',),
+    'textColor': ('color',),
+}
+# Containers whose leading/trailing whitespace Jira does not preserve
+TRIMMED_BLOCKS = frozenset(('paragraph', 'heading', 'tableCell', 'tableHeader'))
+# Wiki markup for ADF marks, innermost first when a text node carries several
+MARK_WIKI = (
+    ('strong',    '*', '*'),
+    ('em',        '_', '_'),
+    ('strike',    '-', '-'),
+    ('underline', '+', '+'),
+)
+
+CODE_OPEN_RE  = re.compile(r'^\{(code|noformat)(?::([^}|]*))?[^}]*\}$')
+HEADING_RE    = re.compile(r'^h([1-6])\.\s*(.*)$')
+LIST_RE       = re.compile(r'^([*#]+)\s+(.*)$')
+IMAGE_LINE_RE = re.compile(r'^!([^!\s|]+)(?:\|[^!]*)?!$')
+INLINE_RE     = re.compile(r'''
+      \{\{(?P<code>.+?)\}\}
+    | \[(?P<text>[^\]|]+)\|(?P<href>[^\]]+)\]
+    | \[(?P<bare>(?:https?|mailto):[^\]\s]+)\]
+    | !(?P<src>[^!\s|]+)(?:\|[^!]*)?!
+    | (?<![\w*])\*(?=\S)(?P<strong>.+?)(?<=\S)\*(?![\w*])
+    | (?<![\w_])_(?=\S)(?P<em>.+?)(?<=\S)_(?![\w_])
+    | (?<![\w-])-(?=\S)(?P<strike>.+?)(?<=\S)-(?![\w-])
+    | (?<![\w+])\+(?=\S)(?P<underline>.+?)(?<=\S)\+(?![\w+])
+''', re.VERBOSE)
+
+def markdown_to_adf(text):
+    """Convert Markdown (with any Jira markup mixed in) to an ADF document"""
+    return wiki_to_adf('\n'.join(md_to_wiki(text.split('\n'))))
+
+def wiki_to_adf(text):
+    """Convert the Jira wiki markup md2jira produces to an ADF document
+
+    Covers the constructs md_to_wiki() emits: headings, paragraphs (lines
+    joined by hard breaks), nested */# lists, ||tables||, quotes, rules,
+    {code}/{noformat} blocks, images on their own line, and inline
+    strong/em/strike/underline/code marks and links.
+    """
+    content   = []
+    paragraph = None
+    lists     = []      # (marker, list node) per open level
+    table     = None
+    code      = None    # (delimiter, codeBlock node, lines)
+
+    for line in text.split('\n'):
+        if code is not None:
+            delimiter, node, lines = code
+            if line.strip() == '{' + delimiter + '}':
+                if lines:
+                    node['content'] = [{'type': 'text', 'text': '\n'.join(lines)}]
+                code = None
+            else:
+                lines.append(line)
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            paragraph, lists, table = None, [], None
+            continue
+
+        match = CODE_OPEN_RE.match(stripped)
+        if match:
+            paragraph, lists, table = None, [], None
+            node = {'type': 'codeBlock', 'attrs': {}}
+            if match.group(2):
+                node['attrs']['language'] = match.group(2)
+            content.append(node)
+            code = (match.group(1), node, [])
+            continue
+
+        if stripped[0] == '|':
+            paragraph, lists = None, []
+            if table is None:
+                table = {'type': 'table', 'content': []}
+                content.append(table)
+            table['content'].append(_table_row(stripped))
+            continue
+        table = None
+
+        match = LIST_RE.match(stripped)
+        if match:
+            paragraph = None
+            _add_list_item(content, lists, match.group(1), match.group(2))
+            continue
+        lists = []
+
+        match = HEADING_RE.match(stripped)
+        if match:
+            paragraph = None
+            content.append({'type': 'heading', 'attrs': {'level': int(match.group(1))},
+                            'content': inline_to_adf(match.group(2))})
+            continue
+        if stripped == '----':
+            paragraph = None
+            content.append({'type': 'rule'})
+            continue
+        if stripped.startswith('bq. '):
+            paragraph = None
+            content.append({'type': 'blockquote', 'content': [
+                {'type': 'paragraph', 'content': inline_to_adf(stripped[4:])}]})
+            continue
+        match = IMAGE_LINE_RE.match(stripped)
+        if match:
+            paragraph = None
+            content.append({'type': 'mediaSingle', 'content': [
+                {'type': 'media', 'attrs': {'type': 'external', 'url': match.group(1)}}]})
+            continue
+
+        if paragraph is None:
+            paragraph = {'type': 'paragraph', 'content': []}
+            content.append(paragraph)
+        else:
+            paragraph['content'].append({'type': 'hardBreak'})
+        paragraph['content'].extend(inline_to_adf(stripped))
+
+    return {'type': 'doc', 'version': 1, 'content': content}
+
+def _add_list_item(content, lists, markers, text):
+    """Append a list item at the depth given by `markers` (e.g. '**#')"""
+    depth = len(markers)
+    # Keep the open levels whose list type still matches
+    keep  = 0
+    while keep < min(len(lists), depth) and lists[keep][0] == markers[keep]:
+        keep += 1
+    del lists[keep:]
+    # Open any missing levels, nesting each new list in the last item above
+    while len(lists) < depth:
+        level     = len(lists)
+        list_type = 'orderedList' if markers[level] == '#' else 'bulletList'
+        node      = {'type': list_type, 'content': []}
+        if level == 0:
+            content.append(node)
+        else:
+            parent_items = lists[-1][1]['content']
+            if not parent_items:
+                parent_items.append({'type': 'listItem', 'content': []})
+            parent_items[-1]['content'].append(node)
+        lists.append((markers[level], node))
+    lists[-1][1]['content'].append({'type': 'listItem', 'content': [
+        {'type': 'paragraph', 'content': inline_to_adf(text)}]})
+
+def _table_row(stripped):
+    header = stripped.startswith('||')
+    cells  = stripped.strip('|').split('||' if header else '|')
+    return {'type': 'tableRow', 'content': [
+        {'type': 'tableHeader' if header else 'tableCell', 'content': [
+            {'type': 'paragraph', 'content': inline_to_adf(cell.strip())}]}
+        for cell in cells
+    ]}
+
+def inline_to_adf(text, marks=()):
+    """Convert one line of inline wiki markup to ADF text nodes"""
+    nodes    = []
+    position = 0
+    for match in INLINE_RE.finditer(text):
+        if match.start() > position:
+            nodes.append(_text(text[position:match.start()], marks))
+        groups = match.groupdict()
+        if groups['code'] is not None:
+            nodes.append(_text(groups['code'], marks + ({'type': 'code'},)))
+        elif groups['href'] is not None:
+            link = {'type': 'link', 'attrs': {'href': groups['href']}}
+            nodes.extend(inline_to_adf(groups['text'], marks + (link,)))
+        elif groups['bare'] is not None:
+            link = {'type': 'link', 'attrs': {'href': groups['bare']}}
+            nodes.append(_text(groups['bare'], marks + (link,)))
+        elif groups['src'] is not None:
+            link = {'type': 'link', 'attrs': {'href': groups['src']}}
+            nodes.append(_text(groups['src'], marks + (link,)))
+        else:
+            mark = next(name for name in ('strong', 'em', 'strike', 'underline') if groups[name] is not None)
+            nodes.extend(inline_to_adf(groups[mark], marks + ({'type': mark},)))
+        position = match.end()
+    if position < len(text):
+        nodes.append(_text(text[position:], marks))
+    return nodes
+
+def _text(text, marks):
+    node = {'type': 'text', 'text': text}
+    if marks:
+        node['marks'] = list(marks)
+    return node
+
+def adf_to_text(adf):
+    """Extract plain text from an Atlassian Document Format (ADF) dict
+
+    Walks the tree with an explicit stack, so arbitrarily deep documents
+    do not hit the recursion limit.  Text nodes are concatenated, and
+    children of block containers are separated by newlines.
+    """
+    if adf is None:
+        return ''
+    if isinstance(adf, str):
+        return adf
+    if adf.get('type') == 'text':
+        return adf.get('text', '')
+
+    result = []
+    stack  = [(adf, iter(adf.get('content', [])), [])]
+    while stack:
+        node, children, parts = stack[-1]
+        child = next(children, None)
+        if child is not None:
+            if child.get('type') == 'text':
+                parts.append(child.get('text', ''))
+            else:
+                stack.append((child, iter(child.get('content', [])), []))
+            continue
+        stack.pop()
+        separator = '\n' if node.get('type', '') in BLOCK_CONTAINERS else ''
+        (stack[-1][2] if stack else result).append(separator.join(parts))
+    return result[0]
+
+def adf_to_wiki(adf):
+    """Convert an ADF document to Jira wiki markup, the inverse of wiki_to_adf()
+
+    Blocks are walked with an explicit stack like adf_to_text().  Nodes
+    with no wiki equivalent (panels, expands, layouts ...) contribute
+    their content; attachments without a URL and unknown leaves are dropped.
+    """
+    if adf is None:
+        return ''
+    if isinstance(adf, str):
+        return adf
+
+    lines = []
+    stack = [(iter(adf.get('content') or ()), '', False)]    # children, list markers, in quote
+    while stack:
+        children, markers, quoted = stack[-1]
+        node = next(children, None)
+        if node is None:
+            stack.pop()
+            continue
+        node_type = node.get('type')
+        content   = node.get('content') or ()
+
+        if node_type in ('bulletList', 'orderedList', 'taskList'):
+            if not markers and lines:
+                lines.append('')
+            marker = '#' if node_type == 'orderedList' else '*'
+            stack.append((iter(content), markers + marker, quoted))
+            continue
+        if node_type == 'listItem':
+            stack.append((iter(content), markers, quoted))
+            continue
+        if node_type == 'blockquote':
+            stack.append((iter(content), markers, True))
+            continue
+
+        if markers:
+            # Jira list items hold a single line
+            if node_type in ('paragraph', 'heading', 'taskItem'):
+                lines.append('{} {}'.format(markers, _inline_wiki(content, ' ')))
+            elif node_type not in ('codeBlock', 'table', 'rule', 'mediaSingle', 'mediaGroup'):
+                stack.append((iter(content), markers, quoted))
+            continue
+
+        if node_type not in ('paragraph', 'heading', 'codeBlock', 'table', 'rule',
+                             'mediaSingle', 'mediaGroup', 'taskItem'):
+            stack.append((iter(content), markers, quoted))
+            continue
+
+        if lines:
+            lines.append('')
+        if node_type == 'paragraph' or node_type == 'taskItem':
+            text = _inline_wiki(content, ' ' if quoted else '\n')
+            lines.append('bq. ' + text if quoted else text)
+        elif node_type == 'heading':
+            level = (node.get('attrs') or {}).get('level', 1)
+            lines.append('h{}. {}'.format(level, _inline_wiki(content, ' ')))
+        elif node_type == 'codeBlock':
+            language = (node.get('attrs') or {}).get('language')
+            lines.append('{code:' + language + '}' if language else '{code}')
+            lines.append(''.join(child.get('text', '') for child in content))
+            lines.append('{code}')
+        elif node_type == 'table':
+            lines.extend(_table_wiki(row) for row in content)
+        elif node_type == 'rule':
+            lines.append('----')
+        else:
+            urls = [(child.get('attrs') or {}).get('url') for child in content]
+            lines.extend('!{}!'.format(url) for url in urls if url)
+            if not lines[-1]:
+                lines.pop()
+    return '\n'.join(lines)
+
+def _table_wiki(row):
+    cells  = row.get('content') or ()
+    header = bool(cells) and all(cell.get('type') == 'tableHeader' for cell in cells)
+    bar    = '||' if header else '|'
+    texts  = []
+    for cell in cells:
+        blocks = cell.get('content') or ()
+        texts.append(' '.join(
+            _inline_wiki(block.get('content') or (), ' ') if block.get('type') in ('paragraph', 'heading')
+            else adf_to_text(block).replace('\n', ' ')
+            for block in blocks
+        ))
+    return bar + bar.join(texts) + bar
+
+def _inline_wiki(nodes, newline):
+    """Render inline ADF nodes as one wiki string, hard breaks becoming `newline`"""
+    parts = []
+    for node in nodes:
+        node_type = node.get('type')
+        attrs     = node.get('attrs') or {}
+        if node_type == 'text':
+            parts.append(_marked_wiki(node.get('text', ''), node.get('marks') or ()))
+        elif node_type == 'hardBreak':
+            parts.append(newline)
+        elif node_type == 'mention':
+            parts.append(attrs.get('text') or '@' + str(attrs.get('id', '')))
+        elif node_type == 'emoji':
+            parts.append(attrs.get('text') or attrs.get('shortName', ''))
+        elif node_type == 'inlineCard':
+            parts.append('[{}]'.format(attrs.get('url', '')))
+        elif node_type == 'status':
+            parts.append(attrs.get('text', ''))
+        else:
+            parts.append(adf_to_text(node))
+    return ''.join(parts)
+
+def _marked_wiki(text, marks):
+    """Wrap `text` in the wiki markup for `marks`, keeping surrounding spaces outside"""
+    if not marks or not text.strip():
+        return text
+    types = {mark.get('type'): mark for mark in marks}
+    core  = text.strip()
+    if 'code' in types:
+        core = '{{' + core + '}}'
+    else:
+        for name, opening, closing in MARK_WIKI:
+            if name in types:
+                core = opening + core + closing
+    if 'link' in types:
+        href = (types['link'].get('attrs') or {}).get('href', '')
+        core = '[{}]'.format(href) if core == href else '[{}|{}]'.format(core, href)
+    start = len(text) - len(text.lstrip())
+    end   = len(text.rstrip())
+    return text[:start] + core + text[end:]
+
+def canonical_adf(adf):
+    """Reduce an ADF document to a flat, comparable token tuple, without recursion
+
+    Two documents that render the same compare equal: attributes Jira
+    adds on write (localId, layout, ...) are dropped, marks are sorted,
+    adjacent text with the same marks is merged (hard breaks become
+    newlines), whitespace Jira trims is stripped and empty paragraphs are
+    removed.  Nodes become ('open', type, attrs) ... ('close', type) and
+    text runs ('text', marks, text); keeping the result flat means
+    comparing two deep documents does not recurse either.
+    """
+    if adf is None:
+        return None
+    tokens = [('open', adf.get('type'), _node_attrs(adf))]
+    stack  = [(adf, iter(adf.get('content') or ()), 0)]
+    while stack:
+        node, children, start = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            _close(tokens, node, start)
+            continue
+        child_type = child.get('type')
+        if child_type == 'text':
+            _append_text(tokens, _canonical_marks(child.get('marks')), child.get('text', ''))
+        elif child_type == 'hardBreak':
+            _append_text(tokens, (), '\n')
+        else:
+            stack.append((child, iter(child.get('content') or ()), len(tokens)))
+            tokens.append(('open', child_type, _node_attrs(child)))
+    return tuple(tokens)
+
+def _append_text(tokens, marks, text):
+    last = tokens[-1]
+    if last[0] == 'text' and last[1] == marks:
+        tokens[-1] = ('text', marks, last[2] + text)
+    else:
+        tokens.append(('text', marks, text))
+
+def _close(tokens, node, start):
+    """Finish the node opened at tokens[start], trimming or dropping it as Jira would"""
+    node_type = node.get('type')
+    if node_type in TRIMMED_BLOCKS:
+        _trim(tokens, start + 1)
+        if node_type == 'paragraph' and len(tokens) == start + 1:
+            del tokens[start:]
+            return
+    tokens.append(('close', node_type))
+
+def _trim(tokens, first):
+    """Strip leading/trailing whitespace from the text runs in tokens[first:]"""
+    while len(tokens) > first and _is_blank(tokens[first]):
+        del tokens[first]
+    while len(tokens) > first and _is_blank(tokens[-1]):
+        tokens.pop()
+    if len(tokens) > first and tokens[first][0] == 'text':
+        tokens[first] = ('text', tokens[first][1], tokens[first][2].lstrip())
+    if len(tokens) > first and tokens[-1][0] == 'text':
+        tokens[-1] = ('text', tokens[-1][1], tokens[-1][2].rstrip())
+
+def _is_blank(token):
+    return token[0] == 'text' and not token[2].strip()
+
+def _node_attrs(node):
+    return _canonical_attrs(node.get('attrs'), SIGNIFICANT_ATTRS.get(node.get('type'), ()))
+
+def _canonical_marks(marks):
+    if not marks:
+        return ()
+    return tuple(sorted(
+        (mark.get('type'), _canonical_attrs(mark.get('attrs'), SIGNIFICANT_MARK_ATTRS.get(mark.get('type'), ())))
+        for mark in marks
+    ))
+
+def _canonical_attrs(attrs, names):
+    if not attrs or not names:
+        return ()
+    return tuple((name, attrs[name]) for name in names if attrs.get(name) not in (None, ''))
@@ -0,0 +1,513 @@
+#!/usr/bin/env python
+
+"""In-process stand-in for the parts of the Jira REST API md2jira uses
+
+    python -m src.fake_jira --port 8080 --latency 0.05 --rate-limit 20
+    export JIRA_BASE_URL=http://127.0.0.1:8080
+
+Keeps issues in memory and implements issue create/read/update/delete,
+bulk create and search/jql (GET and POST, with nextPageToken paging) for
+both /rest/api/2 and /rest/api/3.  Latency, 429 throttling with
+Retry-After and random 5xx errors can be injected to measure throughput
+and resilience offline.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from .adf import adf_to_text, wiki_to_adf
+
+ROUTE_RE     = re.compile(r'^/rest/api/(?P<version>[23])/(?P<path>[^?]*)$')
+ISSUE_KEY_RE = re.compile(r'^issue/(?P<key>[A-Z][A-Z0-9_]*-\d+)$')
+JQL_TOKEN_RE = re.compile(r'''
+      \s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) | (?P<comma>,)
+      | (?P<op>!=|>=|<=|!~|=|~|>|<)
+      | "(?P<string>(?:\\.|[^"\\])*)"
+      | (?P<word>[\w.\-]+)
+    )''', re.VERBOSE)
+# Jira stores the canonical name of the issue type, whatever spelling was sent
+ISSUE_TYPES    = {'epic': 'Epic', 'story': 'Story', 'task': 'Task', 'subtask': 'Sub-task', 'bug': 'Bug'}
+ORDER_BY_RE    = re.compile(r'\s*\b(ORDER\s+BY)\s+', re.IGNORECASE)
+ERROR_STATUSES = (500, 502, 503)
+
+class JqlError(Exception):
+    """Raised for JQL the fake server does not understand"""
+
+class FakeJira:
+    """A threaded HTTP server with in-memory Jira issues
+
+    `latency` is a delay in seconds (or a (min, max) range) added to every
+    request; `rate_limit` caps requests per second, answering the rest
+    with 429 and `Retry-After: retry_after`; `error_rate` is the chance
+    of a random 500/502/503 before a request is processed.  inject()
+    queues specific responses for deterministic tests.
+    """
+
+    def __init__(self, project='TEST', latency=0.0, rate_limit=None, retry_after=1,
+                 error_rate=0.0, seed=0, host='127.0.0.1', port=0):
+        self.project     = project
+        self.latency     = latency
+        self.rate_limit  = rate_limit
+        self.retry_after = retry_after
+        self.error_rate  = error_rate
+        self.random      = random.Random(seed)
+        self.address     = (host, port)
+
+        self.lock        = threading.Lock()
+        self.issues      = {}
+        self.next_id     = 10000
+        self.injected    = []
+        self.window      = (0, 0)     # (second, requests in that second)
+        self.requests    = Counter()  # 'VERB route' -> count
+        self.throttled   = 0
+        self.errors      = 0
+        self.server      = None
+        self.thread      = None
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self):
+        """Start serving in a background thread; returns the base URL"""
+        fake = self
+
+        class Handler(JiraRequestHandler):
+            jira = fake
+
+        self.server = ThreadingHTTPServer(self.address, Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def inject(self, status, count=1, headers=None, body=None):
+        """Answer the next `count` requests with `status` before processing them"""
+        with self.lock:
+            for _ in range(count):
+                self.injected.append((status, dict(headers or {}), body or {}))
+
+    # -- request handling ---------------------------------------------------
+
+    def handle(self, verb, raw_path, body):
+        """Return (status, headers, payload) for one request"""
+        self._sleep()
+        parts = urlsplit(raw_path)
+        route = ROUTE_RE.match(parts.path)
+        if route is None:
+            return 404, {}, {'errorMessages': ['No route for {}'.format(parts.path)]}
+        version, path = route.group('version'), route.group('path')
+        name = 'issue/{key}' if ISSUE_KEY_RE.match(path) else path
+
+        with self.lock:
+            self.requests['{} {}'.format(verb, name)] += 1
+            fault = self._fault()
+            if fault is not None:
+                return fault
+
+            query = parse_qs(parts.query)
+            try:
+                if path == 'issue' and verb == 'POST':
+                    return self._create(version, body)
+                if path == 'issue/bulk' and verb == 'POST':
+                    return self._bulk_create(version, body)
+                if path == 'search/jql' and verb in ('GET', 'POST'):
+                    params = body if verb == 'POST' else {k: v[0] for k, v in query.items()}
+                    return self._search(version, params)
+                match = ISSUE_KEY_RE.match(path)
+                if match and verb == 'GET':
+                    return self._read(version, match.group('key'), query.get('fields', [None])[0])
+                if match and verb == 'PUT':
+                    return self._update(version, match.group('key'), body)
+                if match and verb == 'DELETE':
+                    return self._delete(match.group('key'))
+            except JqlError as e:
+                return 400, {}, {'errorMessages': [str(e)]}
+        return 405, {}, {'errorMessages': ['{} not supported for {}'.format(verb, path)]}
+
+    def _sleep(self):
+        delay = self.latency
+        if isinstance(delay, (tuple, list)):
+            delay = self.random.uniform(*delay)
+        if delay:
+            time.sleep(delay)
+
+    def _fault(self):
+        """Return an injected, throttled or random error response, if any"""
+        if self.injected:
+            status, headers, body = self.injected.pop(0)
+            if status == 429:
+                self.throttled += 1
+            return status, headers, body
+        if self.rate_limit:
+            second = int(time.monotonic())
+            start, count = self.window
+            count = count + 1 if start == second else 1
+            self.window = (second, count)
+            if count > self.rate_limit:
+                self.throttled += 1
+                return 429, {'Retry-After': str(self.retry_after),
+                             'X-RateLimit-Limit': str(self.rate_limit),
+                             'X-RateLimit-Remaining': '0'}, {'errorMessages': ['Rate limit exceeded']}
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return self.random.choice(ERROR_STATUSES), {}, {'errorMessages': ['Injected server error']}
+        return None
+
+    # -- endpoints ----------------------------------------------------------
+
+    def _validate(self, version, fields, partial=False):
+        errors = {}
+        if not partial:
+            if not fields.get('summary'):
+                errors['summary'] = 'You must specify a summary of the issue.'
+            if (fields.get('project') or {}).get('key') != self.project:
+                errors['project'] = 'valid project is required'
+            issue_type = (fields.get('issuetype') or {}).get('name', '')
+            if not issue_type:
+                errors['issuetype'] = 'valid issue type is required'
+            elif issue_type.replace('-', '').lower() == 'subtask' and not (fields.get('parent') or {}).get('key'):
+                errors['parent'] = 'Given parent issue does not belong to appropriate hierarchy.'
+        description = fields.get('description')
+        if description is not None:
+            if version == '3' and not isinstance(description, dict):
+                errors['description'] = 'Operation value must be an Atlassian Document (see the Atlassian Document Format)'
+            if version == '2' and not isinstance(description, str):
+                errors['description'] = 'Operation value must be a string'
+        for link in ('parent', 'customfield_10014'):
+            target = fields.get(link)
+            target = target.get('key') if isinstance(target, dict) else target
+            if target and target not in self.issues:
+                errors[link] = 'Issue {} does not exist'.format(target)
+        return errors
+
+    def _new_issue(self, fields):
+        name   = fields['issuetype']['name']
+        fields = dict(fields, issuetype={'name': ISSUE_TYPES.get(name.replace('-', '').lower(), name)})
+        self.next_id += 1
+        key = '{}-{}'.format(self.project, self.next_id - 10000)
+        now = _jira_time()
+        self.issues[key] = {'id': str(self.next_id), 'key': key,
+                            'fields': dict(fields, created=now, updated=now)}
+        return {'id': str(self.next_id), 'key': key, 'self': '/rest/api/2/issue/{}'.format(self.next_id)}
+
+    def _create(self, version, body):
+        fields = (body or {}).get('fields', {})
+        errors = self._validate(version, fields)
+        if errors:
+            return 400, {}, {'errorMessages': [], 'errors': errors}
+        return 201, {}, self._new_issue(fields)
+
+    def _bulk_create(self, version, body):
+        created, failed = [], []
+        for index, update in enumerate((body or {}).get('issueUpdates', [])):
+            fields = update.get('fields', {})
+            errors = self._validate(version, fields)
+            if errors:
+                failed.append({'status': 400, 'failedElementNumber': index,
+                               'elementErrors': {'errorMessages': [], 'errors': errors}})
+            else:
+                created.append(self._new_issue(fields))
+        return 201, {}, {'issues': created, 'errors': failed}
+
+    def _read(self, version, key, fields):
+        issue = self.issues.get(key)
+        if issue is None:
+            return 404, {}, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']}
+        return 200, {}, self._render(version, issue, fields)
+
+    def _update(self, version, key, body):
+        issue = self.issues.get(key)
+        if issue is None:
+            return 404, {}, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']}
+        fields = (body or {}).get('fields', {})
+        errors = self._validate(version, fields, partial=True)
+        if errors:
+            return 400, {}, {'errorMessages': [], 'errors': errors}
+        issue['fields'].update(fields)
+        issue['fields']['updated'] = _jira_time()
+        return 204, {}, None
+
+    def _delete(self, key):
+        if self.issues.pop(key, None) is None:
+            return 404, {}, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']}
+        return 204, {}, None
+
+    def _search(self, version, params):
+        jql     = params.get('jql', '')
+        fields  = params.get('fields')
+        limit   = int(params.get('maxResults') or 50)
+        offset  = int(params.get('nextPageToken') or 0)
+        matches = evaluate_jql(jql, self.issues.values())
+        page    = matches[offset:offset + limit]
+        result  = {'issues': [self._render(version, issue, fields) for issue in page],
+                   'isLast': offset + limit >= len(matches)}
+        if not result['isLast']:
+            result['nextPageToken'] = str(offset + limit)
+        return 200, {}, result
+
+    def _render(self, version, issue, fields=None):
+        """Return an issue as the API would, limited to `fields`"""
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        stored = issue['fields']
+        names  = list(stored) if not fields or '*all' in fields else fields
+        out    = {}
+        for name in names:
+            if name not in stored:
+                continue
+            value = stored[name]
+            if name == 'description' and value is not None:
+                value = wiki_to_adf(value) if version == '3' and isinstance(value, str) else value
+                value = adf_to_text(value) if version == '2' and isinstance(value, dict) else value
+            if name == 'issuetype':
+                value = {'name': value.get('name')}
+            out[name] = value
+        return {'id': issue['id'], 'key': issue['key'], 'fields': out}
+
+class JiraRequestHandler(BaseHTTPRequestHandler):
+    jira = None
+
+    def _respond(self, verb):
+        length = int(self.headers.get('Content-Length') or 0)
+        body   = None
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length).decode('utf-8'))
+            except ValueError:
+                return self._send(400, {}, {'errorMessages': ['Invalid JSON']})
+        self._send(*self.jira.handle(verb, self.path, body))
+
+    def _send(self, status, headers, payload):
+        data = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def do_PUT(self):
+        self._respond('PUT')
+
+    def do_DELETE(self):
+        self._respond('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+# ---------------------------------------------------------------------------
+# JQL subset: field op value, AND/OR/NOT, parentheses, IN lists, ORDER BY
+# ---------------------------------------------------------------------------
+
+def evaluate_jql(jql, issues):
+    """Return the issues matching `jql`, ordered by ORDER BY (default: key)"""
+    jql, _order_by, order = (ORDER_BY_RE.split(jql, maxsplit=1) + ['', ''])[:3]
+    tokens    = _tokenize(jql)
+    predicate = _JqlParser(tokens).parse() if tokens else (lambda issue: True)
+    matches   = [issue for issue in issues if predicate(issue)]
+
+    field, _space, direction = order.strip().partition(' ')
+    if field and field.lower() != 'key':
+        matches.sort(key=lambda issue: str(_field_value(issue, field) or ''))
+    else:
+        matches.sort(key=lambda issue: int(issue['id']))
+    if direction.strip().upper() == 'DESC':
+        matches.reverse()
+    return matches
+
+def _tokenize(jql):
+    tokens   = []
+    position = 0
+    jql      = jql.strip()
+    while position < len(jql):
+        match = JQL_TOKEN_RE.match(jql, position)
+        if match is None or match.end() == position:
+            raise JqlError('Cannot parse JQL at: {}'.format(jql[position:]))
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+class _JqlParser:
+    def __init__(self, tokens):
+        self.tokens   = tokens
+        self.position = 0
+
+    def parse(self):
+        predicate = self._or()
+        if self.position != len(self.tokens):
+            raise JqlError('Unexpected {}'.format(self.tokens[self.position][1]))
+        return predicate
+
+    def _peek_word(self, *words):
+        if self.position < len(self.tokens):
+            kind, value = self.tokens[self.position]
+            return kind == 'word' and value.upper() in words
+        return False
+
+    def _next(self, expected=None):
+        if self.position >= len(self.tokens):
+            raise JqlError('Unexpected end of JQL')
+        token = self.tokens[self.position]
+        if expected and token[0] != expected:
+            raise JqlError('Expected {} but found {}'.format(expected, token[1]))
+        self.position += 1
+        return token
+
+    def _or(self):
+        terms = [self._and()]
+        while self._peek_word('OR'):
+            self._next()
+            terms.append(self._and())
+        return terms[0] if len(terms) == 1 else (lambda issue: any(t(issue) for t in terms))
+
+    def _and(self):
+        terms = [self._not()]
+        while self._peek_word('AND'):
+            self._next()
+            terms.append(self._not())
+        return terms[0] if len(terms) == 1 else (lambda issue: all(t(issue) for t in terms))
+
+    def _not(self):
+        if self._peek_word('NOT'):
+            self._next()
+            term = self._not()
+            return lambda issue: not term(issue)
+        if self.position < len(self.tokens) and self.tokens[self.position][0] == 'lparen':
+            self._next()
+            term = self._or()
+            self._next('rparen')
+            return term
+        return self._clause()
+
+    def _clause(self):
+        field = self._next('word')[1]
+        if self._peek_word('IN', 'NOT'):
+            negate = self._next()[1].upper() == 'NOT'
+            if negate:
+                self._next('word')
+            values = self._list()
+            return lambda issue: (_matches(issue, field, '=', values)) != negate
+        operator = self._next('op')[1]
+        kind, value = self._next()
+        if kind not in ('string', 'word'):
+            raise JqlError('Expected a value after {} {}'.format(field, operator))
+        return lambda issue: _matches(issue, field, operator, [_unescape(value)])
+
+    def _list(self):
+        self._next('lparen')
+        values = []
+        while True:
+            kind, value = self._next()
+            values.append(_unescape(value))
+            if self._next()[0] == 'rparen':
+                return values
+
+def _unescape(value):
+    """Undo JQL string escapes, then the text-search escapes md2jira adds for - and !"""
+    return re.sub(r'\\([-!])', r'\1', re.sub(r'\\(.)', r'\1', value))
+
+def _field_value(issue, field):
+    name = field.lower()
+    if name in ('key', 'issuekey'):
+        return issue['key']
+    fields = issue['fields']
+    if name == 'project':
+        return (fields.get('project') or {}).get('key')
+    if name in ('issuetype', 'type'):
+        return (fields.get('issuetype') or {}).get('name')
+    if name == 'parent':
+        return (fields.get('parent') or {}).get('key') or fields.get('customfield_10014')
+    value = fields.get(field, fields.get(name))
+    if isinstance(value, dict):
+        return adf_to_text(value) if value.get('type') == 'doc' else value.get('key') or value.get('value')
+    return value
+
+def _matches(issue, field, operator, values):
+    actual = _field_value(issue, field)
+    if operator in ('~', '!~'):
+        found = any(value.lower() in str(actual or '').lower() for value in values)
+        return found if operator == '~' else not found
+    if field.lower() in ('updated', 'created'):
+        actual = _parse_time(actual)
+        values = [_parse_time(value) for value in values]
+    else:
+        actual = str(actual).lower() if actual is not None else None
+        values = [value.lower() for value in values]
+    if operator == '=':
+        return actual in values
+    if operator == '!=':
+        return actual not in values
+    if actual is None:
+        return False
+    value = values[0]
+    return {'>': actual > value, '>=': actual >= value, '<': actual < value, '<=': actual <= value}[operator]
+
+def _jira_time():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+0000'
+
+def _parse_time(value):
+    """Parse Jira timestamps and JQL date literals ("2025/01/31 10:00", "2025-01-31")"""
+    if value is None:
+        return None
+    text = str(value).replace('/', '-')
+    for pattern in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(text, pattern)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise JqlError('Invalid date: {}'.format(value))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--project', default='TEST')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--rate-limit', type=int, help='Requests per second before answering 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a random 5xx')
+    args = parser.parse_args()
+
+    fake = FakeJira(args.project, args.latency, args.rate_limit, args.retry_after, args.error_rate, port=args.port)
+    print('export JIRA_BASE_URL={}'.format(fake.start()))
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == '__main__':
+    main()
@@ -1,65 +1,314 @@
 #!/usr/bin/env python
 
 import os
-import shutil
-from dotenv import load_dotenv
+import sys
 import re
-import tempfile
 from enum import Enum
-import urllib3
-from urllib.parse import urlencode, quote
-import certifi
+from urllib.parse import urlencode, quote, urlsplit
 import json
 import hashlib
+import glob
+import queue
+import threading
+import time
+import contextvars
+from collections import Counter, defaultdict, deque
+from .sync_cache import (SyncCache, SqliteSyncCache, SectionIndex, IssueMirror, HASH_VERSION, CACHE_FILE,
+                         SECTIONS_FILE)
+from .transport import JiraTransport, IDEMPOTENT_VERBS
+from .wiki import md_to_wiki, wiki_to_md, track_fence, FENCE_CHARS, CONVERTER_VERSION
+from .profiler import Profiler, NullProfiler
+from .plan import new_plan, check_plan, creation_levels, save_plan
+from .watch import input_directories, watch_changes, watch_directories, open_watcher, snapshot
+from . import adf
+
+# Number of summaries OR'ed together in a single batched JQL lookup
+SEARCH_BATCH_SIZE = 40
+# Page size requested from the search/jql endpoint
+SEARCH_PAGE_SIZE  = 100
+# Page size of the export listing pass, which only asks for type and parent
+EXPORT_LIST_PAGE_SIZE = 1000
+# Fields fetched by that pass; full issues are fetched SEARCH_PAGE_SIZE at a time
+EXPORT_LIST_FIELDS    = ['issuetype', 'parent', 'customfield_10014']
+# Maximum number of issues accepted by one call to the bulk-create endpoint
+BULK_CREATE_SIZE  = 50
+# Issues the parser may run ahead of the sync stage
+PIPELINE_QUEUE_SIZE = 2 * SEARCH_BATCH_SIZE
+# Version of the header block hash stored in the section index
+SECTION_HASH_VERSION = 1
+# Joins the summaries of enclosing headers into an issue's header path
+HEADER_PATH_SEPARATOR = ' > '
+
+# Issue headers (#, ##, ###) and checklist items, compiled once for every parser
+EPIC_RE           = re.compile(r'^#\s+')
+TASK_RE           = re.compile(r'^##\s+')
+SUBTASK_RE        = re.compile(r'^###\s+')
+# A checklist item in a document
+CHECKLIST_RE      = re.compile(r'^\* \[(.*)\] (.*)$')
+# First bytes of lines that may open or close a code block
+FENCE_BYTES = tuple(c.encode('ascii') for c in FENCE_CHARS)
+# POST endpoints that only read, and so may be retried like a GET
+IDEMPOTENT_POST_PATHS = ('/search/jql',)
+
+class JiraSearchError(Exception):
+    """Raised when a JIRA search request does not return any results list"""
+
+class _PipelineError:
+    """Carries an exception raised by the parser thread to the sync stage"""
+    def __init__(self, error):
+        self.error = error
+
+# Marks the end of the parsed document in the sync pipeline
+_PIPELINE_END = object()
+
+def load_environment():
+    """Load .env into os.environ, the local environment taking precedence
+
+    python-dotenv is only imported when there is a .env file it could
+    find, i.e. in the working directory, next to md2jira or above either.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    for start in (os.getcwd(), here):
+        directory = start
+        while True:
+            if os.path.isfile(os.path.join(directory, '.env')):
+                from dotenv import load_dotenv
+                # Local environment supercedes .env file
+                load_dotenv(override=True)
+                return
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+
+def new_pool_manager(maxsize):
+    """Create the HTTPS connection pool; urllib3 and certifi are imported here, on first network use"""
+    import certifi
+    import urllib3
+    return urllib3.PoolManager(ca_certs=certifi.where(), maxsize=maxsize)
+
+def expand_inputs(paths):
+    """Expand input files, glob patterns and directories into Markdown paths
+
+    Directories are searched recursively for `*.md` files.  The result keeps
+    the order given on the command line, without duplicates.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(path, '**', '*.md'), recursive=True))
+        elif any(c in path for c in '*?['):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+        for match in matches:
+            if match not in expanded:
+                expanded.append(match)
+    if len(expanded) == 0:
+        raise FileNotFoundError('no Markdown files match {}'.format(' '.join(paths)))
+    return expanded
+
+def export_order(nodes):
+    """Order exported issues as a document: Epic, its Tasks, each followed by its Sub-tasks
+
+    `nodes` maps issue keys to (kind, parent key) with kind one of 'Epic',
+    'Task' or 'Subtask'.  Returns ([(key, header depth)], skipped keys).
+    Tasks outside every exported Epic come first, so they do not end up
+    under one; Sub-tasks whose Task is not exported are skipped.
+    """
+    children = defaultdict(list)
+    epics    = []
+    loose    = []
+    skipped  = []
+    for key in sorted(nodes, key=issue_key_order):
+        kind, parent = nodes[key]
+        parent_kind  = nodes[parent][0] if parent in nodes else None
+        if kind == 'Epic':
+            epics.append(key)
+        elif kind == 'Subtask':
+            if parent_kind == 'Task':
+                children[parent].append(key)
+            else:
+                skipped.append(key)
+        elif parent_kind == 'Epic':
+            children[parent].append(key)
+        else:
+            loose.append(key)
+
+    order = []
+    for task in loose:
+        order.append((task, 2))
+        order.extend((subtask, 3) for subtask in children[task])
+    for epic in epics:
+        order.append((epic, 1))
+        for task in children[epic]:
+            order.append((task, 2))
+            order.extend((subtask, 3) for subtask in children[task])
+    return order, skipped
+
+def hierarchy_kind(issuetype):
+    """Map a Jira issuetype to the header level it is exported at: Epic, Task or Subtask"""
+    name = (issuetype or {}).get('name', '')
+    if name == 'Epic':
+        return 'Epic'
+    if (issuetype or {}).get('subtask') or name.replace('-', '').lower() == 'subtask':
+        return 'Subtask'
+    return 'Task'
+
+def issue_key_order(key):
+    """Sort key putting PROJ-9 before PROJ-10"""
+    project, _dash, number = key.rpartition('-')
+    return (project, int(number) if number.isdigit() else 0)
+
+def ordered_window(pool, function, items, window):
+    """Yield (item, function(item)) in order, keeping at most `window` calls ahead of the consumer"""
+    pending = deque()
+    for item in items:
+        pending.append((item, pool.submit(function, item)))
+        if len(pending) >= window:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+def parse_file(path, checklist_enabled=False, known_sections=None, salt=''):
+    """Parse one Markdown file into a list of Issues (used by worker processes)
+
+    With `known_sections` (see SectionIndex) unchanged header blocks are
+    returned as stubs instead of being parsed.
+    """
+    parser = MarkdownParser(checklist_enabled)
+    if known_sections is not None:
+        with open(path, 'rb') as fh:
+            return list(parser.iter_issues_incremental(fh, os.path.normpath(path), known_sections, salt))
+    with open(path, 'r', encoding='utf-8') as fh:
+        return list(parser.iter_issues(fh, os.path.normpath(path)))
+
+def link_hash(content_hash, link):
+    """Combine a content hash with the key an issue links to; unlinked issues keep the content hash"""
+    if not link:
+        return content_hash
+    return hashlib.md5('{}:{}'.format(content_hash, link).encode()).hexdigest()
+
+def section_hash(salt, header_path, block):
+    """Hash of one raw header block, including everything that shapes its Issue"""
+    digest = hashlib.sha1(salt.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(header_path.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(block)
+    return digest.hexdigest()
 
 class MD2Jira:
-    def __init__(self, args): 
+    def __init__(self, args, environ=None): 
 
-        # Local environment supercedes .env file
-        load_dotenv(override=True)
+        load_environment()
+        # Settings and credentials; one process may sync several targets (see src/targets.py)
+        environ = os.environ if environ is None else environ
 
-        subdomain         = os.environ.get('JIRA_PROJECT_SUBDOMAIN')
-        domain            = os.environ.get('JIRA_DOMAIN')
+        subdomain         = environ.get('JIRA_PROJECT_SUBDOMAIN')
+        domain            = environ.get('JIRA_DOMAIN')
         domain            = domain if domain is not None else 'atlassian.net'
-        checklist_field   = os.environ.get('JIRA_CHECKLIST_CUSTOMFIELD')
+        checklist_field   = environ.get('JIRA_CHECKLIST_CUSTOMFIELD')
 
         if hasattr(args, 'JIRA_PROJECT_KEY') and args.JIRA_PROJECT_KEY is not None:
             self.PROJECT_KEY = args.JIRA_PROJECT_KEY
         else:
-            self.PROJECT_KEY  = os.environ.get('JIRA_PROJECT_KEY')
+            self.PROJECT_KEY  = environ.get('JIRA_PROJECT_KEY')
 
 
         self.args         = args
-        self.baseurl      = f'https://{subdomain}.{domain}/rest/api/2'
-        self.http         = urllib3.PoolManager(ca_certs=certifi.where())
-        self.epic_re      = re.compile(r'^#\s+')
-        self.story_re     = re.compile(r'^##\s+')
-        self.task_re      = re.compile(r'^##\s+')
-        self.subtask_re   = re.compile(r'^###\s+')
-        self.checklist_re = re.compile(r'^\* \[(.*)\] (.*)$')
-        self.epic_id      = ''
-        self.parent_id    = ''
-
-        self.checklist_custom_field = os.environ.get('JIRA_CHECKLIST_CUSTOMFIELD')
+        self.auth_key     = environ.get('JIRA_AUTH_KEY')
+        # JIRA_BASE_URL points md2jira at another server, e.g. src/fake_jira.py
+        base_url          = environ.get('JIRA_BASE_URL') or f'https://{subdomain}.{domain}'
+        base_url          = base_url.rstrip('/')
+        self.site         = urlsplit(base_url).netloc
+        self.browse_url   = f'{base_url}/browse'
+        self.jobs         = max(getattr(args, 'jobs', 1) or 1, 1)
+        self.baseurl      = f'{base_url}/rest/api/2'
+        self.api_v3_baseurl = self.baseurl.replace('/rest/api/2', '/rest/api/3')
+        # Descriptions are written as wiki markup through v2, or as ADF through v3
+        self.write_adf    = bool(getattr(args, 'adf', False) or environ.get('JIRA_WRITE_ADF'))
+        self.write_baseurl = self.api_v3_baseurl if self.write_adf else self.baseurl
+        rate              = getattr(args, 'rate', None) or environ.get('JIRA_RATE_LIMIT')
+        # The connection pool is created by the first request
+        self.transport    = JiraTransport(rate=float(rate) if rate else None, max_in_flight=self.jobs,
+                                          pool_factory=lambda: new_pool_manager(self.jobs))
+
+        # summary -> Issue index filled by prefetch_issues()
+        self.remote_index      = {}
+        self.indexed_summaries = set()
+
+        # source file -> Counter of created/updated/unchanged/failed issues
+        self.stats             = defaultdict(Counter)
+        self.stats_lock        = threading.Lock()
+
+        # Local state lives in the working directory, or in a target's own directory
+        state_dir = getattr(args, 'state_dir', None) or ''
+        # Last synced content hash per issue key, flushed once per run
+        state_db = getattr(args, 'state_db', None) or environ.get('MD2JIRA_STATE_DB')
+        if state_db:
+            self.cache = SqliteSyncCache(state_db, self.site, self.PROJECT_KEY, os.path.join(state_dir, CACHE_FILE))
+        else:
+            self.cache = SyncCache(os.path.join(state_dir, CACHE_FILE))
+        # Hash of every header block as of its last sync, per source file
+        self.sections = SectionIndex(os.path.join(state_dir, SECTIONS_FILE))
+        # --mirror: local copy of the project's issues that lookups answer from
+        mirror = getattr(args, 'mirror', None) or environ.get('MD2JIRA_MIRROR')
+        self.mirror       = IssueMirror(mirror, self.site, self.PROJECT_KEY) if mirror else None
+        self.mirror_lock  = threading.Lock()
+        self.mirror_fresh = False
+
+        self.checklist_custom_field = environ.get('JIRA_CHECKLIST_CUSTOMFIELD')
         self.checklist_enabled      = self.checklist_custom_field is not None
+        self.parser                 = MarkdownParser(self.checklist_enabled)
         self.verbose                = getattr(args, 'verbose', False)
-        self.wba_team               = os.environ.get('JIRA_WBA_TEAM')
+        self.bulk                   = getattr(args, 'bulk', False)
+        self.incremental            = not getattr(args, 'full', False)
+        # plan --offline: decide from the local sync state alone
+        self.offline                = getattr(args, 'offline', False)
+        # --watch: byte-identical sections are skipped without a message
+        self.watching               = False
+        self.wba_team               = environ.get('JIRA_WBA_TEAM')
+
+        # --profile: phase timings, per-endpoint request metrics and cache counters
+        self.profile_path           = getattr(args, 'profile', None)
+        self.profiler               = Profiler() if self.profile_path else NullProfiler()
+        self.parser.convert_description = self.profiler.timed('convert', self.parser.convert_description)
+
+    @property
+    def http(self):
+        return self.transport.http
+
+    @http.setter
+    def http(self, http):
+        self.transport.http = http
 
     def jira_http_call(self, url, verb='GET', body=''):
 
         req_headers={
             'Content-Type': 'application/json',
-            'Authorization': 'Basic {}'.format(os.environ.get('JIRA_AUTH_KEY'))
+            'Authorization': 'Basic {}'.format(self.auth_key)
         }
 
+        # Searches are sent as POST but have no side effects, so may be retried
+        idempotent = verb in IDEMPOTENT_VERBS or url.endswith(IDEMPOTENT_POST_PATHS)
         if verb == 'GET' or verb == 'DELETE':
-            resp = self.http.request(verb, url, headers=req_headers)
+            encoded_data = None
         else:
             encoded_data = body.encode('utf-8')
-            resp         = self.http.request(verb, url, headers=req_headers, body=encoded_data)
+        start = time.perf_counter()
+        resp  = self.transport.request(verb, url, headers=req_headers, body=encoded_data, idempotent=idempotent)
+        self.profiler.record_request(verb, url, resp.status, len(encoded_data or b''), len(resp.data),
+                                     time.perf_counter() - start)
+        if encoded_data is not None:
             if len(resp.data) > 0:
                 json_loads   = json.loads(resp.data.decode('utf-8'))
-                if 'errors' in json_loads:
+                # Bulk endpoints report a list of per-item errors instead
+                if isinstance(json_loads, dict) and isinstance(json_loads.get('errors'), dict):
                     for error in json_loads['errors']:
                         print('{}: {}'.format(error, json_loads['errors'][error]))
 
@@ -67,7 +316,7 @@ class MD2Jira:
 
     def create_issue(self, issue, issue_json):
         """Create new issue directly via JIRA 'issue' API"""
-        url  = '{}/issue'.format(self.baseurl)
+        url  = '{}/issue'.format(self.write_baseurl)
         resp = self.jira_http_call(url, 'POST', issue_json)
         json_loads = json.loads(resp.data.decode('utf-8'))
         errorMessages = json_loads['errorMessages'] if 'errorMessages' in json_loads else None
@@ -93,11 +342,73 @@ class MD2Jira:
                 created_issue.parent_id = issue.parent_id
             issue_key = json_loads['key']
             print (
-                f'Created issue {issue_key}: https://wbinsights.atlassian.net/browse/{issue_key}'
+                f'Created issue {issue_key}: {self.browse_url}/{issue_key}'
             )
             return created_issue
         return None
 
+    def bulk_create_issues(self, issues):
+        """Create new issues via JIRA 'issue/bulk' API, `BULK_CREATE_SIZE` at a time
+
+        Returns a list of (issue, created_issue) pairs, where created_issue is
+        None for every item JIRA rejected.  Rejected items are reported
+        individually.
+        """
+        results = []
+
+        for start in range(0, len(issues), BULK_CREATE_SIZE):
+            chunk    = issues[start:start + BULK_CREATE_SIZE]
+            payloads = [{'fields': self.issue_fields(issue)} for issue in chunk]
+            keys     = self.bulk_create(payloads, [issue.summary for issue in chunk])
+            for issue, key in zip(chunk, keys):
+                if key is None:
+                    results.append((issue, None))
+                    continue
+                created_issue = Issue(
+                    issue.type,
+                    key,
+                    issue.summary,
+                    issue.description,
+                    issue.checklist.text or ''
+                )
+                created_issue.epic_id   = issue.epic_id
+                created_issue.parent_id = issue.parent_id
+                results.append((issue, created_issue))
+
+        return results
+
+    def bulk_create(self, payloads, summaries):
+        """Send one 'issue/bulk' request; returns the new key (or None) per payload"""
+        url        = '{}/issue/bulk'.format(self.write_baseurl)
+        resp       = self.jira_http_call(url, 'POST', json.dumps({'issueUpdates': payloads}))
+        json_loads = json.loads(resp.data.decode('utf-8')) if len(resp.data) > 0 else {}
+
+        failed = {}
+        for error in json_loads.get('errors', []):
+            failed[error.get('failedElementNumber')] = error.get('elementErrors', {})
+        for message in json_loads.get('errorMessages', []):
+            print('The following errors occurred: {}'.format(message))
+
+        keys    = []
+        created = iter(json_loads.get('issues', []))
+        for index, summary in enumerate(summaries):
+            if index in failed:
+                element_errors = failed[index]
+                print('ERROR: unable to create "{}": {}'.format(
+                    summary,
+                    element_errors.get('errors') or element_errors.get('errorMessages')
+                ))
+                keys.append(None)
+                continue
+            created_json = next(created, None)
+            if created_json is None:
+                print('ERROR: unable to create "{}"'.format(summary))
+                keys.append(None)
+                continue
+            print('Created issue {}'.format(created_json['key']))
+            keys.append(created_json['key'])
+        return keys
+
     def read_issue(self, issue_key): 
         """Read issue directly via JIRA 'issue' API"""
         fields = 'summary,description,priority,issuetype'
@@ -120,7 +431,7 @@ class MD2Jira:
 
     def update_issue(self, issue, issue_json):
         """Update existing issue directly via JIRA 'issue' API"""
-        url  = '{}/issue/{}'.format(self.baseurl, issue.key)
+        url  = '{}/issue/{}'.format(self.write_baseurl, issue.key)
         resp = self.jira_http_call(url, 'PUT', issue_json)
         if hasattr(resp, 'status') and resp.status == 204:
             updated_issue = Issue(
@@ -143,143 +454,1058 @@ class MD2Jira:
         return resp
 
     def find_issue(self, issue): 
-        """Locate issue via JIRA 'search' API"""
-        summary_encoded = issue.summary.replace('!','\\\\!')
-        summary_encoded = summary_encoded.replace('-','\\\\-')
-        
-        # Build the fields list - only include checklist field if it's configured
-        fields = 'summary,description,priority,issuetype'
-        if self.checklist_custom_field:
-            fields += f',{self.checklist_custom_field}'
-            
-        # Use API v3 search/jql endpoint (v2 has been deprecated)
-        api_v3_base = self.baseurl.replace('/rest/api/2', '/rest/api/3')
-        url = f'{api_v3_base}/search/jql?jql=project={self.PROJECT_KEY}+AND+summary~"{summary_encoded.replace(" ", "+")}"&fields={fields}'
-        
-        resp        = self.jira_http_call(url)
-        json_loads  = json.loads(resp.data.decode('utf-8'))
-        found_issue = None
-
-        if 'issues' in json_loads and len(json_loads['issues']) > 0:
-            found_issues      = json_loads['issues']
-            actual_issue_list = [i for i in found_issues if i['fields']['summary'] == issue.summary]
-            if len(actual_issue_list) == 0:
+        """Locate issue via JIRA 'search' API
+
+        When prefetch_issues() has already looked up this summary the
+        in-memory index is consulted instead of the network.  With --mirror
+        the summary is looked up in the local mirror, and Jira is only asked
+        for the full issue when its content may need comparing.
+        """
+        if issue.summary in self.indexed_summaries:
+            return self.remote_index.get(issue.summary)
+
+        if self.mirror is not None:
+            self.refresh_mirror()
+            key = self.mirror.find(issue.summary)
+            if key is None:
                 return None
+            if self.cache.is_current(key, self.generate_issue_hash(issue, self.pending_parent_key(issue))):
+                return self.mirrored_issue(key)
+            try:
+                for result in self.search_issues('key = {}'.format(key)):
+                    return self._issue_from_search_result(result)
+            except JiraSearchError as e:
+                print('WARNING: {} is in the mirror but could not be read, searching by summary: {}'.format(key, e))
+
+        jql = 'project = {} AND summary ~ "{}"'.format(self.PROJECT_KEY, self._jql_escape(issue.summary))
+        # Text search matches words, not the whole summary: page until the exact one
+        for result in self.search_issues(jql):
+            if result['fields']['summary'] == issue.summary:
+                return self._issue_from_search_result(result)
+        return None
 
-            actual_issue      = actual_issue_list[0]
-            key    = actual_issue['key']
-            fields = actual_issue['fields']
-
-            # Handle checklist field safely
-            checklist_data = ""
-            if self.checklist_custom_field and self.checklist_custom_field in fields:
-                checklist_data = fields[self.checklist_custom_field]
-    
-            # More robust issue type mapping
-            issue_type_name = fields['issuetype']['name']
-            issue_type_clean = issue_type_name.replace('-','').replace(' ', '')
-            
-            # Try to find the matching IssueType
+    def search_issues(self, jql, fields=None, page_size=SEARCH_PAGE_SIZE):
+        """Yield raw issue dicts matching `jql`, following `nextPageToken`
+
+        Uses the POST form of the v3 search/jql endpoint so long JQL
+        queries are not limited by URL length.
+        """
+        url  = f'{self.api_v3_baseurl}/search/jql'
+        body = {
+            'jql':        jql,
+            'fields':     fields if fields is not None else self._search_fields(),
+            'maxResults': page_size,
+        }
+        while True:
+            resp       = self.jira_http_call(url, 'POST', json.dumps(body))
+            json_loads = json.loads(resp.data.decode('utf-8')) if len(resp.data) > 0 else {}
+            if 'issues' not in json_loads:
+                raise JiraSearchError(
+                    json_loads.get('errorMessages') or 'HTTP {}'.format(getattr(resp, 'status', '?'))
+                )
+            for found in json_loads['issues']:
+                yield found
+            next_page = json_loads.get('nextPageToken')
+            if json_loads.get('isLast', True) or not next_page:
+                break
+            body['nextPageToken'] = next_page
+
+    def prefetch_issues(self, issues):
+        """Resolve every issue summary with a handful of batched JQL searches
+
+        Summaries are OR'ed together `SEARCH_BATCH_SIZE` at a time and the
+        exact-match results are stored in `self.remote_index` so that
+        find_issue() can answer from memory.  A batch whose search fails is
+        left out of the index and falls back to per-issue lookups.
+        """
+        pending = {}
+        for issue in issues:
+            if issue.summary not in self.indexed_summaries and issue.summary not in pending:
+                pending[issue.summary] = issue
+        if self.mirror is not None:
+            self.prefetch_from_mirror(pending)
+            return
+
+        pending = list(pending)
+        for start in range(0, len(pending), SEARCH_BATCH_SIZE):
+            batch   = pending[start:start + SEARCH_BATCH_SIZE]
+            clauses = ' OR '.join('summary ~ "{}"'.format(self._jql_escape(s)) for s in batch)
+            jql     = 'project = {} AND ({})'.format(self.PROJECT_KEY, clauses)
+            found   = {}
             try:
-                issue_type = IssueType.__dict__[issue_type_clean]
-            except KeyError:
-                # Fallback for common mappings
-                type_mapping = {
-                    'SubTask': IssueType.Subtask,
-                    'Task': IssueType.Task,
-                    'Epic': IssueType.Epic,
-                    'Story': IssueType.Story
-                }
-                issue_type = type_mapping.get(issue_type_clean, IssueType.Task)
-            
-            # Handle description field -- API v3 returns Atlassian Document
-            # Format (ADF), a nested JSON dict, instead of wiki-markup text.
-            description = fields.get('description', '')
-            if isinstance(description, dict):
-                description = self.adf_to_text(description)
-            elif description is None:
-                description = ''
-                
-            found_issue =  Issue(
-                issue_type,
-                key,
-                fields['summary'],
-                description,
-                checklist_data 
-            )
-            return found_issue
+                for result in self.search_issues(jql):
+                    summary = result['fields']['summary']
+                    if summary in batch and summary not in found:
+                        found[summary] = self._issue_from_search_result(result)
+            except JiraSearchError as e:
+                print('WARNING: batched lookup failed, falling back to per-issue search: {}'.format(e))
+                continue
+
+            self.remote_index.update(found)
+            self.indexed_summaries.update(batch)
+
+        if self.verbose:
+            print('  [lookup] {} summaries resolved, {} found remotely'.format(
+                len(pending), len(self.remote_index)))
+
+    def prefetch_from_mirror(self, pending):
+        """Resolve the summary -> Issue map `pending` from the local mirror
+
+        Summaries the mirror does not know are not in the project.  Issues
+        whose local content still matches the sync cache are answered from
+        the mirror alone; only the others, whose fields may need comparing,
+        are fetched, by key and `SEARCH_BATCH_SIZE` at a time.
+        """
+        self.refresh_mirror()
+        fetch = {}
+        for summary, issue in pending.items():
+            key = self.mirror.find(summary)
+            if key is None:
+                self.indexed_summaries.add(summary)
+            elif self.cache.is_current(key, self.generate_issue_hash(issue, self.pending_parent_key(issue))):
+                self.remote_index[summary] = self.mirrored_issue(key)
+                self.indexed_summaries.add(summary)
+            else:
+                fetch[key] = summary
+
+        keys = list(fetch)
+        for start in range(0, len(keys), SEARCH_BATCH_SIZE):
+            batch = keys[start:start + SEARCH_BATCH_SIZE]
+            try:
+                for result in self.search_issues('key in ({})'.format(', '.join(batch))):
+                    if result['key'] in fetch:
+                        self.remote_index[fetch[result['key']]] = self._issue_from_search_result(result)
+            except JiraSearchError as e:
+                print('WARNING: batched lookup failed, falling back to per-issue search: {}'.format(e))
+                continue
+            self.indexed_summaries.update(fetch[key] for key in batch)
+
+        if self.verbose:
+            print('  [lookup] {} summaries resolved from the mirror, {} fetched'.format(len(pending), len(fetch)))
+
+    def refresh_mirror(self):
+        """Bring the --mirror copy of the project up to date, once per run or watch round
+
+        The first scan pages through the whole project; later ones only ask
+        for issues updated since the newest timestamp seen (with `>=`, as JQL
+        dates stop at the minute).  --full forces a complete scan, which
+        also forgets deleted issues.  Issues edited in Jira by someone else
+        since they were last scanned are reported as drift.
+        """
+        with self.mirror_lock:
+            if self.mirror_fresh:
+                return []
+            full = self.mirror.last_sync is None or not self.incremental
+            jql  = 'project = {}'.format(self.PROJECT_KEY)
+            if not full:
+                jql += ' AND updated >= "{}"'.format(self.mirror.last_sync)
+            entries = {}
+            with self.profiler.phase('lookup'):
+                for result in self.search_issues(jql):
+                    remote = self._issue_from_search_result(result)
+                    parent = remote.epic_id if remote.type is IssueType.Task else remote.parent_id
+                    entries[remote.key] = [remote.summary, remote.type.name, parent, remote.updated,
+                                           self.fingerprint(remote)]
+            drifted = self.mirror.update(entries, full)
+            self.mirror_fresh = True
+
+        self.profiler.count('mirror_scanned', len(entries))
+        self.profiler.count('mirror_drift', len(drifted))
+        if self.verbose:
+            print('  [mirror] {} scan: {} issues'.format('full' if full else 'incremental', len(entries)))
+        if drifted:
+            print('WARNING: {} issue(s) edited in Jira since the last sync:'.format(len(drifted)))
+            for key in drifted:
+                print('  {}: "{}"'.format(key, entries[key][0]))
+        return drifted
+
+    def mirrored_issue(self, key):
+        """Return an Issue with the key, summary, type, parent and `updated` the mirror holds for `key`"""
+        entry = self.mirror.get(key)
+        if entry is None:
+            return None
+        summary, type_name, parent, updated, _fingerprint = entry
+        issue           = Issue(IssueType[type_name], key, summary)
+        issue.updated   = updated
+        issue.epic_id   = parent
+        issue.parent_id = parent
+        return issue
+
+    def pending_parent_key(self, issue):
+        """The key the issue's parent is expected to get while it has none yet
+
+        That is the key its section was last synced to, or else the one the
+        mirror holds for its summary.  Lookups made ahead of syncing (the
+        prefetch filter, the mirror) compare link hashes against it.
+        """
+        parent = issue.parent
+        if parent is None or parent.key:
+            return None
+        if parent.source_file and parent.header_path:
+            cached = self.cache.find_by_identity(parent.source_file, parent.header_path)
+            if cached is not None:
+                return cached[0]
+        if self.mirror is not None:
+            return self.mirror.find(parent.summary)
         return None
 
+    def remember_written(self, issue):
+        """Record an issue this run created or updated in the mirror"""
+        if self.mirror is not None and issue.key:
+            self.mirror.put(issue.key, issue.summary, issue.type.name, self.parent_link(issue))
+
+    def fingerprint(self, issue):
+        """Hash of the content md2jira writes to an issue: summary, description, links and checklist
+
+        ADF descriptions are hashed in canonical form, so formatting Jira
+        adds on write does not change the fingerprint.
+        """
+        if issue.description_adf is not None:
+            description = repr(adf.canonical_adf(issue.description_adf))
+        else:
+            description = self._normalise_for_compare(issue.description)
+        text = '\0'.join([issue.summary, description, issue.epic_id or '', issue.parent_id or '',
+                          issue.checklist.text])
+        return hashlib.md5(text.encode()).hexdigest()
+
+    def _issue_from_search_result(self, result):
+        """Build an Issue from one entry of a search/jql response"""
+        key    = result['key']
+        fields = result['fields']
+
+        # Handle checklist field safely
+        checklist_data = ""
+        if self.checklist_custom_field and self.checklist_custom_field in fields:
+            checklist_data = fields[self.checklist_custom_field]
+
+        # More robust issue type mapping
+        issue_type_name = fields['issuetype']['name']
+        issue_type_clean = issue_type_name.replace('-','').replace(' ', '')
+        
+        # Try to find the matching IssueType ('Sub-Task' is a Sub-task too)
+        try:
+            issue_type = IssueType.__dict__[issue_type_clean]
+            if issue_type is IssueType.SubTask:
+                issue_type = IssueType.Subtask
+        except KeyError:
+            # Fallback for common mappings
+            type_mapping = {
+                'SubTask': IssueType.Subtask,
+                'Task': IssueType.Task,
+                'Epic': IssueType.Epic,
+                'Story': IssueType.Story
+            }
+            issue_type = type_mapping.get(issue_type_clean, IssueType.Task)
+        
+        # Handle description field -- API v3 returns Atlassian Document
+        # Format (ADF), a nested JSON dict, instead of wiki-markup text.
+        description     = fields.get('description', '')
+        description_adf = None
+        if isinstance(description, dict):
+            description_adf = description
+            description     = self.adf_to_text(description)
+        elif description is None:
+            description = ''
+            
+        found_issue = Issue(
+            issue_type,
+            key,
+            fields['summary'],
+            description,
+            checklist_data 
+        )
+        found_issue.description_adf = description_adf
+        found_issue.updated         = fields.get('updated')
+        # Newer Jira sites link Tasks to their Epic through `parent` too
+        found_issue.parent_id       = (fields.get('parent') or {}).get('key')
+        found_issue.epic_id         = fields.get('customfield_10014') or found_issue.parent_id
+        return found_issue
+
+    def _search_fields(self):
+        """Fields requested from the search API"""
+        fields = ['summary', 'description', 'priority', 'issuetype', 'updated', 'parent', 'customfield_10014']
+        # Only include checklist field if it's configured
+        if self.checklist_custom_field:
+            fields.append(self.checklist_custom_field)
+        return fields
+
+    @staticmethod
+    def _jql_escape(summary):
+        """Escape a summary for use inside a quoted JQL text search"""
+        summary_encoded = summary.replace('\\', '\\\\')
+        summary_encoded = summary_encoded.replace('"', '\\"')
+        summary_encoded = summary_encoded.replace('!','\\\\!')
+        summary_encoded = summary_encoded.replace('-','\\\\-')
+        return summary_encoded
+
     def parse_markdown(self):
-        fh           = open(self.args.INFILE, 'r', encoding='utf-8')
-        lines        = fh.readlines()
-        issues       = []
-        issue_type   = IssueType.NONE
-        parser_state = ParserState.DETECT_ISSUE
-        summary      = None
+        paths = expand_inputs(self.args.INFILE)
+        try:
+            if len(paths) == 1:
+                self.sync_file(paths[0])
+            else:
+                self.sync_files(paths)
+                self.print_summary()
+            self.print_transport_report()
+        finally:
+            # Also runs on KeyboardInterrupt so finished work is not lost
+            self.finish_run()
+
+    def watch_markdown(self, stop=None, watcher=None):
+        """Sync the inputs, then re-sync each file as soon as it is saved, until interrupted
+
+        The process stays resident, so the connection pool stays warm and
+        the sync cache and section index stay in memory.  Each save only
+        re-parses the sections whose bytes changed; every other section
+        resolves from the section index without a request.
+        """
+        expand = lambda: expand_inputs(self.args.INFILE)
+        paths  = expand()
+        state  = snapshot(paths)
+        if watcher is None:
+            watcher = open_watcher(expand, watch_directories(self.args.INFILE, paths),
+                                   input_directories(self.args.INFILE))
+        try:
+            self.sync_round(paths)
+            self.watching = True
+            print('Watching {} file(s) for changes, Ctrl-C to stop'.format(len(paths)))
+            for changed in watch_changes(expand, watcher, state, stop=stop):
+                self.sync_round(changed)
+        except KeyboardInterrupt:
+            print('Stopped watching')
+        finally:
+            self.finish_run()
+
+    def sync_round(self, paths):
+        """Sync `paths` once in watch mode, persisting the result straight away"""
+        started = time.perf_counter()
+        before  = self._outcome_totals()
+        # Each round picks up what changed in Jira meanwhile
+        self.mirror_fresh = False
+        for path in paths:
+            try:
+                self.sync_file(path)
+            except Exception as e:
+                # The daemon outlives a file that fails to sync
+                print('ERROR: unable to sync {}: {}'.format(path, e))
+        self.cache.flush()
+        self.sections.flush()
+        if self.mirror is not None:
+            self.mirror.flush()
+        print('Synced {} in {:.2f}s: {}'.format(
+            ', '.join(paths), time.perf_counter() - started,
+            self._format_counts(self._outcome_totals() - before)))
+
+    def _outcome_totals(self):
+        total = Counter()
+        for counts in self.stats.values():
+            total.update(counts)
+        return total
+
+    def finish_run(self):
+        """Flush the sync cache, section index and mirror, and write the --profile report"""
+        with self.profiler.phase('cache_flush'):
+            self.cache.flush()
+            self.sections.flush()
+            if self.mirror is not None:
+                self.mirror.flush()
+        if self.profiler.enabled:
+            self.write_profile()
+
+    def open_issues(self, path):
+        """Open `path` and return (file, iterator of its Issues)
+
+        Unless --full is given, header blocks unchanged since their last
+        sync come back as stubs (see iter_issues_incremental()).
+        """
+        source_file = os.path.normpath(path)
+        if self.incremental:
+            fh     = open(path, 'rb')
+            issues = self.parser.iter_issues_incremental(
+                fh, source_file, self.sections.sections(source_file), self.section_salt())
+        else:
+            fh     = open(path, 'r', encoding='utf-8')
+            issues = self.iter_issues(fh, source_file)
+        return fh, self.profiler.timed_iter('parse', issues)
+
+    def sync_file(self, path):
+        source_file = os.path.normpath(path)
+        fh, issues  = self.open_issues(path)
+
+        # Sections of the last run not seen in this one are forgotten afterwards
+        stale = set(self.sections.sections(source_file))
+        def track(issues):
+            for issue in issues:
+                stale.discard(issue.header_path)
+                yield issue
+
+        with fh:
+            if self.bulk or self.jobs > 1:
+                # Level-by-level and concurrent syncs need the whole tree
+                self.sync_issues(list(track(issues)))
+            else:
+                # Linked while parsing, so streamed windows still see their parents
+                self.sync_stream(DocumentTree.stream(track(issues)))
+        self.sections.forget(source_file, stale)
+
+    def section_salt(self):
+        """Everything besides a block's bytes that changes the Issue built from it"""
+        return '{}:{}:{}:{}:{}:{}'.format(
+            SECTION_HASH_VERSION, HASH_VERSION, CONVERTER_VERSION, self.checklist_enabled,
+            self.site, self.PROJECT_KEY)
+
+    def sync_files(self, paths):
+        """Parse `paths` in parallel worker processes and sync them in order
+
+        Every file goes through this instance, so they all share one
+        connection pool, lookup code path and cache.  Files are synced in
+        the order given while the remaining ones are still being parsed.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(len(paths), os.cpu_count() or 1)
+        known   = [
+            self.sections.sections(os.path.normpath(path)) if self.incremental else None
+            for path in paths
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = pool.map(
+                parse_file,
+                paths,
+                [self.checklist_enabled] * len(paths),
+                known,
+                [self.section_salt()] * len(paths),
+            )
+            # Parsing happens in the workers: time spent waiting for them
+            for path, issues in zip(paths, self.profiler.timed_iter('parse', parsed)):
+                if self.verbose:
+                    print('  [file] {}: {} issues'.format(path, len(issues)))
+                self.link_hierarchy(issues)
+                self.sync_issues(issues)
+                self.sections.retain(os.path.normpath(path), [i.header_path for i in issues])
+                self.remote_index.clear()
+                self.indexed_summaries.clear()
 
-        for line in lines:
-            stripped   = line.strip()
-            issue_type = self.detect_issue(stripped)
-
-            if issue_type is IssueType.Epic:
-                summary = '{}'.format(re.sub(self.epic_re, '', stripped))
-                stripped = 'EPIC FOUND: {}'.format(re.sub(self.epic_re, '', stripped))
-            elif issue_type is IssueType.Task:
-                summary = '{}'.format(re.sub(self.task_re, '', stripped))
-                stripped = 'STORY FOUND: {}'.format(re.sub(self.task_re, '', stripped))
-            elif issue_type is IssueType.Subtask:
-                summary = '{}'.format(re.sub(self.subtask_re, '', stripped))
-                stripped = 'Subtask FOUND: {}'.format(re.sub(self.subtask_re, '', stripped))
-
-            if parser_state is ParserState.DETECT_ISSUE and issue_type in [IssueType.Epic, IssueType.Task, IssueType.Subtask]:
-                issues.append(Issue(issue_type, '', summary))
-                parser_state = ParserState.COLLECT_DESCRIPTION
+    def iter_issues(self, lines, source_file=''):
+        """Yield each Issue in `lines` as soon as the next header completes it"""
+        return self.parser.iter_issues(lines, source_file)
 
-            elif parser_state is ParserState.COLLECT_DESCRIPTION:
+    def detect_issue(self, _str):
+        return self.parser.detect_issue(_str)
 
-                if issue_type is IssueType.Checklist:
-                    if hasattr(issues[-1], 'checklist') is False:
-                        issues[-1].checklist = Checklist()
-                    matches = re.match(self.checklist_re, stripped)
-                    status, item_text = matches.group(1, 2)
-                    item   = ChecklistItem(item_text, status)
-                    issues[-1].checklist.append(item)
+    def md2wiki(self, _str):
+        """Convert certain markdown to JIRA Wiki format"""
+        return self.parser.md2wiki(_str)
 
-                elif issue_type is IssueType.NONE:
-                    issues[-1].description += '{}\n'.format(self.md2wiki(stripped))
+    def sync_stream(self, issues):
+        """Sync issues while the rest of the document is still being parsed
 
+        A parser thread feeds a bounded queue (so it can never run more than
+        `PIPELINE_QUEUE_SIZE` issues ahead) and this thread syncs whatever
+        is ready in windows of up to `SEARCH_BATCH_SIZE` issues, so memory
+        stays flat and network work overlaps with parsing.
+        """
+        pipeline = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop     = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pipeline.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce():
+            try:
+                for issue in issues:
+                    put(issue)
+                    if stop.is_set():
+                        return
+            except BaseException as e:
+                put(_PipelineError(e))
+            else:
+                put(_PIPELINE_END)
+
+        producer = threading.Thread(target=produce, name='md2jira-parser', daemon=True)
+        producer.start()
+        try:
+            finished = False
+            while not finished:
+                window = [pipeline.get()]
+                while len(window) < SEARCH_BATCH_SIZE and window[-1] is not _PIPELINE_END \
+                        and not isinstance(window[-1], _PipelineError):
+                    try:
+                        window.append(pipeline.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if window[-1] is _PIPELINE_END:
+                    window.pop()
+                    finished = True
+                elif isinstance(window[-1], _PipelineError):
+                    raise window[-1].error
+
+                self.sync_issues(window)
+                # Lookups are only needed for the current window
+                self.remote_index.clear()
+                self.indexed_summaries.clear()
+        finally:
+            stop.set()
+
+    def sync_issues(self, issues):
+        """Look up every issue in bulk, then process them in document order"""
+        if len(issues) == 0:
+            return
+        # Issues answered by the local cache never touch the network
+        with self.profiler.phase('lookup'):
+            self.prefetch_issues([i for i in issues if self.find_cached_issue(i) is None])
+        if self.bulk:
+            self.sync_issues_bulk(issues)
+            return
+        if self.jobs > 1:
+            self.sync_issues_concurrent(issues)
+            return
+        for issue in issues:
+            self.process_issue(issue)
+
+    def sync_issues_concurrent(self, issues):
+        """Sync independent subtrees on a pool of `self.jobs` workers
+
+        Every node of the document tree is scheduled as soon as its
+        parent's key has resolved, so sibling Epics (and sibling Tasks
+        within an Epic) proceed in parallel.  Children of an issue that
+        failed to sync are skipped.
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        tree = self.link_hierarchy(issues)
+        # Workers run in the caller's context (e.g. the target name src/targets.py prefixes output with)
+        submit = lambda pool, issue: pool.submit(contextvars.copy_context().run, self.process_issue, issue)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            running = {submit(pool, tree.nodes[index]): index for index in tree.roots()}
+            while running:
+                done, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    issue = tree.nodes[index]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print('ERROR: unable to sync "{}": {}'.format(issue.summary, e))
+                        self.record_outcome(issue, 'failed')
+                    if tree.resolved(index):
+                        for child in tree.children[index]:
+                            running[submit(pool, tree.nodes[child])] = child
+                    else:
+                        self._report_skipped_children(tree, index)
+
+    def _report_skipped_children(self, tree, index):
+        for child in tree.descendants(index):
+            issue = tree.nodes[child]
+            print('ERROR: unable to sync "{}": parent "{}" was not synced'.format(
+                issue.summary, tree.nodes[tree.parents[child]].summary))
+            self.record_outcome(issue, 'failed')
+
+    def sync_issues_bulk(self, issues):
+        """Sync one level of the document tree at a time, bulk-creating new issues
+
+        All Epics are handled first, then all Tasks, then all Sub-tasks, so
+        every new child can be linked to a parent key that already exists.
+        """
+        tree = self.link_hierarchy(issues)
+
+        for level in (IssueType.Epic, IssueType.Task, IssueType.Subtask):
+            pending = []
+            for index in tree.level(level):
+                issue = tree.nodes[index]
+                error = tree.link_error(issue)
+                if error:
+                    print('ERROR: unable to sync "{}": {}'.format(issue.summary, error))
+                    self.record_outcome(issue, 'failed')
+                    continue
+
+                with self.profiler.phase('lookup'):
+                    new = self.find_cached_issue(issue) is None and self.find_issue(issue) is None
+                if new:
+                    pending.append(issue)
                 else:
-                    self.process_issue(issues[-1])
-                    issues.append(Issue(issue_type, '', summary))
+                    self.process_issue(issue)
 
-        # Process final issue
-        self.process_issue(issues[-1])
-        fh.close()
+            with self.profiler.phase('write'):
+                created = self.bulk_create_issues(pending)
+            for issue, created_issue in created:
+                if created_issue is not None:
+                    self._record_created_issue(issue, created_issue)
+                else:
+                    self.record_outcome(issue, 'failed')
 
-    def detect_issue(self, _str):
-        issue_type = IssueType.NONE
+    @staticmethod
+    def link_hierarchy(issues):
+        """Build the DocumentTree of `issues` (see DocumentTree.add()) and return it"""
+        return DocumentTree(issues)
+
+    def export_markdown(self, jql, output):
+        """Write the issues matching `jql` to `output` as Markdown, Epic → Task → Sub-task
+
+        A listing pass pages through the query asking only for each issue's
+        type and parent, which fixes the document order.  Full issues are
+        then fetched SEARCH_PAGE_SIZE keys at a time, with up to --jobs
+        searches in flight, and each batch is converted and written as soon
+        as the batches before it are.  Every exported section is recorded in
+        the sync cache, so syncing the file straight back sends no requests.
+        """
+        try:
+            with self.profiler.phase('lookup'):
+                nodes = self.list_hierarchy(jql)
+            order, skipped = export_order(nodes)
+            for key in skipped:
+                print('WARNING: {} skipped, its parent Task is not part of the export'.format(key))
+            written = self.write_export(order, output)
+            print('Exported {} issues to {}'.format(written, output))
+            self.print_transport_report()
+        finally:
+            self.finish_run()
+
+    def list_hierarchy(self, jql):
+        """Return {key: (kind, parent key)} for every issue matching `jql`"""
+        nodes = {}
+        for result in self.search_issues(jql, EXPORT_LIST_FIELDS, page_size=EXPORT_LIST_PAGE_SIZE):
+            fields = result['fields']
+            parent = (fields.get('parent') or {}).get('key') or fields.get('customfield_10014')
+            nodes[result['key']] = (hierarchy_kind(fields.get('issuetype')), parent)
+        return nodes
+
+    def write_export(self, order, output):
+        """Fetch, convert and write the issues in `order`; return how many were written"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        source_file  = os.path.normpath(output)
+        batches      = [order[i:i + SEARCH_PAGE_SIZE] for i in range(0, len(order), SEARCH_PAGE_SIZE)]
+        header_stack = []
+        written      = 0
+        with open(output, 'w', encoding='utf-8') as fh, ThreadPoolExecutor(self.jobs) as pool:
+            for batch, found in ordered_window(pool, self.fetch_export_batch, batches, 2 * self.jobs):
+                for key, depth in batch:
+                    if key not in found:
+                        print('WARNING: {} no longer matches the query, skipped'.format(key))
+                        continue
+                    issue = self._issue_from_search_result(found[key])
+                    with self.profiler.phase('convert'):
+                        text = self.wiki2md(issue, depth)
+                    fh.write(text)
+                    del header_stack[depth - 1:]
+                    self.seed_exported(issue, text, header_stack, source_file)
+                    written += 1
+        return written
+
+    def fetch_export_batch(self, batch):
+        """Search for the full issues of one export batch; returns {key: search result}"""
+        jql = 'key in ({})'.format(', '.join(key for key, _depth in batch))
+        with self.profiler.phase('lookup'):
+            return {result['key']: result for result in self.search_issues(jql)}
+
+    def seed_exported(self, issue, text, header_stack, source_file):
+        """Record the exported section of `issue` in the sync cache
+
+        The section is parsed back exactly as a sync of the file will parse
+        it, so its content hash and header path match on the next run.
+        """
+        parsed = next(self.parser.iter_issues(text.splitlines(True), source_file))
+        header_stack.append(parsed.summary)
+        self.cache.put(
+            issue.key,
+            parsed.summary,
+            self.generate_issue_hash(parsed, self.parent_link(issue)),
+            source_file=source_file,
+            header_path=HEADER_PATH_SEPARATOR.join(header_stack),
+            remote_updated=issue.updated,
+        )
+
+    def validate_markdown(self):
+        """Check the input files without contacting Jira; returns the number of errors
+
+        Every file is parsed in full, as a sync would parse it.  Errors are
+        problems a sync fails on (a Sub-task with no Task above it, a file
+        that cannot be parsed); warnings are likely mistakes (a summary
+        used twice, so both sections sync to one issue, or a code block
+        that is never closed).
+        """
+        errors    = 0
+        warnings  = 0
+        summaries = {}
+        paths     = expand_inputs(self.args.INFILE)
+        total     = 0
+        for path in paths:
+            source_file = os.path.normpath(path)
+            try:
+                with open(path, 'r', encoding='utf-8') as fh:
+                    lines = fh.readlines()
+                issues = list(self.iter_issues(lines, source_file))
+            except Exception as e:
+                print('ERROR: {}: cannot be parsed: {}'.format(source_file, e))
+                errors += 1
+                continue
+            total += len(issues)
+
+            fence = None
+            for line in lines:
+                stripped = line.strip()
+                if fence is not None or stripped[:1] in FENCE_CHARS:
+                    fence = track_fence(fence, stripped)
+            if fence is not None:
+                print('WARNING: {}: a code block is never closed, the rest of the file is one description'.format(
+                    source_file))
+                warnings += 1
+
+            tree = self.link_hierarchy(issues)
+            for index, issue in enumerate(tree.nodes):
+                location = '{}: {}'.format(source_file, issue.header_path)
+                if issue.type is IssueType.Subtask and tree.parents[index] is None:
+                    print('ERROR: {}: Sub-task has no Task above it'.format(location))
+                    errors += 1
+                if issue.summary in summaries:
+                    print('WARNING: {}: summary also used at {}; both sync to the same issue'.format(
+                        location, summaries[issue.summary]))
+                    warnings += 1
+                else:
+                    summaries[issue.summary] = location
 
-        if self.epic_re.match(_str):
-            issue_type = IssueType.Epic
-        elif self.task_re.match(_str):
-            issue_type = IssueType.Task
-        elif self.subtask_re.match(_str):
-            issue_type = IssueType.Subtask
-        elif self.checklist_enabled and self.checklist_re.match(_str):
-            issue_type = IssueType.Checklist
+        print('{} files, {} issues: {} errors, {} warnings'.format(len(paths), total, errors, warnings))
+        return errors
 
-        return issue_type
+    def convert_markdown(self, output):
+        """Write what a sync would send for each issue's description and checklist, as JSON
+
+        Descriptions are wiki markup, or ADF with --adf.  Nothing is looked
+        up or written, so this shows the conversion of a document offline.
+        """
+        converted = []
+        for path in expand_inputs(self.args.INFILE):
+            with open(path, 'r', encoding='utf-8') as fh:
+                for issue in self.iter_issues(fh, os.path.normpath(path)):
+                    entry = {
+                        'type':        issue.type.name,
+                        'summary':     issue.summary,
+                        'source_file': issue.source_file,
+                        'header_path': issue.header_path,
+                        'description': self.description_text(issue),
+                    }
+                    if self.write_adf:
+                        entry['description'] = adf.wiki_to_adf(entry['description'])
+                    if self.checklist_enabled and issue.checklist.items:
+                        entry['checklist'] = self.format_checklist(issue.checklist)
+                    converted.append(entry)
+        if output == '-':
+            json.dump(converted, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+            return converted
+        with open(output, 'w', encoding='utf-8') as fh:
+            json.dump(converted, fh, indent=2)
+            fh.write('\n')
+        print('Converted {} issues to {}'.format(len(converted), output))
+        return converted
+
+    def plan_markdown(self, output):
+        """Write a plan for syncing the input files to `output`, without writing to Jira"""
+        paths = expand_inputs(self.args.INFILE)
+        try:
+            plan = self.build_plan(paths)
+        finally:
+            # The mirror holds Jira's state, not ours: keep what the lookups scanned
+            if self.mirror is not None:
+                self.mirror.flush()
+            if self.profiler.enabled:
+                self.write_profile()
+        save_plan(plan, output)
+        # Keep stdout clean when the plan itself goes there
+        out = sys.stderr if output == '-' else sys.stdout
+        print('Plan: {create} to create, {update} to update, {skip} unchanged'.format(**plan['summary']), file=out)
+        if plan.get('offline'):
+            print('Made from the local sync state only; run "md2jira plan" without --offline to apply it', file=out)
+        else:
+            print('Applying it takes {total} requests ({lookup} spent on lookups while planning)'.format(
+                **plan['requests']), file=out)
+        return plan
+
+    def build_plan(self, paths):
+        """Decide create/update/skip for every issue in `paths`
+
+        Remote state is resolved with the same batched lookups a sync uses,
+        and nothing is written: not to Jira, the sync cache or the section
+        index.  Every entry carries the fields apply will send, except
+        links to parents that do not exist yet, which apply fills in.
+        With --offline nothing is looked up either (see plan_offline()).
+        """
+        requests = self.transport.report()['requests']
+        trees    = []
+        for path in paths:
+            fh, file_issues = self.open_issues(path)
+            with fh:
+                trees.append(self.link_hierarchy(file_issues))
+
+        if not self.offline:
+            with self.profiler.phase('lookup'):
+                self.prefetch_issues([i for tree in trees for i in tree.nodes if self.find_cached_issue(i) is None])
+        # Entry ids number the nodes of every file's tree in turn
+        entries = []
+        for tree in trees:
+            base = len(entries) + 1
+            for index, issue in enumerate(tree.nodes):
+                parent = tree.parents[index]
+                entry  = self.plan_issue(issue, base + index, None if parent is None else base + parent)
+                if parent is not None and entries[base + parent - 1]['action'] == 'create':
+                    self.plan_relink(issue, entry)
+                entries.append(entry)
+        return new_plan(self.site, self.PROJECT_KEY, self.write_adf, entries,
+                        self.transport.report()['requests'] - requests, BULK_CREATE_SIZE,
+                        offline=self.offline)
+
+    def plan_issue(self, issue, number, parent=None):
+        """Return plan entry `number` for one issue; `parent` is its parent's entry, planned first"""
+        entry = {
+            'id':            number,
+            'action':        'skip',
+            'type':          issue.type.name,
+            'summary':       issue.summary,
+            'key':           issue.key or None,
+            'parent':        parent,
+            'reasons':       [],
+            'source_file':   issue.source_file,
+            'header_path':   issue.header_path,
+            'source_offset': issue.source_offset,
+            'source_length': issue.source_length,
+            'source_hash':   issue.source_hash,
+        }
+        if issue.type is IssueType.Subtask and issue.parent is None:
+            entry['reasons'].append({'field': None, 'reason': 'no parent Task in the document'})
+            return entry
+
+        # parent_link() finds the parent's key when it already exists; apply links the rest
+        cached_key = self.find_cached_issue(issue)
+        if cached_key is not None:
+            issue.key    = entry['key'] = cached_key
+            entry['reasons'].append({'field': None, 'reason': 'unchanged since last sync'})
+            return entry
+        if self.offline:
+            return self.plan_offline(issue, entry)
+
+        with self.profiler.phase('lookup'):
+            remote_issue = self.find_issue(issue)
+        entry['cache_hash'] = self.content_hash(issue)
+        if remote_issue is None:
+            entry['action'] = 'create'
+            entry['reasons'].append({'field': None, 'reason': 'not found in Jira'})
+            entry['fields'] = self.issue_fields(issue)
+            return entry
+
+        issue.key    = entry['key'] = remote_issue.key
+        issue.type   = remote_issue.type
+        issue.updated = remote_issue.updated
+        if self.check_issue_cache_hash(issue.key, self.generate_issue_hash(issue)):
+            entry['reasons'].append({'field': None, 'reason': 'content hash matches the sync cache'})
+            return entry
+        with self.profiler.phase('diff'):
+            changes = self.remote_changes(issue, remote_issue)
+        if not changes:
+            entry['reasons'].append({'field': None, 'reason': 'matches Jira'})
+            return entry
+        entry['action']  = 'update'
+        entry['reasons'] = changes
+        entry['fields']  = self.update_fields(issue, changes)
+        return entry
+
+    def plan_relink(self, issue, entry):
+        """Make a skipped existing child of a parent the plan creates an update
+
+        Its link could not be compared while the parent had no key, so
+        apply sends it once the parent is created.
+        """
+        if entry['action'] != 'skip' or not entry['key']:
+            return
+        entry['action']     = 'update'
+        entry['reasons']    = [{'field': 'parent', 'reason': 'parent is created by this plan'}]
+        entry['fields']     = {}
+        entry['cache_hash'] = self.content_hash(issue)
+
+    def plan_offline(self, issue, entry):
+        """Plan an issue whose section changed, from the sync state alone
+
+        A section synced before is an update of the issue it was synced
+        to; anything else is a create.  Jira is not searched, so neither
+        is checked against it and such a plan cannot be applied.
+        """
+        entry['cache_hash'] = self.content_hash(issue)
+        known = self.cache.find_by_identity(issue.source_file, issue.header_path)
+        if known is not None and (not self.PROJECT_KEY or known[0].startswith('{}-'.format(self.PROJECT_KEY))):
+            issue.key = entry['key'] = known[0]
+            entry['action']  = 'update'
+            entry['reasons'] = [{'field': None, 'reason': 'changed since last sync (not compared with Jira)'}]
+            entry['fields']  = self.issue_fields(issue, updating=True)
+            return entry
+        entry['action'] = 'create'
+        entry['reasons'].append({'field': None, 'reason': 'not in the sync state (Jira not searched)'})
+        entry['fields'] = self.issue_fields(issue)
+        return entry
+
+    def apply_plan(self, plan):
+        """Execute a plan made by build_plan()
+
+        New issues are bulk-created one hierarchy level at a time, with
+        the chunks of each level sent in parallel on `self.jobs` workers,
+        then all updates are sent in parallel.  Skipped issues only seed
+        the sync cache.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        check_plan(plan, self.site, self.PROJECT_KEY, self.write_adf)
+        entries = plan['issues']
+        planned = {entry['id']: entry['key'] for entry in entries}
+        keys    = dict(planned)
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                for level in creation_levels(entries):
+                    ready = [entry for entry in level if self._link_planned(entry, keys)]
+                    chunks = [ready[start:start + BULK_CREATE_SIZE]
+                              for start in range(0, len(ready), BULK_CREATE_SIZE)]
+                    with self.profiler.phase('write'):
+                        results = list(pool.map(self._apply_creates, chunks))
+                    for chunk, created in zip(chunks, results):
+                        for entry, key in zip(chunk, created):
+                            keys[entry['id']] = key
+                            self._record_planned(entry, key, 'created' if key else 'failed',
+                                                 self._planned_link(entry, planned))
+
+                # Updates only carry a link when it changed, or when their
+                # parent was created just now
+                created = {entry['id'] for entry in entries if entry['action'] == 'create'}
+                updates = [entry for entry in entries if entry['action'] == 'update' and
+                           (entry['parent'] not in created or self._link_planned(entry, keys))]
+                with self.profiler.phase('write'):
+                    results = list(pool.map(self._apply_update, updates))
+                for entry, updated in zip(updates, results):
+                    self._record_planned(entry, entry['key'], 'updated' if updated else 'failed',
+                                         self._planned_link(entry, planned))
+
+            for entry in entries:
+                if entry['action'] == 'skip':
+                    self._record_planned(entry, entry['key'], 'unchanged' if entry['key'] else 'failed',
+                                         self._planned_link(entry, planned))
+            self.print_summary()
+            self.print_transport_report()
+        finally:
+            self.finish_run()
+
+    def _link_planned(self, entry, keys):
+        """Add the parent link to `entry`'s fields; False if its parent has no key"""
+        if entry['parent'] is None:
+            return True
+        parent_key = keys.get(entry['parent'])
+        if not parent_key:
+            print('ERROR: unable to sync "{}": parent was not synced'.format(entry['summary']))
+            self._record_planned(entry, None, 'failed')
+            return False
+        if entry['type'] == IssueType.Task.name:
+            entry['fields']['customfield_10014'] = parent_key
+        elif entry['type'] == IssueType.Subtask.name:
+            entry['fields']['parent'] = {'key': parent_key}
+        return True
+
+    def _apply_creates(self, chunk):
+        return self.bulk_create([{'fields': entry['fields']} for entry in chunk],
+                                [entry['summary'] for entry in chunk])
+
+    def _apply_update(self, entry):
+        url  = '{}/issue/{}'.format(self.write_baseurl, entry['key'])
+        resp = self.jira_http_call(url, 'PUT', json.dumps({'fields': entry['fields']}))
+        if resp.status == 204:
+            print('{} updated'.format(entry['key']))
+            return True
+        print('{} NOT updated'.format(entry['key']))
+        return False
+
+    @staticmethod
+    def _planned_link(entry, planned):
+        """The key a Task or Sub-task entry is linked to after apply
+
+        That is the link apply sent, or else the key its parent had when
+        the plan compared the link; a parent created by apply was never
+        linked to unless the link was sent.
+        """
+        fields = entry.get('fields') or {}
+        link   = fields.get('customfield_10014') or (fields.get('parent') or {}).get('key')
+        if link is None and entry['type'] in (IssueType.Task.name, IssueType.Subtask.name):
+            link = planned.get(entry['parent'])
+        return link
+
+    def _record_planned(self, entry, key, outcome, parent_key=None):
+        """Record the outcome of one plan entry in the stats, cache and section index
+
+        Plan entries hold the content hash; the sync cache gets it combined
+        with `parent_key`, the link the issue has after apply.
+        """
+        issue = Issue(IssueType[entry['type']], key or '', entry['summary'])
+        issue.source_file   = entry['source_file']
+        issue.header_path   = entry['header_path']
+        issue.source_offset = entry['source_offset']
+        issue.source_length = entry['source_length']
+        issue.source_hash   = entry['source_hash']
+        if outcome != 'failed' and entry.get('cache_hash'):
+            self.cache.put(key, entry['summary'], link_hash(entry['cache_hash'], parent_key),
+                           source_file=issue.source_file or None, header_path=issue.header_path or None)
+        if outcome in ('created', 'updated') and self.mirror is not None:
+            self.mirror.put(key, entry['summary'], entry['type'], parent_key)
+        self.record_outcome(issue, outcome)
+
+    def find_cached_issue(self, issue):
+        """Return the key of `issue` if its section was last synced with identical content
+
+        The section is identified by its source file and header path (which
+        ends with the summary), so this answers without any HTTP request.
+        """
+        if issue.unchanged:
+            return issue.key
+        if not issue.source_file or not issue.header_path:
+            return None
+        cached = self.cache.find_by_identity(issue.source_file, issue.header_path)
+        if cached is None:
+            return None
+        key, hash = cached
+        # The TSV cache is shared by every project synced from this directory
+        if self.PROJECT_KEY and not key.startswith('{}-'.format(self.PROJECT_KEY)):
+            return None
+        if hash != self.generate_issue_hash(issue, self.pending_parent_key(issue)):
+            return None
+        return key
 
     def process_issue(self, issue):
-        remote_issue = self.find_issue(issue)
+        # Zero-request fast path: this very section was synced before and
+        # its content has not changed since.
+        cached_key = self.find_cached_issue(issue)
+        if cached_key is not None:
+            issue.key = cached_key
+            self.profiler.count('section_hits')
+            if self.verbose:
+                print("  [cache-hit] {} unchanged since last sync".format(issue.header_path))
+            if not (self.watching and issue.unchanged):
+                print("{}: \"{}\" up to date, skipping".format(issue.key, issue.summary))
+            self.record_outcome(issue, 'unchanged')
+            return
+
+        # Never link to a parent that did not get a key: fail instead
+        error = DocumentTree.link_error(issue)
+        if error:
+            print('ERROR: unable to sync "{}": {}'.format(issue.summary, error))
+            self.record_outcome(issue, 'failed')
+            return
+
+        with self.profiler.phase('lookup'):
+            remote_issue = self.find_issue(issue)
         if remote_issue != None:
-            if remote_issue.type is IssueType.Epic:
-                self.epic_id = remote_issue.key
-            if remote_issue.type is IssueType.Task:
-                self.parent_id = remote_issue.key
             issue.key = remote_issue.key
             issue.type = remote_issue.type
+            issue.updated = remote_issue.updated
 
             # Primary change detection: compare local content hash against
             # the cache of what was last synced.  This avoids false positives
@@ -289,7 +1515,10 @@ class MD2Jira:
             if self.check_issue_cache_hash(issue.key, local_hash):
                 if self.verbose:
                     print("  [cache-hit] hash {} unchanged".format(local_hash))
+                # Record the section's identity for the fast path above
+                self.update_issue_cache(issue)
                 print("{}: \"{}\" up to date, skipping".format(issue.key, issue.summary))
+                self.record_outcome(issue, 'unchanged')
                 return
 
             if self.verbose:
@@ -297,30 +1526,87 @@ class MD2Jira:
 
             # Fallback: if the issue is not in the cache (first run, cache
             # cleared, etc.), compare against the remote issue directly.
-            issue_changed = self.diff_issue_against_remote(issue, remote_issue)
-            if issue_changed is True:
-                issue_data = self.prepare_issue(issue, updating=True)
-                self.update_issue(issue, issue_data)
-                self.update_issue_cache(issue)
+            with self.profiler.phase('diff'):
+                changes = self.remote_changes(issue, remote_issue)
+                self.report_changes(issue, changes)
+            if changes:
+                with self.profiler.phase('write'):
+                    issue_data = json.dumps({'fields': self.update_fields(issue, changes)})
+                    updated    = self.update_issue(issue, issue_data)
+                if updated is not None:
+                    self.profiler.count('cache_misses_updated')
+                    self.remember_written(issue)
+                    self.update_issue_cache(issue)
+                    self.record_outcome(issue, 'updated')
+                else:
+                    self.record_outcome(issue, 'failed')
             else:
                 # Content matches remote -- seed the cache so future runs
                 # can use the fast-path above.
                 self.update_issue_cache(issue)
                 print("{}: \"{}\" up to date, skipping".format(issue.key, issue.summary))
+                self.record_outcome(issue, 'unchanged')
         else:
             # TODO: Create new issues
-            issue_data   = self.prepare_issue(issue)
-            create_issue = self.create_issue(issue, issue_data)
+            with self.profiler.phase('write'):
+                issue_data   = self.prepare_issue(issue)
+                create_issue = self.create_issue(issue, issue_data)
 
             if create_issue is not None:
-                if create_issue is not None and create_issue.type is IssueType.Epic:
-                    self.epic_id   = create_issue.key
-                if create_issue is not None and create_issue.type is IssueType.Task:
-                    self.parent_id = create_issue.key
-                # * Update issue cache
-                self.update_issue_cache(create_issue)
+                self._record_created_issue(issue, create_issue)
             else:
                 print('ERROR: unable to create "{}"'.format(issue.summary))
+                self.record_outcome(issue, 'failed')
+
+    def _record_created_issue(self, issue, created_issue):
+        """Propagate a newly created key to the local issue, index, mirror and cache"""
+        issue.key = created_issue.key
+        self.remember_written(issue)
+        created_issue.header_path = issue.header_path
+        created_issue.source_file = issue.source_file
+        if issue.summary in self.indexed_summaries:
+            self.remote_index[issue.summary] = created_issue
+        # * Update issue cache (from the local issue, which knows its parent)
+        self.update_issue_cache(issue)
+        self.record_outcome(issue, 'created')
+
+    def record_outcome(self, issue, outcome):
+        """Tally what happened to `issue` for the end-of-run summary
+
+        Successfully synced sections are also recorded in the section index
+        so the next run can skip them if their bytes do not change.
+        """
+        with self.stats_lock:
+            self.stats[issue.source_file][outcome] += 1
+        if outcome != 'failed' and issue.source_hash:
+            self.sections.record(issue)
+
+    def print_summary(self):
+        """Print per-file and combined outcome counts"""
+        total = Counter()
+        for source_file, counts in self.stats.items():
+            total.update(counts)
+            print('{}: {}'.format(source_file or '<input>', self._format_counts(counts)))
+        print('Summary: {} files, {}'.format(len(self.stats), self._format_counts(total)))
+
+    def print_transport_report(self):
+        """Report time lost to rate limiting (always when throttled, otherwise if verbose)"""
+        report = self.transport.report()
+        if report['throttled_seconds'] > 0 or self.verbose:
+            print('Requests: {requests} sent ({bytes_sent:,} bytes), {retries} retried, {throttled} throttled; '
+                  '{throttled_seconds:.1f}s spent waiting on rate limits'.format(**report))
+
+    def write_profile(self):
+        """Write the --profile JSON report, with transport counters and outcomes"""
+        outcomes = self._outcome_totals()
+        self.profiler.write(self.profile_path, transport=self.transport.report(), outcomes=dict(outcomes))
+        print('Profile written to {}'.format(self.profile_path))
+
+    @staticmethod
+    def _format_counts(counts):
+        return '{} issues: {} created, {} updated, {} unchanged, {} failed'.format(
+            sum(counts.values()), counts['created'], counts['updated'],
+            counts['unchanged'], counts['failed'])
 
     def diff_issue_against_remote(self, issue, remote_issue):
         """Determine if remote issue has changed since last local edit.
@@ -328,31 +1614,51 @@ class MD2Jira:
         Returns True when the local issue content differs from the remote
         issue, meaning an update API call is warranted.
 
-        Note: the remote description may have been converted from ADF to
-        plain text by adf_to_text(), so an exact character-for-character
-        match is not always possible.  We normalise both sides (strip
-        whitespace, collapse blank lines) before comparing.
+        When the remote description came back as ADF, the local
+        description is converted to ADF too and both are compared in
+        canonical form, so formatting alone never looks like a change.
+        Otherwise we normalise both text forms (strip whitespace, collapse
+        blank lines) before comparing.
         """
+        changes = self.remote_changes(issue, remote_issue)
+        self.report_changes(issue, changes)
+        return len(changes) > 0
+
+    def report_changes(self, issue, changes):
+        if changes and self.verbose:
+            print("  [diff] {} changed: {}".format(
+                issue.key or issue.summary, ', '.join(change['field'] for change in changes)))
+
+    def remote_changes(self, issue, remote_issue):
+        """Return a {'field', 'reason'} dict for every field that differs from Jira"""
         changes = []
 
         if issue.summary != remote_issue.summary:
-            changes.append('summary')
+            changes.append({'field': 'summary', 'reason': 'Jira has "{}"'.format(remote_issue.summary)})
 
-        local_desc  = self._normalise_for_compare(issue.description)
-        remote_desc = self._normalise_for_compare(remote_issue.description or '')
-        if local_desc != remote_desc:
-            changes.append('description')
+        if remote_issue.description_adf is not None:
+            local_adf = adf.wiki_to_adf(self.description_text(issue))
+            if adf.canonical_adf(local_adf) != adf.canonical_adf(remote_issue.description_adf):
+                changes.append({'field': 'description', 'reason': 'content differs from Jira (compared as ADF)'})
+        else:
+            local_desc  = self._normalise_for_compare(issue.description)
+            remote_desc = self._normalise_for_compare(remote_issue.description or '')
+            if local_desc != remote_desc:
+                changes.append({'field': 'description', 'reason': 'text differs from Jira'})
 
-        local_cl  = (issue.checklist.text or '').strip()
-        remote_cl = (remote_issue.checklist.text or '').strip()
-        if local_cl != remote_cl:
-            changes.append('checklist')
+        link = self.parent_link(issue)
+        if link is not None:
+            remote_link = remote_issue.epic_id if issue.type is IssueType.Task else remote_issue.parent_id
+            if link != remote_link:
+                changes.append({'field': 'parent', 'reason': 'linked to {} in Jira'.format(remote_link or 'nothing')})
 
-        if changes and self.verbose:
-            print("  [diff] {} changed: {}".format(
-                issue.key or issue.summary, ', '.join(changes)))
+        # A section without checklist items leaves the Jira checklist alone
+        if self.checklist_enabled and issue.checklist.items:
+            reason = describe_checklist_diff(issue.checklist.diff(remote_issue.checklist))
+            if reason:
+                changes.append({'field': 'checklist', 'reason': 'items ' + reason})
 
-        return len(changes) > 0
+        return changes
 
     @staticmethod
     def _normalise_for_compare(text):
@@ -379,6 +1685,10 @@ class MD2Jira:
 
     def prepare_issue(self, issue, updating=False):
         """Prepare JSON data to send to JIRA API"""
+        return json.dumps({'fields': self.issue_fields(issue, updating)})
+
+    def issue_fields(self, issue, updating=False):
+        """Return every field md2jira sets on `issue`, as a dict"""
         project_key = self.PROJECT_KEY
 
         # Account for dash i.e '-' character in "Sub-task"
@@ -390,7 +1700,7 @@ class MD2Jira:
                     'key': project_key
                 },
                 'summary': issue.summary,
-                'description': issue.description.strip(),
+                'description': self.description_text(issue),
                 #'components': [{"name": "App Services"}],
                 'issuetype': {
                     'name': issue_type
@@ -400,11 +1710,12 @@ class MD2Jira:
 
         if issue.type is IssueType.Epic:
             out_json['fields']['customfield_10011'] = issue.summary
-        if issue.type is IssueType.Task and len(self.epic_id) > 0:
-            out_json['fields']['customfield_10014'] = self.epic_id
-        if issue.type is IssueType.Subtask and len(self.parent_id) > 0:
+        link = self.parent_link(issue)
+        if link is not None and issue.type is IssueType.Task:
+            out_json['fields']['customfield_10014'] = link
+        if link is not None and issue.type is IssueType.Subtask:
             out_json['fields']['parent'] = {
-                'key': self.parent_id
+                'key': link
             }
 
         if not updating and self.wba_team:
@@ -412,95 +1723,94 @@ class MD2Jira:
                 'value': self.wba_team
             }
 
-        if hasattr(issue, 'checklist') and len(issue.checklist.items) > 0:
-            if self.checklist_enabled is False:
-                for item in issue.checklist.items:
-                    out_json['fields']['description'] += '\n{}'.format(item.text)
-            else:
-                checklist_text = self.format_checklist(issue.checklist)
-                out_json['fields'][self.checklist_custom_field] = checklist_text
+        if self.checklist_enabled and issue.checklist.items:
+            out_json['fields'][self.checklist_custom_field] = self.format_checklist(issue.checklist)
 
-        return json.dumps(out_json)
+        if self.write_adf:
+            out_json['fields']['description'] = adf.wiki_to_adf(out_json['fields']['description'])
 
-    def adf_to_text(self, adf):
-        """Extract plain text from an Atlassian Document Format (ADF) dict.
+        return out_json['fields']
 
-        JIRA API v3 returns descriptions as ADF -- a nested JSON structure.
-        This method recursively walks the tree and concatenates all text
-        nodes, inserting newlines between block-level elements so that the
-        result is comparable to the original wiki-markup description.
-        """
-        if adf is None:
-            return ''
-        if isinstance(adf, str):
-            return adf
+    def parent_link(self, issue):
+        """Return the key a Task's Epic link or a Sub-task's parent should point at, or None
 
-        parts = []
-        node_type = adf.get('type', '')
+        Links set on the issue itself take precedence over its parent in
+        the document tree.
+        """
+        if issue.type is IssueType.Task:
+            link = issue.epic_id
+        elif issue.type is IssueType.Subtask:
+            link = issue.parent_id
+        else:
+            return None
+        if link is None and issue.parent is not None:
+            link = issue.parent.key
+        return link or None
 
-        # Leaf text node
-        if node_type == 'text':
-            return adf.get('text', '')
+    def update_fields(self, issue, changes):
+        """Return the fields of issue_fields() behind `changes`, the delta an update sends
 
-        # Recurse into children
-        for child in adf.get('content', []):
-            parts.append(self.adf_to_text(child))
+        Everything Jira already has (issue type, project, unchanged text,
+        fields other tools own) is left out, so an update touches only what
+        differs.
+        """
+        fields = self.issue_fields(issue, updating=True)
+        names  = set()
+        for change in changes:
+            if change['field'] == 'summary':
+                names.update(('summary', 'customfield_10011'))
+            elif change['field'] == 'parent':
+                names.update(('customfield_10014', 'parent'))
+            elif change['field'] == 'checklist':
+                names.add(self.checklist_custom_field)
+            else:
+                names.add(change['field'])
+        return {name: value for name, value in fields.items() if name in names}
 
-        # Block-level *containers* (whose children are themselves blocks)
-        # get newline separators.  Inline containers like paragraph and
-        # heading hold text nodes that should be concatenated directly.
-        separator = '\n' if node_type in (
-            'doc', 'blockquote',
-            'bulletList', 'orderedList', 'listItem',
-            'table', 'tableRow', 'tableCell', 'tableHeader',
-            'mediaSingle',
-        ) else ''
+    def description_text(self, issue):
+        """Return the wiki description sent for `issue`
 
-        return separator.join(parts)
+        Without a checklist field, checklist items are appended to the
+        description instead.
+        """
+        description = issue.description.strip()
+        if not self.checklist_enabled and issue.checklist.items:
+            return '\n'.join([description] + [item.text for item in issue.checklist.items])
+        return description
 
-    def md2wiki(self, _str):
-        """Convert certain markdown to JIRA Wiki format"""
-        text_replacements = {
-            'link': {
-                'match': re.compile(r'^(.*)\[([^\]]+)\]\(([^\)]+)\)(.*)$'),
-                'pattern': re.compile(r'\[([^\]]+)\]\(([^)]+)\)'),
-                'replacement': r'[\1|\2]'
-            }
-        }
+    def adf_to_text(self, adf_doc):
+        """Extract plain text from an Atlassian Document Format (ADF) dict.
 
-        for _token_type, _replacement_info in text_replacements.items():
-            _match, _pattern, _replacement = _replacement_info.values()
-            matches = re.match(_match, _str)
-            if matches is not None:
-                _str = _pattern.sub(_replacement, _str)
+        JIRA API v3 returns descriptions as ADF -- a nested JSON structure.
+        See adf.adf_to_text(); the tree is walked without recursion.
+        """
+        return adf.adf_to_text(adf_doc)
 
-        return _str
+    def wiki2md(self, issue, depth=None):
+        """Convert JIRA issue to a Markdown section: header, description and checklist
 
-    def wiki2md(self, issue):
-        """Convert JIRA issue to Markdown"""
-        output = []
-        # Print Summmary w/ right header level based on IssueType
-        issue_type_value      = issue.type.value
-        issue_type_header_str = '#' * issue_type_value
-        output.append('{} {}\n'.format(issue_type_header_str, issue.summary).rstrip())
+        `depth` is the header level, by default the one its type is parsed
+        from.  ADF descriptions go through wiki markup on the way.
+        """
+        depth  = depth or HEADER_DEPTH.get(issue.type, HEADER_DEPTH[IssueType.Task])
+        output = ['{} {}'.format('#' * depth, issue.summary), '']
 
-        # Print description
-        output.append('{}\n'.format(issue.description))
+        if issue.description_adf is not None:
+            markup = adf.adf_to_wiki(issue.description_adf)
+        else:
+            markup = issue.description or ''
+        description = '\n'.join(wiki_to_md(markup.splitlines())).strip()
+        if description:
+            output.extend([description, ''])
 
-        # Print formatted checklist if exists
         items = issue.checklist and issue.checklist.items
-        if items and len(items) > 0:
+        if items:
             for item in items:
-                status = item.status.name
-                output.append('* [{}] {}'.format(item.reverse_mapping[status], item.text))
-            
-        # Overwrite original file, backing up original
-
-        result = '\n'.join(output) 
+                marker = CHECKLIST_SHORTHAND.get(item.status, CHECKLIST_STATUS_TEXT[item.status])
+                output.append('* [{}] {}'.format(marker, item.text))
+            output.append('')
 
-        print(result)
-
-        return result
+        return '\n'.join(output) + '\n'
 
 
     def format_checklist(self, checklist):
@@ -511,79 +1821,369 @@ class MD2Jira:
         * [in progress] Checklist Item B
         * [done] Checklist Item C
         '''
-        output = '# Default Checklist\n' # raw format
-
+        return render_checklist(checklist.items)
 
-        for item in checklist.items:
-            status = item.status.name.lower().replace('_', ' ')
-            output += '* [{}] {}\n'.format(status, item.text)
+    def generate_issue_hash(self, issue, parent_key=None):
+        """Hash of what a sync writes: content_hash() combined with the Epic/parent link
 
-        return output
+        `parent_key` stands in for the link while the parent in the document
+        has no key yet.
+        """
+        return link_hash(self.content_hash(issue), self.parent_link(issue) or parent_key)
 
-    def generate_issue_hash(self, issue): 
+    def content_hash(self, issue):
         str    = '{}:{}:{}'.format(issue.summary, issue.description.strip(), issue.checklist.text.strip())
         result = hashlib.md5(str.encode())
         return result.hexdigest()
 
     def check_issue_cache_hash(self, issue_key, issue_hash):
-        result = False
-        cache_file = '.md2jira_cache.py.tsv'
-        if os.path.exists(cache_file) is False:
-            open(cache_file, 'a', encoding='utf-8').close()
-
-        with open(cache_file, 'r', encoding='utf-8') as fh:
-            for line in fh:
-                key, summary, hash = '{}'.format(line.rstrip()).split('\t')
-                if key == issue_key: 
-                    result = (hash == issue_hash)
-        return result
+        current = self.cache.is_current(issue_key, issue_hash)
+        self.profiler.count('cache_hits' if current else 'cache_misses')
+        return current
 
     def update_issue_cache(self, issue): 
         hash = self.generate_issue_hash(issue)
-        if self.check_issue_cache_hash(issue.key, hash) is False:
-            # Temp file
-            tmpfile = tempfile.NamedTemporaryFile(delete=False)
-            # Write everything _but_ changed issue out
-            with open('.md2jira_cache.py.tsv', 'r') as fh:
-                for line in fh:
-                    if line.startswith(issue.key) is False:
-                        tmpfile.write(bytes(line,'utf-8'))
-
-                fields = [issue.key, '"{}"'.format(issue.summary), hash]
-                tmpfile.write(bytes('{}\n'.format('\t'.join(fields)), 'utf-8'))
-                shutil.copyfile(tmpfile.name, '{}/{}'.format(os.getcwd(), '.md2jira_cache.py.tsv'))
+        self.cache.put(
+            issue.key,
+            issue.summary,
+            hash,
+            source_file=issue.source_file or None,
+            header_path=issue.header_path or None,
+            remote_updated=issue.updated,
+        )
+
+class MarkdownParser:
+    """Split a Markdown document into Issues
+
+    Holds no connection or cache state, so it is cheap to create and safe
+    to use from worker processes.
+    """
+
+    epic_re      = EPIC_RE
+    story_re     = TASK_RE
+    task_re      = TASK_RE
+    subtask_re   = SUBTASK_RE
+    checklist_re = CHECKLIST_RE
+
+    def __init__(self, checklist_enabled=False):
+        self.checklist_enabled = checklist_enabled
+
+    def iter_issues(self, lines, source_file=''):
+        """Yield each Issue in `lines` as soon as the next header completes it
+
+        Lines inside fenced code blocks ({code}, ``` ...) are never taken
+        for headers or checklist items.  Description lines are collected
+        and converted to wiki markup in one pass when the issue is complete.
+        """
+        issue        = None
+        issue_type   = IssueType.NONE
+        parser_state = ParserState.DETECT_ISSUE
+        summary      = None
+        header_stack = []
+        description  = []
+        fence        = None
+
+        for line in lines:
+            stripped   = line.strip()
+            if fence is not None or stripped[:1] in FENCE_CHARS:
+                opened     = fence
+                fence      = track_fence(fence, stripped)
+                issue_type = IssueType.NONE
+                if opened is None and fence is None:
+                    issue_type = self.detect_issue(stripped)
+            else:
+                issue_type = self.detect_issue(stripped)
+
+            if issue_type in HEADER_DEPTH:
+                summary      = self.header_summary(issue_type, stripped)
+                header_stack = header_stack[:HEADER_DEPTH[issue_type] - 1] + [summary]
+
+            if parser_state is ParserState.DETECT_ISSUE and issue_type in HEADER_DEPTH:
+                issue = self._new_issue(issue_type, summary, header_stack, source_file)
+                parser_state = ParserState.COLLECT_DESCRIPTION
+
+            elif parser_state is ParserState.COLLECT_DESCRIPTION:
+
+                if issue_type is IssueType.Checklist:
+                    status, item_text = CHECKLIST_RE.match(stripped).group(1, 2)
+                    issue.checklist.append(ChecklistItem(item_text, status))
+
+                elif issue_type is IssueType.NONE:
+                    description.append(line.rstrip('\r\n'))
+
+                else:
+                    issue.description = self.convert_description(description)
+                    description       = []
+                    yield issue
+                    issue = self._new_issue(issue_type, summary, header_stack, source_file)
+
+        if issue is not None:
+            issue.description = self.convert_description(description)
+            yield issue
+
+    def convert_description(self, lines):
+        """Convert collected description lines, one trailing newline per line"""
+        if not lines:
+            return ''
+        return '{}\n'.format(self.md2wiki('\n'.join(lines)))
+
+    def iter_sections(self, fh):
+        """Yield (issue_type, summary, header_path, offset, block) per header block
+
+        `fh` is read in binary; `block` holds the raw bytes from a header
+        line up to the next one and `offset` is where it starts in the
+        file.  Only lines starting with `#` are decoded, so this is much
+        cheaper than iter_issues().
+        """
+        header_stack = []
+        header       = None
+        block        = []
+        start        = 0
+        offset       = 0
+        fence        = None
+
+        for raw in fh:
+            issue_type = IssueType.NONE
+            first      = raw.lstrip()[:1]
+            if fence is not None or first in FENCE_BYTES:
+                fence = track_fence(fence, raw.decode('utf-8').strip())
+            elif first == b'#':
+                stripped   = raw.decode('utf-8').strip()
+                issue_type = self.detect_issue(stripped)
+
+            if issue_type in HEADER_DEPTH:
+                if header is not None:
+                    yield header + (start, b''.join(block))
+                summary      = self.header_summary(issue_type, stripped)
+                header_stack = header_stack[:HEADER_DEPTH[issue_type] - 1] + [summary]
+                header       = (issue_type, summary, HEADER_PATH_SEPARATOR.join(header_stack))
+                block        = [raw]
+                start        = offset
+            elif header is not None:
+                block.append(raw)
+            offset += len(raw)
+
+        if header is not None:
+            yield header + (start, b''.join(block))
+
+    def iter_issues_incremental(self, fh, source_file, known_sections, salt=''):
+        """Like iter_issues(), but skip header blocks that did not change
+
+        `fh` is read in binary.  `known_sections` maps header paths to the
+        hash and key recorded when that block was last synced.  Blocks
+        whose bytes still hash the same are yielded as stub Issues with
+        `unchanged` set, without tokenizing or converting them.
+        """
+        for issue_type, summary, header_path, offset, block in self.iter_sections(fh):
+            digest = section_hash(salt, header_path, block)
+            known  = known_sections.get(header_path)
+            if known is not None and known.get('hash') == digest and known.get('key'):
+                issue = Issue(issue_type, known['key'], summary)
+                issue.unchanged = True
+            else:
+                issue = next(self.iter_issues(block.decode('utf-8').splitlines(True)))
+            issue.header_path   = header_path
+            issue.source_file   = source_file
+            issue.source_offset = offset
+            issue.source_length = len(block)
+            issue.source_hash   = digest
+            yield issue
+
+    def header_summary(self, issue_type, stripped):
+        """Return the summary of a header line of the given type"""
+        return HEADER_PREFIX_RE[issue_type].sub('', stripped, 1)
+
+    @staticmethod
+    def _new_issue(issue_type, summary, header_stack, source_file):
+        issue = Issue(issue_type, '', summary)
+        issue.header_path = HEADER_PATH_SEPARATOR.join(header_stack)
+        issue.source_file = source_file
+        return issue
+
+    def detect_issue(self, _str):
+        issue_type = IssueType.NONE
+
+        if self.epic_re.match(_str):
+            issue_type = IssueType.Epic
+        elif self.task_re.match(_str):
+            issue_type = IssueType.Task
+        elif self.subtask_re.match(_str):
+            issue_type = IssueType.Subtask
+        elif self.checklist_enabled and self.checklist_re.match(_str):
+            issue_type = IssueType.Checklist
+
+        return issue_type
+
+    def md2wiki(self, _str):
+        """Convert Markdown text (one or more lines) to JIRA Wiki format"""
+        return '\n'.join(md_to_wiki(_str.split('\n')))
 
 class Issue:
+    """One header block: an Epic, Task or Sub-task and what it is synced with
+
+    Slotted, since documents run to 100,000 issues and all of them may be
+    held at once while a sync is planned.
+    """
+
+    __slots__ = (
+        'key', 'type', 'summary', 'description', 'description_adf', 'checklist',
+        'epic_id', 'parent_id', 'parent', 'children', 'header_path', 'source_file',
+        'source_offset', 'source_length', 'source_hash', 'unchanged', 'updated',
+        'priority', 'assignee',
+    )
+
     def __init__(self, type, key='', summary='', description='', checklist_text=''):
         self.key            = key 
         self.type           = type
         self.summary        = summary
         self.description    = description and description.strip()
+        self.description_adf = None
         self.checklist      = Checklist(checklist_text)
-        self.checklist_re   = re.compile(r'^.*\* \[(.*)\] (.*)$')
         self.epic_id        = None
         self.parent_id      = None
+        self.parent         = None
+        self.children       = ()
+        self.header_path    = ''
+        self.source_file    = ''
+        self.source_offset  = None
+        self.source_length  = None
+        self.source_hash    = None
+        self.unchanged      = False
+        self.updated        = None
         self.priority       = None
         self.assignee       = None
 
-        if checklist_text is None:
-            checklist_text = ''
+    @property
+    def issue_key(self):
+        """Older name of `key`"""
+        return self.key
 
-        # Only process checklist if it's a string (not a dict from Jira API)
-        if checklist_text and len(str(checklist_text)) > 0 and isinstance(checklist_text, str): 
-            self.checklist = self.process_checklist(checklist_text)
+    @issue_key.setter
+    def issue_key(self, key):
+        self.key = key
 
-    def process_checklist(self, str):
-        """Convert checklist str in to checklist"""
+    def process_checklist(self, value):
+        """Add the items of a checklist field value (text, or the dict/list form) to the checklist"""
+        self.checklist.extend(parse_checklist(value))
+        return self.checklist
 
-        # Ignore first line, which is just name of the checklist
-        for item in str.rstrip().split('\n')[1:]:
-            matches = re.match(self.checklist_re, item.rstrip())
-            status, item_text = matches.group(1, 2)
-            checklist_item   = ChecklistItem(item_text, status)
-            self.checklist.append(checklist_item)
+class DocumentTree:
+    """The issues of one document as an explicit tree, addressed by index
+
+    Nodes are the Issues themselves, in document order.  `parents[i]` is
+    the index of node i's parent (None at the top) and `children[i]` the
+    indices below it.  A node's key is pending until it is set, so a
+    parent key is read from the tree rather than remembered from the
+    previous header, and any subset of nodes can be synced in any order
+    once their parents are.  Nodes can be added while the rest of the
+    document is still being parsed; each Issue's `parent` and `children`
+    are kept in step as a view of the tree.  A streamed document is never
+    held as a tree: see stream().
+    """
+
+    __slots__ = ('nodes', 'parents', 'children', '_epic', '_task')
+
+    def __init__(self, issues=()):
+        self.nodes    = []
+        self.parents  = []
+        self.children = []
+        # The closest preceding Epic and Task: the candidate parents
+        self._epic    = None
+        self._task    = None
+        for issue in issues:
+            self.add(issue)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add(self, issue):
+        """Append `issue` to the tree and return its index
+
+        Tasks belong to the closest preceding Epic, Sub-tasks to the closest
+        preceding Task under the same Epic.  Nodes without children keep an
+        empty tuple rather than a list each.
+        """
+        index  = len(self.nodes)
+        parent = None
+        if issue.type is IssueType.Epic:
+            self._epic = index
+            self._task = None
+        elif issue.type is IssueType.Task:
+            parent     = self._epic
+            self._task = index
+        elif issue.type is IssueType.Subtask:
+            parent = self._task
+
+        self.nodes.append(issue)
+        self.parents.append(parent)
+        self.children.append(())
+        issue.parent   = None
+        issue.children = ()
+        if parent is not None:
+            if not self.children[parent]:
+                self.children[parent] = []
+                self.nodes[parent].children = []
+            self.children[parent].append(index)
+            self.nodes[parent].children.append(issue)
+            issue.parent = self.nodes[parent]
+        return index
+
+    def roots(self):
+        """Indices of the nodes without a parent"""
+        return [index for index, parent in enumerate(self.parents) if parent is None]
+
+    def level(self, issue_type):
+        """Indices of the nodes of `issue_type`, in document order"""
+        return [index for index, issue in enumerate(self.nodes) if issue.type is issue_type]
+
+    def resolved(self, index):
+        """True once node `index` has a Jira key"""
+        return bool(self.nodes[index].key)
+
+    def descendants(self, index):
+        """Indices of every node below `index`, depth first"""
+        for child in self.children[index]:
+            yield child
+            yield from self.descendants(child)
 
-        return self.checklist
+    @staticmethod
+    def stream(issues):
+        """Yield `issues`, linking each to its parent as add() would
+
+        Only the open Epic and Task are held, since no later header can
+        link to anything else, so memory stays flat however long the
+        document is.  Each Issue's `parent` is set; `children` are left
+        empty, as a parent's list would keep every child of it alive.
+        """
+        epic = task = None
+        for issue in issues:
+            parent = None
+            if issue.type is IssueType.Epic:
+                epic, task = issue, None
+            elif issue.type is IssueType.Task:
+                parent, task = epic, issue
+            elif issue.type is IssueType.Subtask:
+                parent = task
+            issue.parent   = parent
+            issue.children = ()
+            yield issue
+
+    @staticmethod
+    def link_error(issue):
+        """Why `issue` cannot be linked to its parent yet, or None
+
+        A Sub-task needs a Task above it, and a child whose parent has no
+        key (it failed, or has not been synced) must not be created
+        unlinked or linked to some other issue.  Links set on the issue
+        itself count as resolved.
+        """
+        if issue.type is IssueType.Subtask and issue.parent is None and not issue.parent_id:
+            return 'no parent Task'
+        if issue.parent is not None and not issue.parent.key:
+            explicit = issue.epic_id if issue.type is IssueType.Task else issue.parent_id
+            if not explicit:
+                return 'parent "{}" was not synced'.format(issue.parent.summary)
+        return None
 
 class IssueType(Enum):
     NONE      = 0
@@ -596,51 +2196,203 @@ class IssueType(Enum):
     WBAAccessRequest = 7
     Defect = 8
 
+# Markdown header level of each issue type
+HEADER_DEPTH = {
+    IssueType.Epic:    1,
+    IssueType.Task:    2,
+    IssueType.Subtask: 3,
+}
+
+HEADER_PREFIX_RE  = {
+    IssueType.Epic:    EPIC_RE,
+    IssueType.Task:    TASK_RE,
+    IssueType.Subtask: SUBTASK_RE,
+}
+
 class ParserState(Enum):
     NONE                = 0
     DETECT_ISSUE        = 1
     COLLECT_DESCRIPTION = 2
     COLLECT_CHECKLIST   = 3
 
+class ChecklistItemStatus(Enum):
+
+    NONE        = 0
+    OPEN        = 1
+    IN_PROGRESS = 2
+    SKIPPED     = 3
+    DONE        = 4
+
+# Markdown checkbox markers and the statuses they stand for
+CHECKLIST_MARKERS    = {
+    'x': ChecklistItemStatus.DONE,
+    ' ': ChecklistItemStatus.OPEN,
+    '>': ChecklistItemStatus.IN_PROGRESS,
+}
+CHECKLIST_SHORTHAND  = {status: marker for marker, status in CHECKLIST_MARKERS.items()}
+# How each status is spelled in the checklist field ("in progress")
+CHECKLIST_STATUS_TEXT = {status: status.name.lower().replace('_', ' ') for status in ChecklistItemStatus}
+
+def checklist_status(marker):
+    """Return the status for a `* [marker]` checkbox: x, >, blank or a spelled-out status"""
+    status = CHECKLIST_MARKERS.get(marker or ' ')
+    if status is None:
+        status = ChecklistItemStatus[marker.replace(' ', '_').upper()]
+    return status
+
+# Status names used by checklist apps that return items as JSON
+CHECKLIST_STATUS_NAMES = {
+    'done':        ChecklistItemStatus.DONE,
+    'completed':   ChecklistItemStatus.DONE,
+    'open':        ChecklistItemStatus.OPEN,
+    'to do':       ChecklistItemStatus.OPEN,
+    'todo':        ChecklistItemStatus.OPEN,
+    'in progress': ChecklistItemStatus.IN_PROGRESS,
+    'skipped':     ChecklistItemStatus.SKIPPED,
+    'n/a':         ChecklistItemStatus.SKIPPED,
+}
+
+def render_checklist(items):
+    """Return the checklist field text for `items`"""
+    if not items:
+        return ''
+    output = ['# Default Checklist\n']
+    for item in items:
+        output.append('* [{}] {}\n'.format(CHECKLIST_STATUS_TEXT[item.status], item.text))
+    return ''.join(output)
+
+def parse_checklist(value):
+    """Return the ChecklistItems in a checklist field value as Jira returns it
+
+    Text fields hold `* [status] text` lines under `# Checklist name`
+    headers; other lines (notes, separators) are ignored.  Checklist apps
+    with a JSON field return a list of items, or a dict holding one under
+    `items`, each with a name and a status (or a `checked` flag).
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        items = []
+        for line in value.splitlines():
+            line = line.strip()
+            if not line.startswith('* ['):
+                continue
+            end = line.find('] ', 3)
+            if end < 0:
+                continue
+            items.append(_text_checklist_item(line[end + 2:], line[3:end]))
+        return items
+    if isinstance(value, dict):
+        value = value.get('items') or []
+    return [_json_checklist_item(entry) for entry in value if isinstance(entry, dict)]
+
+def _text_checklist_item(text, marker):
+    # Other checklist apps write their own statuses ("[X]", "[blocked]"): as in the JSON form
+    try:
+        status = checklist_status(marker.lower())
+    except KeyError:
+        status = CHECKLIST_STATUS_NAMES.get(marker.strip().lower(), ChecklistItemStatus.OPEN)
+    return ChecklistItem(text, status)
+
+def _json_checklist_item(entry):
+    text   = entry.get('name') or entry.get('text') or entry.get('summary') or ''
+    status = entry.get('status')
+    if isinstance(status, dict):
+        status = status.get('name') or status.get('id')
+    status = CHECKLIST_STATUS_NAMES.get(str(status or '').strip().lower())
+    if status is None:
+        status = ChecklistItemStatus.DONE if entry.get('checked') else ChecklistItemStatus.OPEN
+    return ChecklistItem(text, status)
+
+def diff_checklists(local, remote):
+    """Compare two lists of ChecklistItems item by item
+
+    Items are matched by text, in order, so repeated items pair up one to
+    one.  Returns a dict with the texts `added` locally, the texts
+    `removed` locally, (text, Jira status, local status) for every
+    `status` change, and whether the items were only `reordered`.
+    """
+    remaining = defaultdict(deque)
+    for item in remote:
+        remaining[item.text].append(item.status)
+    added   = []
+    changed = []
+    for item in local:
+        statuses = remaining.get(item.text)
+        if not statuses:
+            added.append(item.text)
+            continue
+        status = statuses.popleft()
+        if status is not item.status:
+            changed.append((item.text, status, item.status))
+    removed = []
+    for item in remote:
+        statuses = remaining[item.text]
+        if statuses:
+            statuses.popleft()
+            removed.append(item.text)
+    reordered = not (added or removed) and [i.text for i in local] != [i.text for i in remote]
+    return {'added': added, 'removed': removed, 'status': changed, 'reordered': reordered}
+
+def describe_checklist_diff(diff):
+    """One line summing up diff_checklists() output, or '' when nothing changed"""
+    parts = []
+    if diff['added']:
+        parts.append('{} added'.format(len(diff['added'])))
+    if diff['removed']:
+        parts.append('{} removed'.format(len(diff['removed'])))
+    if diff['status']:
+        parts.append('{} status changed'.format(len(diff['status'])))
+    if diff['reordered']:
+        parts.append('reordered')
+    return ', '.join(parts)
+
 class Checklist:
-    def __init__(self, str):
-        self.items  = []
-        self.text   = str
+    """Checklist items; `text` is rendered from them once, when first asked for
+
+    Built from a checklist field value as Jira returns it (see
+    parse_checklist()), or empty.
+    """
+
+    __slots__ = ('items', '_text')
+
+    def __init__(self, value=''):
+        self.items = parse_checklist(value)
+        self._text = None
+
     def __repr__(self):
-        result = MD2Jira.format_checklist(self, self)
-        return result
+        return self.text
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = render_checklist(self.items)
+        return self._text
+
     def append(self, item):
         self.items.append(item)
-        self.text = repr(self)
+        self._text = None
 
-class ChecklistItem:
-        
-    def __init__(self, text, status):
-
-        if status == '' or len(status) == 0:
-            status = ' '
+    def extend(self, items):
+        self.items.extend(items)
+        self._text = None
 
-        self.shorthand_mapping = {
-            'x': 'DONE',
-            ' ': 'OPEN',
-            '>': 'IN_PROGRESS'
-        }
+    def diff(self, remote):
+        """diff_checklists() of these items against the `remote` Checklist"""
+        return diff_checklists(self.items, remote.items)
 
-        self.reverse_mapping = {}
-        for v in self.shorthand_mapping:
-            self.reverse_mapping[self.shorthand_mapping[v]] = v
+class ChecklistItem:
+    __slots__ = ('text', 'status')
 
-        self.text    = text
-        self.status  = ChecklistItemStatus.__dict__[self.shorthand_mapping[status].upper() if status in self.shorthand_mapping.keys() else status.replace(' ', '_').upper()]
-        try: 
-            self.checked = self.status == ChecklistItemStatus.DONE
-        except:
-            print ('yay')
+    # Kept for callers of the old per-item tables
+    shorthand_mapping = {marker: status.name for marker, status in CHECKLIST_MARKERS.items()}
+    reverse_mapping   = {status.name: marker for marker, status in CHECKLIST_MARKERS.items()}
 
-class ChecklistItemStatus(Enum):
+    def __init__(self, text, status):
+        """`status` is a ChecklistItemStatus or a checkbox marker (see checklist_status())"""
+        self.text   = text
+        self.status = status if isinstance(status, ChecklistItemStatus) else checklist_status(status)
 
-    NONE        = 0
-    OPEN        = 1
-    IN_PROGRESS = 2
-    SKIPPED     = 3
-    DONE        = 4
\ No newline at end of file
+    @property
+    def checked(self):
+        return self.status is ChecklistItemStatus.DONE
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import json
+import sys
+
+# Format of the saved plan; bumped whenever entries change shape
+PLAN_VERSION = 1
+ACTIONS      = ('create', 'update', 'skip')
+# Creation order: parents before their children
+LEVELS       = ('Epic', 'Story', 'Task', 'Subtask')
+
+class PlanError(Exception):
+    """Raised for a plan that cannot be applied to the configured site and project"""
+
+def new_plan(site, project, adf, entries, lookups, bulk_size, offline=False):
+    """Wrap plan entries with what apply needs to check and what reviewers want to see"""
+    actions = {action: 0 for action in ACTIONS}
+    for entry in entries:
+        actions[entry['action']] += 1
+    return {
+        'version':  PLAN_VERSION,
+        'site':     site,
+        'project':  project,
+        'adf':      adf,
+        'offline':  offline,
+        'summary':  actions,
+        'requests': dict(estimate_requests(entries, bulk_size), lookup=lookups),
+        'issues':   entries,
+    }
+
+def estimate_requests(entries, bulk_size):
+    """Requests apply will send: one bulk create per `bulk_size` issues per level, one PUT per update"""
+    creates = sum(-(-len(level) // bulk_size) for level in creation_levels(entries))
+    updates = sum(1 for entry in entries if entry['action'] == 'update')
+    return {'create': creates, 'update': updates, 'total': creates + updates}
+
+def creation_levels(entries):
+    """Group the entries to create by hierarchy level, parents first"""
+    levels = {name: [] for name in LEVELS}
+    for entry in entries:
+        if entry['action'] == 'create':
+            levels.setdefault(entry['type'], []).append(entry)
+    return [level for level in levels.values() if level]
+
+def save_plan(plan, path):
+    """Write `plan` as JSON to `path` ('-' for stdout)"""
+    if path == '-':
+        json.dump(plan, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(plan, fh, indent=2)
+        fh.write('\n')
+
+def load_plan(path):
+    with open(path, encoding='utf-8') as fh:
+        plan = json.load(fh)
+    if not isinstance(plan, dict) or plan.get('version') != PLAN_VERSION:
+        raise PlanError('{} is not a version {} md2jira plan'.format(path, PLAN_VERSION))
+    return plan
+
+def check_plan(plan, site, project, adf):
+    """Refuse plans made for another site, project or description format, or offline"""
+    if plan.get('offline'):
+        raise PlanError('plan was made with --offline; run "md2jira plan" against Jira to apply changes')
+    expected = {'site': site, 'project': project, 'adf': adf}
+    for name, value in expected.items():
+        if plan.get(name) != value:
+            raise PlanError('plan was made for {} {!r}, not {!r}'.format(name, plan.get(name), value))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+import contextlib
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Phases reported by --profile, in pipeline order
+PHASES = ('parse', 'convert', 'lookup', 'diff', 'write', 'cache_flush')
+
+# Issue keys and numeric ids in request paths, folded into one endpoint
+PATH_ID_RE = re.compile(r'(?<=/issue/)(?:[A-Z][A-Z0-9_]*-\d+|\d+)(?=/|$)')
+
+class Profiler:
+    """Collects phase timings, per-endpoint request metrics and cache counters
+
+    Phase times are summed over every thread that runs the phase, so with
+    --jobs they can add up to more than the wall time.  Parsing is timed
+    from the outside (time spent waiting for the next issue), so its
+    reported time excludes the nested Markdown conversion.
+    """
+
+    enabled = True
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock    = clock
+        self.started  = clock()
+        self.lock     = threading.Lock()
+        self.phases   = defaultdict(lambda: [0.0, 0])     # name -> [seconds, calls]
+        self.requests = defaultdict(list)                 # endpoint -> [(seconds, sent, received, status)]
+        self.counters = Counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.add(name, self.clock() - start)
+
+    def add(self, name, seconds, calls=1):
+        with self.lock:
+            totals     = self.phases[name]
+            totals[0] += seconds
+            totals[1] += calls
+
+    def timed(self, name, function):
+        """Wrap `function` so every call is added to phase `name`"""
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def timed_iter(self, name, iterable):
+        """Yield from `iterable`, adding the time spent waiting for each item to `name`"""
+        iterator = iter(iterable)
+        while True:
+            start = self.clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, self.clock() - start, calls=0)
+                return
+            self.add(name, self.clock() - start)
+            yield item
+
+    def record_request(self, verb, url, status, sent, received, seconds):
+        endpoint = '{} {}'.format(verb, endpoint_path(url))
+        with self.lock:
+            self.requests[endpoint].append((seconds, sent, received, status))
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def report(self, **extra):
+        """Return the collected metrics as a JSON-serialisable dict"""
+        with self.lock:
+            phases = {name: list(totals) for name, totals in self.phases.items()}
+            if 'parse' in phases and 'convert' in phases:
+                phases['parse'][0] = max(0.0, phases['parse'][0] - phases['convert'][0])
+            report = {
+                'wall_seconds': round(self.clock() - self.started, 4),
+                'phases': {
+                    name: {'seconds': round(phases[name][0], 4), 'calls': phases[name][1]}
+                    for name in PHASES if name in phases
+                },
+                'requests': {
+                    endpoint: request_summary(samples)
+                    for endpoint, samples in sorted(self.requests.items())
+                },
+                'cache': {
+                    'section_hits':   self.counters['section_hits'],
+                    'hits':           self.counters['cache_hits'],
+                    'misses':         self.counters['cache_misses'],
+                    'misses_updated': self.counters['cache_misses_updated'],
+                },
+            }
+        report.update(extra)
+        return report
+
+    def write(self, path, **extra):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(self.report(**extra), fh, indent=2)
+            fh.write('\n')
+
+class NullProfiler:
+    """Stands in for Profiler when --profile is off; every hook does nothing"""
+
+    enabled = False
+
+    _PHASE = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._PHASE
+
+    def add(self, name, seconds, calls=1):
+        pass
+
+    def timed(self, name, function):
+        return function
+
+    def timed_iter(self, name, iterable):
+        return iterable
+
+    def record_request(self, verb, url, status, sent, received, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+def endpoint_path(url):
+    """Return the path of `url` with issue keys and ids replaced by {key}"""
+    path = url.split('://', 1)[-1]
+    path = path[path.find('/'):] if '/' in path else '/'
+    path = path.split('?', 1)[0]
+    return PATH_ID_RE.sub('{key}', path)
+
+def request_summary(samples):
+    """Count, bytes, latency percentiles and status counts for one endpoint"""
+    latencies = sorted(sample[0] for sample in samples)
+    return {
+        'count':          len(samples),
+        'bytes_sent':     sum(sample[1] for sample in samples),
+        'bytes_received': sum(sample[2] for sample in samples),
+        'p50_ms':         round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms':         round(percentile(latencies, 95) * 1000, 2),
+        'max_ms':         round(latencies[-1] * 1000, 2),
+        'statuses':       dict(Counter(str(sample[3]) for sample in samples)),
+    }
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list"""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
@@ -0,0 +1,569 @@
+#!/usr/bin/env python
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+CACHE_FILE = '.md2jira_cache.py.tsv'
+# Version of MD2Jira.generate_issue_hash(); entries hashed by an older
+# algorithm are treated as stale
+HASH_VERSION = 2
+
+class SyncCache:
+    """Last synced content hash of every issue, keyed by issue key
+
+    The TSV file is read once, on first use, into a dict.  Lookups and
+    updates only touch memory; changed entries are written back by flush(),
+    which replaces the file atomically.  Each line of the file holds
+    `KEY<TAB>"summary"<TAB>hash`, optionally followed by the source file
+    and header path the issue was synced from.  Those two columns form the
+    local identity of an issue (see find_by_identity()).
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path       = path
+        self.entries    = None
+        self.identities = {}
+        self.dirty      = set()
+        self.lock       = threading.RLock()
+
+    def load(self):
+        """Read the cache file into memory (only the first call does any I/O)"""
+        with self.lock:
+            if self.entries is not None:
+                return
+            self.entries = {}
+            if os.path.exists(self.path) is False:
+                return
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                for line in fh:
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) == 3:
+                        fields += [None, None]
+                    if len(fields) != 5:
+                        continue
+                    key, summary, hash, source_file, header_path = fields
+                    self.entries[key] = (summary, hash, source_file or None, header_path or None)
+                    if source_file and header_path:
+                        self.identities[(source_file, header_path)] = key
+
+    def get_hash(self, key):
+        """Return the cached hash for `key`, or None when it is not cached"""
+        self.load()
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def is_current(self, key, hash):
+        """True when `key` was last synced with content hash `hash`"""
+        return self.get_hash(key) == hash
+
+    def find_by_identity(self, source_file, header_path):
+        """Return (key, hash) last synced from this header of this file, or None"""
+        self.load()
+        key = self.identities.get((source_file, header_path))
+        if key is None:
+            return None
+        return key, self.entries[key][1]
+
+    def put(self, key, summary, hash, source_file=None, header_path=None, **_metadata):
+        """Record `hash` as the last synced content of `key`
+
+        Extra metadata accepted by SqliteSyncCache.put() is not stored in
+        the TSV format.  A missing source file or header path keeps the
+        identity recorded by an earlier sync.
+        """
+        self.load()
+        with self.lock:
+            previous = self.entries.get(key)
+            if previous is not None and (source_file is None or header_path is None):
+                source_file, header_path = previous[2], previous[3]
+            entry = (
+                '"{}"'.format(summary.replace('\t', ' ')),
+                hash,
+                source_file,
+                header_path.replace('\t', ' ') if header_path else header_path,
+            )
+            if previous == entry:
+                return
+            if previous is not None and previous[2] and previous[3]:
+                if self.identities.get((previous[2], previous[3])) == key:
+                    del self.identities[(previous[2], previous[3])]
+            self.entries[key] = entry
+            if entry[2] and entry[3]:
+                self.identities[(entry[2], entry[3])] = key
+            self.dirty.add(key)
+
+    def flush(self):
+        """Write the cache back to disk if anything changed
+
+        The new content goes to a temporary file in the same directory which
+        then replaces the cache file, so an interrupted flush never leaves a
+        truncated cache behind.
+        """
+        with self.lock:
+            if self.entries is None or len(self.dirty) == 0:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmpname = tempfile.mkstemp(dir=directory, prefix='.md2jira_cache.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as tmpfile:
+                    for key, (summary, hash, source_file, header_path) in self.entries.items():
+                        fields = [key, summary, hash]
+                        if source_file and header_path:
+                            fields += [source_file, header_path]
+                        tmpfile.write('{}\n'.format('\t'.join(fields)))
+                os.replace(tmpname, self.path)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+            self.dirty.clear()
+
+class SqliteSyncCache:
+    """SQLite-backed sync state shared by concurrent runs
+
+    Rows are keyed by (site, project, issue key) and hold the content hash,
+    the hash algorithm version, the source file and header path the issue
+    was synced from, the remote `updated` timestamp and the time of the
+    last sync.  The database runs in WAL mode so readers never block and
+    several processes may sync into it at once; each flush() upserts only
+    the rows changed by this run, in one short transaction.
+
+    Nothing is loaded up front -- every lookup is an indexed query -- so
+    startup cost does not depend on the number of stored entries.
+    """
+
+    COLUMNS = (
+        'issue_key', 'summary', 'hash', 'hash_version', 'source_file',
+        'header_path', 'remote_updated', 'last_sync',
+    )
+
+    def __init__(self, path, site, project, tsv_path=CACHE_FILE):
+        import sqlite3
+
+        self.path    = path
+        self.site    = site
+        self.project = project
+        self.pending = {}
+        self.pending_identities = {}
+        self.lock    = threading.RLock()
+        self.conn    = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.create_schema()
+        if tsv_path is not None:
+            self.migrate_tsv(tsv_path)
+
+    def create_schema(self):
+        with self.lock:
+            self.conn.executescript('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    site           TEXT NOT NULL,
+                    project        TEXT NOT NULL,
+                    issue_key      TEXT NOT NULL,
+                    summary        TEXT,
+                    hash           TEXT,
+                    hash_version   INTEGER,
+                    source_file    TEXT,
+                    header_path    TEXT,
+                    remote_updated TEXT,
+                    last_sync      TEXT,
+                    PRIMARY KEY (site, project, issue_key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS sync_state_hash        ON sync_state (site, project, hash);
+                CREATE INDEX IF NOT EXISTS sync_state_source      ON sync_state (site, project, source_file, header_path);
+                CREATE INDEX IF NOT EXISTS sync_state_header_path ON sync_state (site, project, header_path);
+                CREATE INDEX IF NOT EXISTS sync_state_updated     ON sync_state (site, project, remote_updated);
+                CREATE INDEX IF NOT EXISTS sync_state_last_sync   ON sync_state (site, project, last_sync);
+                CREATE TABLE IF NOT EXISTS migrations (
+                    source      TEXT NOT NULL,
+                    site        TEXT NOT NULL,
+                    project     TEXT NOT NULL,
+                    migrated_at TEXT,
+                    PRIMARY KEY (source, site, project)
+                );
+            ''')
+
+    def migrate_tsv(self, tsv_path):
+        """Import a legacy TSV cache once per (file, site, project)
+
+        Only keys belonging to this project are imported, and rows that
+        already exist in the database are left untouched.
+        """
+        if os.path.exists(tsv_path) is False:
+            return
+        source = os.path.abspath(tsv_path)
+        with self.lock:
+            done = self.conn.execute(
+                'SELECT 1 FROM migrations WHERE source = ? AND site = ? AND project = ?',
+                (source, self.site, self.project)
+            ).fetchone()
+            if done is not None:
+                return
+
+            legacy = SyncCache(tsv_path)
+            legacy.load()
+            prefix = '{}-'.format(self.project)
+            now    = _utcnow()
+            rows   = [
+                (self.site, self.project, key, summary.strip('"'), hash, HASH_VERSION, source_file, header_path, now)
+                for key, (summary, hash, source_file, header_path) in legacy.entries.items()
+                if key.startswith(prefix)
+            ]
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self.conn.executemany(
+                    'INSERT OR IGNORE INTO sync_state '
+                    '(site, project, issue_key, summary, hash, hash_version, source_file, header_path, last_sync) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                self.conn.execute(
+                    'INSERT INTO migrations (source, site, project, migrated_at) VALUES (?, ?, ?, ?)',
+                    (source, self.site, self.project, now)
+                )
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def get(self, key):
+        """Return the state row for `key` as a dict, or None"""
+        with self.lock:
+            if key in self.pending:
+                return dict(self.pending[key])
+            row = self.conn.execute(
+                'SELECT * FROM sync_state WHERE site = ? AND project = ? AND issue_key = ?',
+                (self.site, self.project, key)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_hash(self, key):
+        """Return the cached hash for `key`, or None when missing or stale"""
+        entry = self.get(key)
+        if entry is None or entry['hash_version'] != HASH_VERSION:
+            return None
+        return entry['hash']
+
+    def is_current(self, key, hash):
+        """True when `key` was last synced with content hash `hash`"""
+        return self.get_hash(key) == hash
+
+    def find_by_identity(self, source_file, header_path):
+        """Return (key, hash) last synced from this header of this file, or None"""
+        with self.lock:
+            key = self.pending_identities.get((source_file, header_path))
+            if key is not None:
+                return key, self.pending[key]['hash']
+            row = self.conn.execute(
+                'SELECT issue_key, hash FROM sync_state '
+                'WHERE site = ? AND project = ? AND source_file = ? AND header_path = ? AND hash_version = ? '
+                'ORDER BY last_sync DESC LIMIT 1',
+                (self.site, self.project, source_file, header_path, HASH_VERSION)
+            ).fetchone()
+        return (row['issue_key'], row['hash']) if row is not None else None
+
+    def find(self, **criteria):
+        """Return state rows of this site/project matching every column in `criteria`"""
+        unknown = set(criteria) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError('unknown sync state column(s): {}'.format(', '.join(sorted(unknown))))
+        self.flush()
+        clauses = ''.join(' AND {} = ?'.format(column) for column in criteria)
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT * FROM sync_state WHERE site = ? AND project = ?' + clauses,
+                (self.site, self.project, *criteria.values())
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def put(self, key, summary, hash, source_file=None, header_path=None, remote_updated=None):
+        """Record `hash` as the last synced content of `key`"""
+        with self.lock:
+            self.pending[key] = {
+                'site':           self.site,
+                'project':        self.project,
+                'issue_key':      key,
+                'summary':        summary,
+                'hash':           hash,
+                'hash_version':   HASH_VERSION,
+                'source_file':    source_file,
+                'header_path':    header_path,
+                'remote_updated': remote_updated,
+                'last_sync':      _utcnow(),
+            }
+            if source_file and header_path:
+                self.pending_identities[(source_file, header_path)] = key
+
+    def flush(self):
+        """Upsert every entry changed since the last flush in one transaction"""
+        with self.lock:
+            if len(self.pending) == 0:
+                return
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self.conn.executemany(
+                    'INSERT INTO sync_state '
+                    '(site, project, issue_key, summary, hash, hash_version, source_file, header_path, remote_updated, last_sync) '
+                    'VALUES (:site, :project, :issue_key, :summary, :hash, :hash_version, :source_file, :header_path, :remote_updated, :last_sync) '
+                    'ON CONFLICT (site, project, issue_key) DO UPDATE SET '
+                    'summary = excluded.summary, hash = excluded.hash, hash_version = excluded.hash_version, '
+                    'source_file = COALESCE(excluded.source_file, source_file), '
+                    'header_path = COALESCE(excluded.header_path, header_path), '
+                    'remote_updated = COALESCE(excluded.remote_updated, remote_updated), '
+                    'last_sync = excluded.last_sync',
+                    list(self.pending.values())
+                )
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.pending.clear()
+            self.pending_identities.clear()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+def _utcnow():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+SECTIONS_FILE = '.md2jira_sections.json'
+
+class SectionIndex:
+    """Byte offset, length, hash and issue key of every synced header block
+
+    Entries are grouped by source file and keyed by header path.  The JSON
+    file is read once, on first use, and written back atomically by
+    flush().
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=SECTIONS_FILE):
+        self.path  = path
+        self.files = None
+        self.dirty = False
+        self.lock  = threading.RLock()
+
+    def load(self):
+        with self.lock:
+            if self.files is not None:
+                return
+            self.files = {}
+            if os.path.exists(self.path) is False:
+                return
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                try:
+                    data = json.load(fh)
+                except ValueError:
+                    return
+            if data.get('version') == self.VERSION:
+                self.files = data.get('files', {})
+
+    def sections(self, source_file):
+        """Return a copy of the header path -> entry map of `source_file`"""
+        self.load()
+        with self.lock:
+            return dict(self.files.get(source_file, {}))
+
+    def record(self, issue):
+        """Remember the block `issue` was built from as synced"""
+        self.load()
+        entry = {
+            'offset': issue.source_offset,
+            'length': issue.source_length,
+            'hash':   issue.source_hash,
+            'key':    issue.key,
+        }
+        with self.lock:
+            sections = self.files.setdefault(issue.source_file, {})
+            if sections.get(issue.header_path) != entry:
+                sections[issue.header_path] = entry
+                self.dirty = True
+
+    def retain(self, source_file, header_paths):
+        """Forget sections of `source_file` that are no longer in the document"""
+        keep = set(header_paths)
+        self.forget(source_file, [h for h in self.sections(source_file) if h not in keep])
+
+    def forget(self, source_file, header_paths):
+        """Forget the sections of `source_file` at `header_paths`"""
+        self.load()
+        with self.lock:
+            sections = self.files.get(source_file, {})
+            for header_path in header_paths:
+                if sections.pop(header_path, None) is not None:
+                    self.dirty = True
+
+    def flush(self):
+        with self.lock:
+            if self.files is None or self.dirty is False:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmpname = tempfile.mkstemp(dir=directory, prefix='.md2jira_sections.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as tmpfile:
+                    json.dump({'version': self.VERSION, 'files': self.files}, tmpfile)
+                os.replace(tmpname, self.path)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+            self.dirty = False
+
+MIRROR_FILE = '.md2jira_mirror.json'
+
+class IssueMirror:
+    """Local copy of the issues of one project on one site
+
+    Every issue is held as key -> [summary, type, parent key, updated,
+    fingerprint], where the fingerprint is a hash of the content md2jira
+    writes (see MD2Jira.fingerprint()).  `last_sync` is the newest
+    `updated` seen, as the wall-clock minute Jira reported it, so the next
+    run only has to ask for issues updated since.  The JSON file holds one
+    such section per site and project; it is read once, on first use, and
+    written back atomically by flush().
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, site, project):
+        self.path      = path
+        self.target    = '{} {}'.format(site, project)
+        self.data      = None
+        self.summaries = {}
+        self.dirty     = False
+        self.lock      = threading.RLock()
+
+    def load(self):
+        with self.lock:
+            if self.data is not None:
+                return
+            self.data = {'version': self.VERSION, 'targets': {}}
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as fh:
+                    try:
+                        data = json.load(fh)
+                    except ValueError:
+                        data = {}
+                if data.get('version') == self.VERSION:
+                    self.data = data
+            self.data['targets'].setdefault(self.target, {'last_sync': None, 'issues': {}})
+            self._index()
+
+    def _index(self):
+        # The lowest key wins when several issues share a summary
+        self.summaries = {}
+        for key, entry in sorted(self.issues.items(), key=lambda item: _key_order(item[0]), reverse=True):
+            self.summaries[entry[0]] = key
+
+    @property
+    def issues(self):
+        self.load()
+        return self.data['targets'][self.target]['issues']
+
+    @property
+    def last_sync(self):
+        """Watermark of the last scan ("yyyy/MM/dd HH:mm"), or None before the first"""
+        self.load()
+        return self.data['targets'][self.target]['last_sync']
+
+    def find(self, summary):
+        """Return the key of the issue with exactly this summary, or None"""
+        self.load()
+        with self.lock:
+            return self.summaries.get(summary)
+
+    def get(self, key):
+        """Return [summary, type, parent, updated, fingerprint] of `key`, or None"""
+        self.load()
+        with self.lock:
+            entry = self.issues.get(key)
+            return list(entry) if entry is not None else None
+
+    def update(self, entries, full=False):
+        """Store scanned `entries` (key -> entry); returns the keys that drifted
+
+        An issue drifted when its fingerprint differs from the one stored by
+        the previous scan, i.e. its content was edited in Jira by someone
+        else.  Issues md2jira wrote itself carry no fingerprint until they
+        are scanned again, so they never count.  A full scan replaces the
+        whole section, which also drops issues deleted since.
+        """
+        self.load()
+        with self.lock:
+            issues  = self.issues
+            drifted = [
+                key for key, entry in entries.items()
+                if key in issues and issues[key][4] is not None and issues[key][4] != entry[4]
+            ]
+            if full:
+                issues.clear()
+            issues.update(entries)
+            target = self.data['targets'][self.target]
+            parsed = (_parse_updated(entry[3]) for entry in entries.values() if entry[3])
+            newest = max((moment for moment in parsed if moment is not None), default=None)
+            if newest is not None:
+                target['last_sync'] = newest[1]
+            elif full:
+                target['last_sync'] = target['last_sync'] or '1970/01/01 00:00'
+            self._index()
+            self.dirty = True
+        return sorted(drifted, key=_key_order)
+
+    def put(self, key, summary, type, parent=None):
+        """Record an issue md2jira just created or updated
+
+        Its fingerprint is unknown until the next scan.  Without `parent`
+        the one already recorded is kept.
+        """
+        self.load()
+        with self.lock:
+            previous = self.issues.get(key)
+            if previous is not None:
+                parent  = parent if parent is not None else previous[2]
+                updated = previous[3]
+            else:
+                updated = None
+            self.issues[key] = [summary, type, parent, updated, None]
+            if previous is not None and self.summaries.get(previous[0]) == key:
+                del self.summaries[previous[0]]
+            current = self.summaries.get(summary)
+            if current is None or _key_order(key) < _key_order(current):
+                self.summaries[summary] = key
+            self.dirty = True
+
+    def flush(self):
+        with self.lock:
+            if self.data is None or self.dirty is False:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmpname = tempfile.mkstemp(dir=directory, prefix='.md2jira_mirror.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as tmpfile:
+                    json.dump(self.data, tmpfile)
+                os.replace(tmpname, self.path)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+            self.dirty = False
+
+def _key_order(key):
+    project, _, number = key.rpartition('-')
+    return (project, int(number) if number.isdigit() else 0)
+
+def _parse_updated(updated):
+    """Return (datetime, "yyyy/MM/dd HH:mm") for a Jira `updated` timestamp
+
+    JQL reads dates in the user's time zone, the zone Jira reports
+    timestamps in, so the watermark keeps the reported wall-clock time.
+    """
+    for pattern in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z'):
+        try:
+            moment = datetime.strptime(updated, pattern)
+        except ValueError:
+            continue
+        return moment, updated[:16].replace('-', '/').replace('T', ' ')
+    return None
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+
+"""Sync documents into several Jira sites and projects from one process
+
+    md2jira targets md2jira-targets.json
+
+The JSON config lists the targets.  Top-level `inputs` and `defaults`
+apply to every target unless it sets its own:
+
+    {
+      "inputs":   ["planning/"],
+      "defaults": {"jobs": 4, "rate": 10},
+      "targets": [
+        {"name": "acme-plan", "base_url": "https://acme.atlassian.net", "project": "PLAN",
+         "auth_env": "ACME_JIRA_AUTH_KEY", "rate": 20},
+        {"name": "partner", "base_url": "https://partner.atlassian.net", "project": "ACME",
+         "auth_env": "PARTNER_JIRA_AUTH_KEY", "inputs": ["planning/shared.md"], "bulk": true}
+      ]
+    }
+
+Every target gets its own MD2Jira, and with it its own connection pool,
+credentials (read from the environment variable named by `auth_env`,
+never from the config), rate limit and in-flight budget, and sync state
+under `.md2jira/<name>/`, including the issue mirror when `mirror`,
+--mirror or MD2JIRA_MIRROR asks for one.  All targets run at once, one
+thread each, so the run takes as long as the slowest target instead of
+the sum of all.
+"""
+
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+
+from .md2jira import MD2Jira, expand_inputs, load_environment
+
+# Where each target keeps its sync state, section index and mirror
+STATE_ROOT  = '.md2jira'
+# Settings a target (or the defaults) may set
+TARGET_KEYS = ('name', 'base_url', 'project', 'auth_env', 'inputs', 'jobs', 'rate', 'bulk', 'adf',
+               'full', 'mirror', 'checklist_field', 'state_dir')
+
+class TargetError(Exception):
+    """Raised for a targets config that cannot be run"""
+
+def load_targets(path):
+    """Read a targets config and return one settings dict per target
+
+    Top-level `inputs` and `defaults` are merged into every target.  Each
+    target needs a project, and a name unique in the config (by default
+    the site's host and the project key).
+    """
+    with open(path, 'r', encoding='utf-8') as fh:
+        try:
+            config = json.load(fh)
+        except ValueError as e:
+            raise TargetError('{}: not valid JSON: {}'.format(path, e))
+    if not isinstance(config, dict) or not config.get('targets'):
+        raise TargetError('{}: no "targets" listed'.format(path))
+
+    defaults = dict(config.get('defaults') or {})
+    if 'inputs' in config:
+        defaults.setdefault('inputs', config['inputs'])
+    targets = []
+    names   = set()
+    for number, target in enumerate(config['targets'], 1):
+        settings = dict(defaults, **target)
+        unknown  = set(settings) - set(TARGET_KEYS)
+        if unknown:
+            raise TargetError('target {}: unknown setting(s): {}'.format(number, ', '.join(sorted(unknown))))
+        if not settings.get('project'):
+            raise TargetError('target {}: no "project"'.format(number))
+        if not settings.get('inputs'):
+            raise TargetError('target {}: no "inputs"'.format(number))
+        if 'name' not in settings:
+            host = (settings.get('base_url') or 'default').split('://', 1)[-1].strip('/')
+            settings['name'] = '{}_{}'.format(host, settings['project'])
+        if settings['name'] in names:
+            raise TargetError('target {}: name "{}" is used twice'.format(number, settings['name']))
+        names.add(settings['name'])
+        targets.append(settings)
+    return targets
+
+def target_md2jira(settings, cli_args, environ=None):
+    """Build the MD2Jira syncing one target
+
+    The environment (after .env is loaded) supplies everything the target
+    does not set.  Options given on the command line apply to every
+    target unless the target sets them.
+    """
+    environ = dict(os.environ if environ is None else environ)
+    name    = settings['name']
+    if settings.get('base_url'):
+        environ['JIRA_BASE_URL'] = settings['base_url']
+    auth_env = settings.get('auth_env', 'JIRA_AUTH_KEY')
+    if not environ.get(auth_env):
+        raise TargetError('target "{}": environment variable {} is not set'.format(name, auth_env))
+    environ['JIRA_AUTH_KEY'] = environ[auth_env]
+    if 'checklist_field' in settings:
+        environ.pop('JIRA_CHECKLIST_CUSTOMFIELD', None)
+        if settings['checklist_field']:
+            environ['JIRA_CHECKLIST_CUSTOMFIELD'] = settings['checklist_field']
+
+    state_dir = settings.get('state_dir') or os.path.join(STATE_ROOT, name)
+    os.makedirs(state_dir, exist_ok=True)
+    # One mirror file per target: targets sharing one would overwrite each other's sections
+    mirror = environ.pop('MD2JIRA_MIRROR', None)
+    mirror = settings.get('mirror', getattr(cli_args, 'mirror', None) or mirror)
+    if mirror:
+        mirror = os.path.join(state_dir, 'mirror.json')
+
+    args = argparse.Namespace(**vars(cli_args))
+    args.INFILE           = settings['inputs']
+    args.JIRA_PROJECT_KEY = settings['project']
+    args.state_dir        = state_dir
+    args.mirror           = mirror or None
+    for option in ('jobs', 'rate', 'bulk', 'adf', 'full'):
+        if option in settings:
+            setattr(args, option, settings[option])
+    return MD2Jira(args, environ)
+
+# Name of the target the current thread works for; MD2Jira's worker pools copy it along
+current_target = contextvars.ContextVar('current_target', default=None)
+
+class TargetOutput:
+    """Stand-in for sys.stdout that prefixes each line with the name of the target printing it"""
+
+    def __init__(self, stream):
+        self.stream  = stream
+        self.buffers = {}
+        self.lock    = threading.Lock()
+
+    def start(self, name):
+        current_target.set(name)
+
+    def write(self, text):
+        name = current_target.get()
+        if name is None:
+            return self.stream.write(text)
+        with self.lock:
+            *lines, self.buffers[name] = (self.buffers.get(name, '') + text).split('\n')
+            for line in lines:
+                self.stream.write('[{}] {}\n'.format(name, line))
+        return len(text)
+
+    def finish(self):
+        if self.buffers.get(current_target.get()):
+            self.write('\n')
+        current_target.set(None)
+
+    def flush(self):
+        self.stream.flush()
+
+def sync_target(md2j):
+    """Sync every input of one target, file by file; returns the seconds it took
+
+    Files are parsed in this thread rather than in a process pool, since
+    the other targets are running alongside.
+    """
+    started = time.perf_counter()
+    try:
+        for path in expand_inputs(md2j.args.INFILE):
+            md2j.sync_file(path)
+        md2j.print_transport_report()
+    finally:
+        md2j.finish_run()
+    return time.perf_counter() - started
+
+def run_targets(targets, output=None):
+    """Sync every (name, MD2Jira) target at once, one thread each
+
+    Returns {name: (seconds, error or None)}.  A target that fails does not
+    stop the others.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    output  = output or TargetOutput(sys.stdout)
+    results = {}
+
+    def run(name, md2j):
+        output.start(name)
+        started = time.perf_counter()
+        try:
+            return sync_target(md2j), None
+        except Exception as e:
+            print('ERROR: {}'.format(e))
+            return time.perf_counter() - started, e
+        finally:
+            output.finish()
+
+    stdout, sys.stdout = sys.stdout, output
+    try:
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            futures = {name: pool.submit(run, name, md2j) for name, md2j in targets}
+            for name, future in futures.items():
+                results[name] = future.result()
+    finally:
+        sys.stdout = stdout
+    return results
+
+def print_target_summary(targets, results, elapsed):
+    """Print outcome counts, requests and time per target, and the time saved by running them at once"""
+    for name, md2j in targets:
+        seconds, error = results[name]
+        report = md2j.transport.report()
+        status = 'FAILED ({})'.format(error) if error is not None else md2j._format_counts(md2j._outcome_totals())
+        print('{}: {}; {} requests, {:.1f}s throttled, {:.2f}s'.format(
+            name, status, report['requests'], report['throttled_seconds'], seconds))
+    print('Targets: {} synced in {:.2f}s ({:.2f}s one after another)'.format(
+        len(targets), elapsed, sum(seconds for seconds, _error in results.values())))
+
+def sync_targets(path, cli_args):
+    """Sync every target in the config at `path`; returns the number of targets that failed"""
+    load_environment()
+    targets = [(settings['name'], target_md2jira(settings, cli_args)) for settings in load_targets(path)]
+    started = time.perf_counter()
+    results = run_targets(targets)
+    print_target_summary(targets, results, time.perf_counter() - started)
+    return sum(1 for _seconds, error in results.values() if error is not None)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+# Verbs that may be repeated without side effects
+IDEMPOTENT_VERBS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+# Statuses meaning "slow down": the request was not processed
+THROTTLE_STATUSES = (429,)
+# Statuses worth retrying when the request is idempotent
+RETRY_STATUSES = (429, 502, 503, 504)
+
+class JiraTransport:
+    """Send requests through a urllib3 pool without getting throttled into failures
+
+    * Honours `Retry-After` and `X-RateLimit-Remaining`/`X-RateLimit-Reset`
+      by pausing every worker until the server accepts requests again.
+    * Retries 429s for every request and 5xx/connection errors for
+      idempotent ones, with jittered exponential backoff.
+    * Spaces requests with a token bucket when `rate` (requests per second)
+      is set.
+    * Adapts the number of requests in flight AIMD-style: the limit grows
+      by one per window of successful requests and halves whenever Jira
+      throttles us or reports `X-RateLimit-NearLimit`.
+
+    `throttled_seconds` accumulates all the time spent waiting because of
+    the above.  Without an `http` pool, `pool_factory()` creates one on
+    the first request, so runs that never touch the network never pay for
+    importing urllib3.
+    """
+
+    def __init__(self, http=None, rate=None, burst=None, max_in_flight=1, max_retries=5,
+                 backoff_base=0.5, backoff_max=30.0, sleep=time.sleep, clock=time.monotonic,
+                 pool_factory=None):
+        self._http         = http
+        self.pool_factory  = pool_factory
+        self.rate          = rate
+        self.burst         = burst if burst is not None else max(1.0, rate or 1.0)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries   = max_retries
+        self.backoff_base  = backoff_base
+        self.backoff_max   = backoff_max
+        self.sleep         = sleep
+        self.clock         = clock
+
+        self.lock          = threading.Lock()
+        self.slots         = threading.Condition(self.lock)
+        self.tokens        = self.burst
+        self.refilled_at   = clock()
+        self.blocked_until = 0.0
+        self.limit         = float(self.max_in_flight)
+        self.in_flight     = 0
+
+        self.requests          = 0
+        self.retries           = 0
+        self.throttled         = 0
+        self.throttled_seconds = 0.0
+        self.bytes_sent        = 0
+        self.bytes_received    = 0
+
+    @property
+    def http(self):
+        if self._http is None:
+            with self.lock:
+                if self._http is None:
+                    self._http = self.pool_factory()
+        return self._http
+
+    @http.setter
+    def http(self, http):
+        self._http = http
+
+    def request(self, verb, url, headers=None, body=None, idempotent=None):
+        """Send one request, retrying and pacing as needed; returns the final response"""
+        from urllib3.exceptions import HTTPError
+
+        if idempotent is None:
+            idempotent = verb in IDEMPOTENT_VERBS
+
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                resp = self.http.request(verb, url, headers=headers, body=body, retries=False)
+            except HTTPError:
+                self._release(success=False)
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self._count_retry()
+                self._backoff(attempt)
+                continue
+
+            throttled = resp.status in THROTTLE_STATUSES
+            self._count_bytes(body, resp)
+            self._observe(resp)
+            self._release(success=not throttled and resp.status < 500)
+
+            retryable = resp.status in THROTTLE_STATUSES or (idempotent and resp.status in RETRY_STATUSES)
+            if not retryable or attempt >= self.max_retries:
+                return resp
+            attempt += 1
+            self._count_retry()
+            retry_after = self._retry_after(resp)
+            if retry_after is not None:
+                self._block_for(retry_after)
+            else:
+                self._backoff(attempt)
+
+    def report(self):
+        """Return counters describing the traffic sent so far"""
+        return {
+            'requests':          self.requests,
+            'retries':           self.retries,
+            'throttled':         self.throttled,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'in_flight_limit':   round(self.limit, 2),
+            'bytes_sent':        self.bytes_sent,
+            'bytes_received':    self.bytes_received,
+        }
+
+    def _count_bytes(self, body, resp):
+        received = len(getattr(resp, 'data', None) or b'')
+        with self.lock:
+            self.bytes_sent     += len(body or b'')
+            self.bytes_received += received
+
+    def _acquire(self):
+        """Wait for a concurrency slot, a token and the end of any server-imposed pause"""
+        with self.slots:
+            while self.in_flight >= int(self.limit):
+                self.slots.wait()
+            self.in_flight += 1
+            self.requests  += 1
+
+        while True:
+            with self.lock:
+                now  = self.clock()
+                wait = self.blocked_until - now
+                if wait <= 0 and self.rate:
+                    self.tokens      = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+                    self.refilled_at = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                    else:
+                        wait = (1 - self.tokens) / self.rate
+                if wait <= 0:
+                    return
+                self.throttled_seconds += wait
+            self.sleep(wait)
+
+    def _release(self, success):
+        with self.slots:
+            self.in_flight -= 1
+            if success:
+                # Additive increase: +1 per `limit` successful requests
+                self.limit = min(float(self.max_in_flight), self.limit + 1.0 / self.limit)
+            self.slots.notify_all()
+
+    def _decrease(self):
+        with self.slots:
+            self.limit = max(1.0, self.limit / 2)
+
+    def _observe(self, resp):
+        """Adjust pacing from the status and rate-limit headers of `resp`"""
+        headers = resp.headers or {}
+        if resp.status in THROTTLE_STATUSES:
+            with self.lock:
+                self.throttled += 1
+            self._decrease()
+        elif str(headers.get('X-RateLimit-NearLimit', '')).lower() == 'true':
+            self._decrease()
+
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset     = _parse_time(headers.get('X-RateLimit-Reset'))
+        if remaining is not None and reset is not None:
+            try:
+                exhausted = int(remaining) <= 0
+            except ValueError:
+                exhausted = False
+            if exhausted:
+                self._block_for((reset - datetime.now(timezone.utc)).total_seconds())
+
+    def _retry_after(self, resp):
+        value = (resp.headers or {}).get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            when = _parse_time(value)
+            if when is None:
+                return None
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def _count_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def _block_for(self, seconds):
+        """Pause every worker for `seconds` (plus a little jitter)"""
+        if seconds <= 0:
+            return
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds * random.uniform(1.0, 1.1))
+
+    def _backoff(self, attempt):
+        """Sleep with full-jitter exponential backoff before retry `attempt`"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        with self.lock:
+            self.throttled_seconds += delay
+        self.sleep(delay)
+
+def _parse_time(value):
+    """Parse an ISO 8601 or HTTP date into an aware datetime, or None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# Quiet period after the last file event before a re-sync starts
+WATCH_DEBOUNCE      = 0.1
+# A file that never stops changing is synced after this long anyway
+WATCH_MAX_DELAY     = 1.0
+# How often the polling fallback stats the watched files
+WATCH_POLL_INTERVAL = 0.25
+# How long to block waiting for events before checking whether to stop
+WATCH_TICK          = 0.5
+
+# inotify(7) events that can change, add or remove a watched file; editors
+# often save by writing a temporary file and renaming it over the original
+IN_MODIFY      = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM  = 0x040
+IN_MOVED_TO    = 0x080
+IN_CREATE      = 0x100
+IN_DELETE      = 0x200
+INOTIFY_MASK   = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# Flags the kernel adds to events: the watch was removed, the entry is a directory
+IN_IGNORED     = 0x8000
+IN_ISDIR       = 0x40000000
+# struct inotify_event without its trailing name: wd, mask, cookie, len
+INOTIFY_EVENT  = struct.Struct('iIII')
+
+def snapshot(paths):
+    """Return {path: (mtime in ns, size)} for the files in `paths` that exist"""
+    state = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+def input_directories(inputs):
+    """The inputs that are directories, whose new subdirectories are watched too"""
+    return [os.path.abspath(path) for path in inputs if os.path.isdir(path)]
+
+def watch_directories(inputs, paths):
+    """Directories to watch: those holding `paths`, plus every directory given as input"""
+    directories = {os.path.dirname(os.path.abspath(path)) for path in paths}
+    for path in input_directories(inputs):
+        for root, _dirs, _files in os.walk(path):
+            directories.add(root)
+    return sorted(directories)
+
+class PollingWatcher:
+    """Reports a change when the stat signature of a watched file differs from the last check"""
+
+    def __init__(self, expand, interval=WATCH_POLL_INTERVAL):
+        self.expand   = expand
+        self.interval = interval
+        self.state    = snapshot(_expand(expand))
+
+    def wait(self, timeout):
+        """Return True as soon as something changed, False if nothing did within `timeout`"""
+        deadline = time.monotonic() + timeout
+        while True:
+            state = snapshot(_expand(self.expand))
+            if state != self.state:
+                self.state = state
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Blocks on inotify events for the directories holding the watched files (Linux only)
+
+    Events only wake the watch loop up; which files actually changed is
+    decided by comparing stat signatures, so editor swap files and the
+    like cost a stat call and nothing more.  Directories created later
+    under one of the `roots` (the input directories) are watched as soon
+    as their creation is reported.
+    """
+
+    def __init__(self, directories, roots=()):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd   = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.libc        = libc
+        self.fd          = fd
+        self.roots       = [os.path.abspath(root) for root in roots]
+        # Watch descriptor -> the directory it watches
+        self.directories = {}
+        try:
+            for directory in directories:
+                self.add(directory)
+        except OSError:
+            os.close(fd)
+            raise
+
+    def add(self, directory):
+        import ctypes
+
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), 'cannot watch {}'.format(directory))
+        self.directories[wd] = directory
+
+    def wait(self, timeout):
+        """Return True when events arrived within `timeout`, draining them all"""
+        readable, _writable, _errors = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        events = []
+        try:
+            while True:
+                data = os.read(self.fd, 65536)
+                if not data:
+                    break
+                events.append(data)
+        except BlockingIOError:
+            pass
+        self.follow_directories(b''.join(events))
+        return True
+
+    def follow_directories(self, data):
+        """Watch directories created or moved under a root, and forget removed ones"""
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name    = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            parent = self.directories.get(wd)
+            if not (mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and parent and self.under_root(parent)):
+                continue
+            # Subdirectories may already exist by the time the event is read
+            for directory, _dirs, _files in os.walk(os.path.join(parent, name)):
+                try:
+                    self.add(directory)
+                except OSError:
+                    pass
+
+    def under_root(self, directory):
+        return any(directory == root or directory.startswith(root + os.sep) for root in self.roots)
+
+    def close(self):
+        os.close(self.fd)
+
+def open_watcher(expand, directories, roots=()):
+    """inotify on Linux, stat polling everywhere else or when inotify is unavailable"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories, roots)
+        except (OSError, AttributeError) as e:
+            print('WARNING: inotify unavailable ({}), polling for changes'.format(e))
+    return PollingWatcher(expand)
+
+def watch_changes(expand, watcher, state, debounce=WATCH_DEBOUNCE, stop=None):
+    """Yield the list of changed files once per burst of edits, until `stop` is set
+
+    `expand` returns the files currently being watched, so new files in a
+    watched directory are picked up, and `state` is the snapshot() they
+    were last synced at; taking it before that sync means a save made
+    while it ran is not missed.  After the first event the burst is given
+    `debounce` seconds of quiet (at most WATCH_MAX_DELAY) to settle, so a
+    save that writes, renames and touches the file syncs once.
+    """
+    stop = stop or threading.Event()
+    try:
+        while not stop.is_set():
+            if not watcher.wait(WATCH_TICK):
+                continue
+            deadline = time.monotonic() + WATCH_MAX_DELAY
+            while time.monotonic() < deadline and watcher.wait(debounce):
+                pass
+            current = snapshot(_expand(expand))
+            changed = [path for path, signature in current.items() if state.get(path) != signature]
+            state   = current
+            if changed and not stop.is_set():
+                yield changed
+    finally:
+        watcher.close()
+
+def _expand(expand):
+    try:
+        return expand()
+    except FileNotFoundError:
+        return []
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+
+import re
+
+# Bump when the output of md_to_wiki() changes, so skipped sections are re-converted
+CONVERTER_VERSION = 1
+
+# Lines starting with one of these may open or close a code block
+FENCE_CHARS   = frozenset('`~{')
+# First characters of list items and rules
+LIST_CHARS    = frozenset('-*+_0123456789')
+# Lines containing none of these need no inline conversion
+INLINE_CHARS  = frozenset('`![<*_~')
+
+FENCE_RE      = re.compile(r'^(`{3,}|~{3,})\s*([\w+#.-]*)')
+WIKI_BLOCK_RE = re.compile(r'^\{(code|noformat)(?::[^}]*)?\}')
+HEADING_RE    = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?$')
+LIST_RE       = re.compile(r'^([ \t]*)([-*+]|\d+[.)])\s+(.*)$')
+QUOTE_RE      = re.compile(r'^>\s?(.*)$')
+RULE_RE       = re.compile(r'^(?:-[ \t]*){3,}$|^(?:\*[ \t]*){3,}$|^(?:_[ \t]*){3,}$')
+TABLE_SEP_RE  = re.compile(r'^\|?(?:\s*:?-+:?\s*\|)+(?:\s*:?-+:?\s*)?$')
+INLINE_RE     = re.compile(r'''
+      (?P<tick>`+)(?P<code>.+?)(?P=tick)
+    | !\[(?P<alt>[^\]]*)\]\((?P<src>[^)\s]+)[^)]*\)
+    | \[(?P<text>[^\]]+)\]\((?P<href>[^)]+)\)
+    | <(?P<autolink>https?://[^>\s]+)>
+    | \*\*(?=\S)(?P<bold>.+?)(?<=\S)\*\*
+    | (?<!\w)__(?=\S)(?P<ubold>.+?)(?<=\S)__(?!\w)
+    | ~~(?=\S)(?P<strike>.+?)(?<=\S)~~
+''', re.VERBOSE)
+
+def fence_delimiter(stripped):
+    """Return the delimiter of a code block opened or closed by this line, or None
+
+    Both Markdown fences (``` and ~~~) and Jira's own {code}/{noformat}
+    macros are recognised, since documents mix the two.
+    """
+    match = FENCE_RE.match(stripped)
+    if match:
+        return match.group(1)[0] * 3
+    match = WIKI_BLOCK_RE.match(stripped)
+    # {code}x{code} on a single line neither opens nor closes a block
+    if match and stripped.count('{' + match.group(1)) == 1:
+        return match.group(1)
+    return None
+
+def track_fence(fence, stripped):
+    """Return the code block state after `stripped`, given the state `fence` before it"""
+    delimiter = fence_delimiter(stripped) if stripped[:1] in FENCE_CHARS else None
+    if fence is None:
+        return delimiter
+    return None if delimiter == fence else fence
+
+def md_to_wiki(lines):
+    """Convert Markdown lines (without line endings) to a list of Jira wiki lines
+
+    A single pass over the lines handles fenced code, headings,
+    bold/strikethrough, inline code, links, images, nested lists, tables,
+    block quotes and rules.  Jira markup already present in the document
+    (`h3.`, `*bold*`, `{code}` ...) is left untouched, so single `*text*`
+    stays Jira bold rather than becoming Markdown italic.
+    """
+    output   = []
+    append   = output.append
+    fence    = None
+    lists    = []      # (indent, marker) per open list level
+    in_table = False
+
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+
+        if fence is not None:
+            if stripped[:1] in FENCE_CHARS and fence_delimiter(stripped) == fence:
+                fence = None
+                append('{code}' if is_markdown_fence(stripped) else stripped)
+            else:
+                append(line)
+            continue
+
+        if not stripped:
+            in_table = False
+            append('')
+            continue
+
+        first = stripped[0]
+
+        if first in FENCE_CHARS:
+            fence = fence_delimiter(stripped)
+            if fence is not None:
+                lists = []
+                if is_markdown_fence(stripped):
+                    language = FENCE_RE.match(stripped).group(2)
+                    append('{code:' + language + '}' if language else '{code}')
+                else:
+                    append(stripped)
+                continue
+
+        elif first == '|':
+            if TABLE_SEP_RE.match(stripped):
+                continue
+            if in_table:
+                append(table_row(stripped, '|'))
+                continue
+            if index + 1 < len(lines) and TABLE_SEP_RE.match(lines[index + 1].strip()):
+                in_table = True
+                append(table_row(stripped, '||'))
+                continue
+
+        in_table = False
+
+        if first in LIST_CHARS or line[0] in ' \t':
+            if RULE_RE.match(stripped):
+                lists = []
+                append('----')
+                continue
+            match = LIST_RE.match(line)
+            if match:
+                indent, bullet, text = match.groups()
+                width  = len(indent.expandtabs(4))
+                marker = '#' if bullet[0].isdigit() else '*'
+                while lists and lists[-1][0] > width:
+                    lists.pop()
+                if lists and lists[-1][0] == width:
+                    lists[-1] = (width, marker)
+                else:
+                    lists.append((width, marker))
+                append(''.join([m for _w, m in lists]) + ' ' + inline(text))
+                continue
+
+        lists = []
+
+        if first == '#':
+            match = HEADING_RE.match(stripped)
+            if match:
+                append('h{}. {}'.format(len(match.group(1)), inline(match.group(2))))
+                continue
+        elif first == '>':
+            append('bq. ' + inline(QUOTE_RE.match(stripped).group(1)))
+            continue
+
+        append(inline(stripped))
+
+    # Close a Markdown fence left open at the end of the description
+    if fence in ('```', '~~~'):
+        append('{code}')
+    return output
+
+def is_markdown_fence(stripped):
+    """True when `stripped` is a Markdown fence rather than a Jira macro"""
+    return stripped[:1] in '`~'
+
+def table_row(stripped, separator):
+    cells = stripped.strip('|').split('|')
+    return '{}{}{}'.format(
+        separator, separator.join(inline(cell.strip()) for cell in cells), separator)
+
+def inline(text):
+    """Convert inline Markdown markup in one line of text"""
+    if INLINE_CHARS.isdisjoint(text):
+        return text
+    return INLINE_RE.sub(_inline_replacement, text)
+
+def _inline_replacement(match):
+    groups = match.groupdict()
+    if groups['tick'] is not None:
+        return '{{{{{}}}}}'.format(groups['code'].strip())
+    if groups['src'] is not None:
+        return '!{}!'.format(groups['src'])
+    if groups['href'] is not None:
+        return '[{}|{}]'.format(inline(groups['text']), groups['href'])
+    if groups['autolink'] is not None:
+        return '[{}]'.format(groups['autolink'])
+    if groups['bold'] is not None:
+        return '*{}*'.format(inline(groups['bold']))
+    if groups['ubold'] is not None:
+        return '*{}*'.format(inline(groups['ubold']))
+    return '-{}-'.format(inline(groups['strike']))
+
+# ---------------------------------------------------------------------------
+# Jira wiki markup -> Markdown (export)
+# ---------------------------------------------------------------------------
+
+WIKI_HEADING_RE = re.compile(r'^h([1-6])\.\s+(.*)$')
+WIKI_CODE_RE    = re.compile(r'^\{code(?::([\w+#.-]+))?\}$')
+WIKI_LIST_RE    = re.compile(r'^([*#-]+)\s+(.*)$')
+# Cell separators outside [text|link] brackets
+WIKI_CELL_RE    = re.compile(r'\|+(?![^\[]*\])')
+WIKI_INLINE_RE  = re.compile(r'''
+      \{\{(?P<code>.+?)\}\}
+    | \[(?P<text>[^\]|]+)\|(?P<href>[^\]]+)\]
+    | \[(?P<bare>https?://[^\]\s|]+)\]
+    | !(?P<src>[^!\s|]+)!
+    | (?<![\w*])\*(?=\S)(?P<strong>.+?)(?<=\S)\*(?![\w*])
+    | (?<![\w-])-(?=\S)(?P<strike>.+?)(?<=\S)-(?![\w-])
+''', re.VERBOSE)
+
+def wiki_to_md(lines):
+    """Convert Jira wiki lines to a list of Markdown lines
+
+    The inverse of md_to_wiki() for the constructs it emits, so exported
+    descriptions convert back to the same wiki markup.  h1.-h3. headings
+    are kept as wiki markup, since #-#### in Markdown are issue headers
+    here, and so is anything without a Markdown equivalent ({noformat},
+    {panel}, _emphasis_, colours ...), which md_to_wiki() passes through.
+    """
+    output   = []
+    append   = output.append
+    fence    = None
+
+    for line in lines:
+        stripped = line.strip()
+
+        if fence is not None:
+            if stripped == '{' + fence + '}':
+                append('```' if fence == 'code' else stripped)
+                fence = None
+            else:
+                append(line)
+            continue
+
+        if not stripped:
+            append('')
+            continue
+
+        first = stripped[0]
+        if first == '{':
+            match = WIKI_CODE_RE.match(stripped)
+            if match:
+                fence = 'code'
+                append('```' + (match.group(1) or ''))
+                continue
+            delimiter = fence_delimiter(stripped)
+            if delimiter is not None:
+                fence = delimiter
+                append(stripped)
+                continue
+
+        if first == '|':
+            cells = WIKI_CELL_RE.split(stripped.strip('|'))
+            append('| {} |'.format(' | '.join(wiki_inline(cell.strip()) for cell in cells)))
+            if stripped.startswith('||'):
+                append('|{}|'.format('|'.join('---' for _cell in cells)))
+            continue
+
+        if first in '*#-':
+            if stripped == '----':
+                append('---')
+                continue
+            match = WIKI_LIST_RE.match(stripped)
+            if match and set(match.group(1)) <= {'*', '#'}:
+                markers, text = match.groups()
+                bullet = '1.' if markers[-1] == '#' else '-'
+                append('{}{} {}'.format('  ' * (len(markers) - 1), bullet, wiki_inline(text)))
+                continue
+
+        if first == 'h':
+            match = WIKI_HEADING_RE.match(stripped)
+            if match and int(match.group(1)) > 3:
+                append('{} {}'.format('#' * int(match.group(1)), wiki_inline(match.group(2))))
+                continue
+        elif stripped.startswith('bq. '):
+            append('> ' + wiki_inline(stripped[4:]))
+            continue
+
+        append(wiki_inline(stripped))
+
+    if fence == 'code':
+        append('```')
+    return output
+
+def wiki_inline(text):
+    """Convert inline Jira markup in one line of text to Markdown"""
+    if not any(c in text for c in '{[!*-'):
+        return text
+    return WIKI_INLINE_RE.sub(_wiki_inline_replacement, text)
+
+def _wiki_inline_replacement(match):
+    groups = match.groupdict()
+    if groups['code'] is not None:
+        return '`{}`'.format(groups['code'])
+    if groups['href'] is not None:
+        return '[{}]({})'.format(wiki_inline(groups['text']), groups['href'])
+    if groups['bare'] is not None:
+        return '<{}>'.format(groups['bare'])
+    if groups['src'] is not None:
+        return '![]({})'.format(groups['src'])
+    if groups['strong'] is not None:
+        return '**{}**'.format(wiki_inline(groups['strong']))
+    return '~~{}~~'.format(wiki_inline(groups['strike']))
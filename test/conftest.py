@@ -0,0 +1,53 @@
+"""Fixtures shared by the test suite.
+
+  - make_md2jira: builds MD2Jira instances with stub credentials, optionally
+    pointed at an in-process fake Jira server
+  - sync: writes a document into the test's directory and syncs it
+"""
+
+import argparse
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.md2jira import MD2Jira
+
+# Stub credentials: nothing is sent with them unless JIRA_BASE_URL points at a fake server
+ENVIRONMENT = {
+    'JIRA_PROJECT_SUBDOMAIN': 'fake',
+    'JIRA_DOMAIN': 'atlassian.net',
+    'JIRA_AUTH_KEY': 'dW5zZXQ6dW5zZXQ=',
+    'JIRA_PROJECT_KEY': 'TEST',
+}
+
+
+@pytest.fixture
+def make_md2jira():
+    """make_md2jira(infile='doc.md', jira=None, **args) -> MD2Jira
+
+    `jira` is a FakeJira to send requests to; other keyword arguments
+    become command line options.
+    """
+    def make(infile='doc.md', jira=None, **overrides):
+        env = dict(ENVIRONMENT)
+        if jira is not None:
+            env['JIRA_BASE_URL'] = jira.url
+        defaults = {'INFILE': infile, 'JIRA_PROJECT_KEY': 'TEST', 'verbose': False}
+        defaults.update(overrides)
+        with patch.dict(os.environ, env, clear=False):
+            return MD2Jira(argparse.Namespace(**defaults))
+    return make
+
+
+@pytest.fixture
+def sync(make_md2jira, tmp_path, monkeypatch):
+    """sync(jira, text, **args) -> MD2Jira: write `text` to doc.md in tmp_path and sync it into `jira`"""
+    def run(jira, text, **overrides):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / 'doc.md'
+        path.write_text(text, encoding='utf-8')
+        md2j = make_md2jira([str(path)], jira, **overrides)
+        md2j.parse_markdown()
+        return md2j
+    return run
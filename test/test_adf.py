@@ -0,0 +1,190 @@
+"""Unit tests for the ADF writer and canonical comparison.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - Markdown and wiki markup convert to the expected ADF structure
+  - canonical_adf() ignores ids, split text runs and trimmed whitespace,
+    but not text or formatting changes
+  - deeply nested documents do not hit the recursion limit
+  - adf_to_wiki() reverses wiki_to_adf(), so exported descriptions compare equal
+  - a remote ADF description equal to the local one is not updated
+  - --adf writes ADF descriptions through the v3 API
+"""
+
+import json
+from unittest.mock import patch, MagicMock
+
+from src.adf import markdown_to_adf, wiki_to_adf, adf_to_wiki, canonical_adf, adf_to_text
+from src.md2jira import MD2Jira, Issue, IssueType
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _paragraph(*content):
+    return {'type': 'paragraph', 'content': list(content)}
+
+
+def _text(text, *marks):
+    node = {'type': 'text', 'text': text}
+    if marks:
+        node['marks'] = [{'type': m} for m in marks]
+    return node
+
+
+def _nested(depth):
+    node = _paragraph(_text('deep'))
+    for _ in range(depth):
+        node = {'type': 'blockquote', 'content': [node]}
+    return {'type': 'doc', 'version': 1, 'content': [node]}
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+class TestWriter:
+    def test_paragraph_marks_and_link(self):
+        doc = markdown_to_adf('Some **bold** and `code` with [a link](https://x.y)')
+        assert doc['content'] == [_paragraph(
+            _text('Some '), _text('bold', 'strong'), _text(' and '), _text('code', 'code'), _text(' with '),
+            {'type': 'text', 'text': 'a link', 'marks': [{'type': 'link', 'attrs': {'href': 'https://x.y'}}]},
+        )]
+
+    def test_lines_join_with_hard_breaks(self):
+        doc = wiki_to_adf('first\nsecond\n\nthird')
+        assert doc['content'] == [
+            _paragraph(_text('first'), {'type': 'hardBreak'}, _text('second')),
+            _paragraph(_text('third')),
+        ]
+
+    def test_heading_code_and_rule(self):
+        doc = markdown_to_adf('#### Title\n```python\n# comment\nx = 1\n```\n---')
+        assert doc['content'] == [
+            {'type': 'heading', 'attrs': {'level': 4}, 'content': [_text('Title')]},
+            {'type': 'codeBlock', 'attrs': {'language': 'python'}, 'content': [_text('# comment\nx = 1')]},
+            {'type': 'rule'},
+        ]
+
+    def test_nested_lists(self):
+        doc   = markdown_to_adf('- one\n  1. two\n- three')
+        outer = doc['content'][0]
+        assert outer['type'] == 'bulletList'
+        assert len(outer['content']) == 2
+        inner = outer['content'][0]['content'][1]
+        assert inner['type'] == 'orderedList'
+        assert inner['content'][0]['content'][0] == _paragraph(_text('two'))
+
+    def test_table(self):
+        doc   = markdown_to_adf('| A | B |\n|---|---|\n| 1 | 2 |')
+        table = doc['content'][0]
+        assert [row['content'][0]['type'] for row in table['content']] == ['tableHeader', 'tableCell']
+        assert adf_to_text(table) == 'A\nB\n1\n2'
+
+
+class TestReader:
+    def test_round_trip(self):
+        text = ('Intro **bold** ~~gone~~ `code` [link](https://x.y)\nnext line\n\n#### Title\n\n'
+                '- one\n  1. two\n\n| A | B |\n|---|---|\n| 1 | 2 |\n\n> quote\n\n---\n\n'
+                '```python\nx = 1\n```\n_em_ +u+')
+        doc = markdown_to_adf(text)
+        assert canonical_adf(wiki_to_adf(adf_to_wiki(doc))) == canonical_adf(doc)
+
+    def test_marks_keep_spaces_outside(self):
+        doc = {'type': 'doc', 'content': [_paragraph(_text('a'), _text(' bold ', 'strong'), _text('b'))]}
+        assert adf_to_wiki(doc) == 'a *bold* b'
+
+    def test_deep_nesting(self):
+        assert adf_to_wiki(_nested(5000)).endswith('deep')
+
+
+# ---------------------------------------------------------------------------
+# canonical_adf
+# ---------------------------------------------------------------------------
+
+class TestCanonical:
+    def test_ignores_jira_attrs_and_split_text(self):
+        local  = wiki_to_adf('h3. Title\nHello *world*')
+        remote = {'type': 'doc', 'version': 1, 'content': [
+            {'type': 'heading', 'attrs': {'level': 3, 'localId': 'abc'}, 'content': [_text('Title ')]},
+            _paragraph(_text('Hel'), _text('lo '), _text('world', 'strong')),
+            _paragraph(),
+        ]}
+        assert canonical_adf(local) == canonical_adf(remote)
+
+    def test_hard_break_equals_newline(self):
+        a = {'type': 'doc', 'content': [_paragraph(_text('a'), {'type': 'hardBreak'}, _text('b'))]}
+        b = {'type': 'doc', 'content': [_paragraph(_text('a\nb'))]}
+        assert canonical_adf(a) == canonical_adf(b)
+
+    def test_detects_text_and_mark_changes(self):
+        base = wiki_to_adf('Hello *world*')
+        assert canonical_adf(base) != canonical_adf(wiki_to_adf('Hello *there*'))
+        assert canonical_adf(base) != canonical_adf(wiki_to_adf('Hello _world_'))
+
+    def test_deep_documents(self):
+        doc = _nested(20000)
+        assert canonical_adf(doc) == canonical_adf(_nested(20000))
+        assert adf_to_text(doc) == 'deep'
+
+
+# ---------------------------------------------------------------------------
+# MD2Jira integration
+# ---------------------------------------------------------------------------
+
+class TestDiffAndWrite:
+    def test_identical_adf_is_not_updated(self, make_md2jira):
+        md2j   = make_md2jira()
+        local  = Issue(IssueType.Task, '', 'Task', md2j.md2wiki('Intro **bold**\n\n- a\n- b'))
+        remote = Issue(IssueType.Task, 'TEST-1', 'Task', '')
+        remote.description_adf = markdown_to_adf('Intro **bold**\n\n- a\n- b')
+        # Text flattening would differ from the wiki source; structure does not
+        assert md2j.diff_issue_against_remote(local, remote) is False
+
+        remote.description_adf = markdown_to_adf('Intro **bold**\n\n- a\n- c')
+        assert md2j.diff_issue_against_remote(local, remote) is True
+
+    def test_search_result_keeps_adf(self, make_md2jira):
+        md2j   = make_md2jira()
+        result = {'key': 'TEST-1', 'fields': {
+            'summary': 'Task', 'issuetype': {'name': 'Task'},
+            'description': markdown_to_adf('Hello **world**'),
+        }}
+        issue = md2j._issue_from_search_result(result)
+        assert issue.description == 'Hello world'
+        assert issue.description_adf == result['fields']['description']
+
+    def test_reseed_does_not_rewrite_unchanged_issue(self, make_md2jira):
+        md2j   = make_md2jira()
+        local  = Issue(IssueType.Epic, '', 'Epic', md2j.md2wiki('#### Goals\n* one\n* two'))
+        remote = Issue(IssueType.Epic, 'TEST-1', 'Epic', '')
+        remote.description_adf = wiki_to_adf(local.description)
+
+        with patch.object(MD2Jira, 'find_issue', return_value=remote), \
+             patch.object(MD2Jira, 'check_issue_cache_hash', return_value=False), \
+             patch.object(MD2Jira, 'update_issue') as mock_update, \
+             patch.object(MD2Jira, 'update_issue_cache') as mock_cache:
+            md2j.process_issue(local)
+
+        mock_update.assert_not_called()
+        mock_cache.assert_called_once()
+
+    def test_adf_write_path(self, make_md2jira):
+        md2j = make_md2jira(adf=True)
+        resp = MagicMock(status=201, data=json.dumps({'key': 'TEST-1'}).encode('utf-8'))
+        with patch.object(MD2Jira, 'jira_http_call', return_value=resp) as mock_call:
+            issue = Issue(IssueType.Epic, '', 'Epic', 'Hello *world*')
+            md2j.create_issue(issue, md2j.prepare_issue(issue))
+
+        url, verb, body = mock_call.call_args.args
+        assert url == 'https://fake.atlassian.net/rest/api/3/issue'
+        description = json.loads(body)['fields']['description']
+        assert description['type'] == 'doc'
+        assert description['content'][0]['content'][1] == _text('world', 'strong')
+
+    def test_wiki_write_path_is_default(self, make_md2jira):
+        md2j  = make_md2jira()
+        issue = Issue(IssueType.Epic, '', 'Epic', 'Hello *world*')
+        assert json.loads(md2j.prepare_issue(issue))['fields']['description'] == 'Hello *world*'
+        assert md2j.write_baseurl.endswith('/rest/api/2')
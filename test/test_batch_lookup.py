@@ -0,0 +1,133 @@
+"""Unit tests for batched remote lookups.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - prefetch_issues() resolves many summaries with a few JQL searches
+  - search pagination follows nextPageToken
+  - find_issue() answers from the index without touching the network
+  - a failed batch falls back to per-issue lookups
+"""
+
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.md2jira import MD2Jira, Issue, IssueType, SEARCH_BATCH_SIZE
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _response(payload, status=200):
+    resp        = MagicMock()
+    resp.status = status
+    resp.data   = json.dumps(payload).encode('utf-8')
+    return resp
+
+
+def _search_hit(key, summary, type_name='Task'):
+    return {
+        'key': key,
+        'fields': {
+            'summary': summary,
+            'description': None,
+            'issuetype': {'name': type_name},
+        }
+    }
+
+
+# ---------------------------------------------------------------------------
+# prefetch_issues
+# ---------------------------------------------------------------------------
+
+class TestPrefetchIssues:
+    @pytest.fixture(autouse=True)
+    def _md2jira(self, make_md2jira):
+        self.md2j = make_md2jira()
+
+    def test_one_request_per_batch(self):
+        issues = [Issue(IssueType.Task, '', 'Task {}'.format(i)) for i in range(SEARCH_BATCH_SIZE + 5)]
+        hits   = [_search_hit('TEST-1', 'Task 0'), _search_hit('TEST-2', 'Task 41')]
+
+        with patch.object(MD2Jira, 'jira_http_call', return_value=_response({'issues': hits, 'isLast': True})) as mock_call:
+            self.md2j.prefetch_issues(issues)
+
+        assert mock_call.call_count == 2
+        assert self.md2j.remote_index['Task 0'].key == 'TEST-1'
+        assert len(self.md2j.indexed_summaries) == SEARCH_BATCH_SIZE + 5
+
+    def test_fuzzy_matches_are_ignored(self):
+        issues = [Issue(IssueType.Task, '', 'Login')]
+        hits   = [_search_hit('TEST-1', 'Login page'), _search_hit('TEST-2', 'Login')]
+
+        with patch.object(MD2Jira, 'jira_http_call', return_value=_response({'issues': hits})):
+            self.md2j.prefetch_issues(issues)
+
+        assert self.md2j.remote_index['Login'].key == 'TEST-2'
+
+    def test_pagination_follows_next_page_token(self):
+        pages = [
+            _response({'issues': [_search_hit('TEST-1', 'A')], 'nextPageToken': 'abc', 'isLast': False}),
+            _response({'issues': [_search_hit('TEST-2', 'B')], 'isLast': True}),
+        ]
+        issues = [Issue(IssueType.Task, '', 'A'), Issue(IssueType.Task, '', 'B')]
+
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=pages) as mock_call:
+            self.md2j.prefetch_issues(issues)
+
+        second_body = json.loads(mock_call.call_args_list[1].args[2])
+        assert second_body['nextPageToken'] == 'abc'
+        assert set(self.md2j.remote_index) == {'A', 'B'}
+
+    def test_quotes_are_escaped(self):
+        issues = [Issue(IssueType.Task, '', 'Say "hi"')]
+        with patch.object(MD2Jira, 'jira_http_call', return_value=_response({'issues': []})) as mock_call:
+            self.md2j.prefetch_issues(issues)
+
+        body = json.loads(mock_call.call_args.args[2])
+        assert 'summary ~ "Say \\"hi\\""' in body['jql']
+
+    def test_failed_batch_is_not_indexed(self):
+        issues = [Issue(IssueType.Task, '', 'A')]
+        with patch.object(MD2Jira, 'jira_http_call', return_value=_response({'errorMessages': ['bad']}, 400)):
+            self.md2j.prefetch_issues(issues)
+
+        assert 'A' not in self.md2j.indexed_summaries
+
+
+# ---------------------------------------------------------------------------
+# find_issue
+# ---------------------------------------------------------------------------
+
+class TestFindIssueUsesIndex:
+    @pytest.fixture(autouse=True)
+    def _md2jira(self, make_md2jira):
+        self.md2j = make_md2jira()
+
+    def test_indexed_hit_needs_no_request(self):
+        remote = Issue(IssueType.Epic, 'TEST-1', 'My Epic')
+        self.md2j.remote_index['My Epic'] = remote
+        self.md2j.indexed_summaries.add('My Epic')
+
+        with patch.object(MD2Jira, 'jira_http_call') as mock_call:
+            result = self.md2j.find_issue(Issue(IssueType.Epic, '', 'My Epic'))
+
+        mock_call.assert_not_called()
+        assert result is remote
+
+    def test_indexed_miss_needs_no_request(self):
+        self.md2j.indexed_summaries.add('Unknown')
+
+        with patch.object(MD2Jira, 'jira_http_call') as mock_call:
+            result = self.md2j.find_issue(Issue(IssueType.Epic, '', 'Unknown'))
+
+        mock_call.assert_not_called()
+        assert result is None
+
+    def test_unindexed_summary_searches(self):
+        with patch.object(MD2Jira, 'jira_http_call', return_value=_response({'issues': [_search_hit('TEST-5', 'X')]})) as mock_call:
+            result = self.md2j.find_issue(Issue(IssueType.Task, '', 'X'))
+
+        mock_call.assert_called_once()
+        assert result.key == 'TEST-5'
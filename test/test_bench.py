@@ -0,0 +1,50 @@
+"""Smoke tests for the benchmark suite.
+
+They verify that:
+  - the generator produces documents of the requested shape
+  - the sync cases run end to end against the in-process stub
+  - baseline comparison flags slower, bigger or chattier results
+"""
+
+import io
+
+from bench.generate import generate, issue_count
+from bench.suite import Context, compare, run_case, case_sync_create, case_sync_noop, ENVIRONMENT
+from src.md2jira import MarkdownParser, IssueType
+
+
+SHAPE = dict(epics=2, tasks=2, subtasks=2, checklist_items=2, description_lines=4)
+
+
+class TestGenerate:
+    def test_shape(self):
+        issues = list(MarkdownParser(checklist_enabled=True).iter_issues(io.StringIO(''.join(generate(**SHAPE)))))
+        assert len(issues) == issue_count(2, 2, 2) == 14
+        assert sum(i.type is IssueType.Epic for i in issues) == 2
+        assert all(len(i.checklist.items) == 2 for i in issues if i.type is not IssueType.Epic)
+
+    def test_deterministic(self):
+        assert list(generate(**SHAPE)) == list(generate(**SHAPE))
+
+
+class TestSuite:
+    def test_sync_cases(self, tmp_path, monkeypatch):
+        for name, value in ENVIRONMENT.items():
+            monkeypatch.setenv(name, value)
+        ctx = Context(SHAPE, str(tmp_path))
+
+        created = run_case(ctx, case_sync_create, memory=False, repeat=1)
+        assert created['items'] == 14
+        assert created['requests_per_issue'] >= 1
+
+        noop = run_case(ctx, case_sync_noop, memory=False, repeat=1)
+        assert noop['requests_per_issue'] == 0
+
+    def test_compare(self):
+        baseline = {'parse': {'throughput': 100.0, 'peak_mb': 1.0, 'requests_per_issue': None},
+                    'sync':  {'throughput': 10.0, 'peak_mb': None, 'requests_per_issue': 1.0}}
+        results  = {'parse': {'throughput': 90.0, 'peak_mb': 2.0, 'requests_per_issue': None},
+                    'sync':  {'throughput': 5.0, 'peak_mb': None, 'requests_per_issue': 2.0}}
+        regressions = compare(results, baseline, tolerance=0.25)
+        assert len(regressions) == 3
+        assert any(r.startswith('parse: peak memory') for r in regressions)
@@ -0,0 +1,153 @@
+"""Unit tests for level-by-level bulk issue creation.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - link_hierarchy() attaches Tasks to Epics and Sub-tasks to Tasks
+  - bulk_create_issues() chunks requests and reports per-item failures
+  - sync_issues_bulk() creates Epics, then Tasks, then Sub-tasks with links
+"""
+
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.md2jira import MD2Jira, Issue, IssueType, BULK_CREATE_SIZE
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _response(payload, status=201):
+    resp        = MagicMock()
+    resp.status = status
+    resp.data   = json.dumps(payload).encode('utf-8')
+    return resp
+
+
+class FakeBulkApi:
+    """Answers bulk-create calls, numbering keys sequentially."""
+
+    def __init__(self, fail_summaries=()):
+        self.bodies         = []
+        self.next_key       = 1
+        self.fail_summaries = set(fail_summaries)
+
+    def __call__(self, url, verb='GET', body=''):
+        assert url.endswith('/issue/bulk')
+        payload = json.loads(body)
+        self.bodies.append(payload)
+        issues, errors = [], []
+        for index, update in enumerate(payload['issueUpdates']):
+            if update['fields']['summary'] in self.fail_summaries:
+                errors.append({
+                    'status': 400,
+                    'failedElementNumber': index,
+                    'elementErrors': {'errors': {'summary': 'rejected'}},
+                })
+                continue
+            issues.append({'key': 'TEST-{}'.format(self.next_key)})
+            self.next_key += 1
+        return _response({'issues': issues, 'errors': errors})
+
+
+def _document():
+    return [
+        Issue(IssueType.Epic, '', 'Epic A'),
+        Issue(IssueType.Task, '', 'Task A1'),
+        Issue(IssueType.Subtask, '', 'Sub A1a'),
+        Issue(IssueType.Epic, '', 'Epic B'),
+        Issue(IssueType.Task, '', 'Task B1'),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# link_hierarchy
+# ---------------------------------------------------------------------------
+
+class TestLinkHierarchy:
+    def test_parents_follow_document_order(self):
+        issues = _document()
+        MD2Jira.link_hierarchy(issues)
+        epic_a, task_a1, sub_a1a, epic_b, task_b1 = issues
+
+        assert epic_a.parent is None
+        assert task_a1.parent is epic_a
+        assert sub_a1a.parent is task_a1
+        assert task_b1.parent is epic_b
+        assert epic_a.children == [task_a1]
+
+    def test_new_epic_resets_task(self):
+        issues = [
+            Issue(IssueType.Epic, '', 'E1'),
+            Issue(IssueType.Task, '', 'T1'),
+            Issue(IssueType.Epic, '', 'E2'),
+            Issue(IssueType.Subtask, '', 'S1'),
+        ]
+        MD2Jira.link_hierarchy(issues)
+        assert issues[3].parent is None
+
+
+# ---------------------------------------------------------------------------
+# bulk_create_issues
+# ---------------------------------------------------------------------------
+
+class TestBulkCreateIssues:
+    @pytest.fixture(autouse=True)
+    def _md2jira(self, make_md2jira):
+        self.md2j = make_md2jira(bulk=True)
+
+    def test_chunks_requests(self):
+        issues = [Issue(IssueType.Epic, '', 'Epic {}'.format(i)) for i in range(BULK_CREATE_SIZE + 1)]
+        api    = FakeBulkApi()
+
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=api):
+            results = self.md2j.bulk_create_issues(issues)
+
+        assert len(api.bodies) == 2
+        assert all(created is not None for _issue, created in results)
+
+    def test_partial_failure_reported_per_item(self, capsys):
+        issues = [Issue(IssueType.Epic, '', 'ok 1'), Issue(IssueType.Epic, '', 'bad'), Issue(IssueType.Epic, '', 'ok 2')]
+        api    = FakeBulkApi(fail_summaries=['bad'])
+
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=api):
+            results = self.md2j.bulk_create_issues(issues)
+
+        assert [created and created.key for _issue, created in results] == ['TEST-1', None, 'TEST-2']
+        assert 'unable to create "bad"' in capsys.readouterr().out
+
+
+# ---------------------------------------------------------------------------
+# sync_issues_bulk
+# ---------------------------------------------------------------------------
+
+class TestSyncIssuesBulk:
+    @pytest.fixture(autouse=True)
+    def _md2jira(self, make_md2jira):
+        self.md2j = make_md2jira(bulk=True)
+
+    @patch.object(MD2Jira, 'find_issue', return_value=None)
+    @patch.object(MD2Jira, 'update_issue_cache')
+    def test_levels_created_in_order_with_links(self, mock_cache, mock_find):
+        api = FakeBulkApi()
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=api):
+            self.md2j.sync_issues_bulk(_document())
+
+        epics, tasks, subtasks = [body['issueUpdates'] for body in api.bodies]
+        assert [u['fields']['summary'] for u in epics] == ['Epic A', 'Epic B']
+        assert [u['fields']['customfield_10014'] for u in tasks] == ['TEST-1', 'TEST-2']
+        assert subtasks[0]['fields']['parent'] == {'key': 'TEST-3'}
+
+    @patch.object(MD2Jira, 'find_issue', return_value=None)
+    @patch.object(MD2Jira, 'update_issue_cache')
+    def test_children_of_failed_epic_are_skipped(self, mock_cache, mock_find, capsys):
+        api = FakeBulkApi(fail_summaries=['Epic A'])
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=api):
+            self.md2j.sync_issues_bulk(_document())
+
+        created = [u['fields']['summary'] for body in api.bodies for u in body['issueUpdates']]
+        assert 'Task A1' not in created
+        assert 'Sub A1a' not in created
+        assert 'Task B1' in created
+        assert 'parent "Epic A" was not synced' in capsys.readouterr().out
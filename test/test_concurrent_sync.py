@@ -0,0 +1,87 @@
+"""Unit tests for the concurrent sync scheduler.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - independent Epics are processed in parallel
+  - a child is only processed once its parent's key has resolved
+  - children of an issue that failed to sync are skipped
+"""
+
+import threading
+from unittest.mock import patch
+
+from src.md2jira import MD2Jira, Issue, IssueType
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _document():
+    return [
+        Issue(IssueType.Epic, '', 'Epic A'),
+        Issue(IssueType.Task, '', 'Task A1'),
+        Issue(IssueType.Subtask, '', 'Sub A1a'),
+        Issue(IssueType.Epic, '', 'Epic B'),
+        Issue(IssueType.Task, '', 'Task B1'),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# sync_issues_concurrent
+# ---------------------------------------------------------------------------
+
+class TestSyncIssuesConcurrent:
+    def test_epics_run_in_parallel(self, make_md2jira):
+        md2j    = make_md2jira(jobs=4)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_process(issue):
+            if issue.type is IssueType.Epic:
+                # Deadlocks (and times out) unless both Epics run at once
+                barrier.wait()
+            issue.key = 'KEY-' + issue.summary
+
+        with patch.object(md2j, 'process_issue', side_effect=fake_process):
+            md2j.sync_issues_concurrent(_document())
+
+        assert barrier.broken is False
+
+    def test_children_see_parent_key(self, make_md2jira):
+        md2j = make_md2jira(jobs=4)
+        seen = {}
+
+        def fake_process(issue):
+            seen[issue.summary] = md2j.parent_link(issue)
+            issue.key = 'KEY-' + issue.summary
+
+        with patch.object(md2j, 'process_issue', side_effect=fake_process):
+            md2j.sync_issues_concurrent(_document())
+
+        assert seen['Task A1'] == 'KEY-Epic A'
+        assert seen['Sub A1a'] == 'KEY-Task A1'
+        assert seen['Task B1'] == 'KEY-Epic B'
+
+    def test_children_of_failed_issue_are_skipped(self, capsys, make_md2jira):
+        md2j      = make_md2jira(jobs=4)
+        processed = []
+
+        def fake_process(issue):
+            processed.append(issue.summary)
+            if issue.summary != 'Epic A':
+                issue.key = 'KEY-' + issue.summary
+
+        with patch.object(md2j, 'process_issue', side_effect=fake_process):
+            md2j.sync_issues_concurrent(_document())
+
+        assert sorted(processed) == ['Epic A', 'Epic B', 'Task B1']
+        out = capsys.readouterr().out
+        assert 'unable to sync "Task A1"' in out
+        assert 'unable to sync "Sub A1a"' in out
+
+    def test_sync_issues_dispatches_on_jobs(self, make_md2jira):
+        md2j = make_md2jira(jobs=4)
+        with patch.object(MD2Jira, 'prefetch_issues'), \
+             patch.object(MD2Jira, 'sync_issues_concurrent') as mock_concurrent:
+            md2j.sync_issues(_document())
+        mock_concurrent.assert_called_once()
@@ -0,0 +1,136 @@
+"""Tests for export (Jira -> Markdown).
+
+These run against the in-process fake Jira server.  They verify that:
+  - issues are written Epic -> Task -> Sub-task, loose Tasks first
+  - ADF and wiki descriptions come back as Markdown
+  - full issues are fetched in concurrent batches, written in order
+  - the sync cache is seeded, so syncing the export back sends nothing
+  - Sub-tasks whose Task is not exported are skipped
+"""
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.md2jira import export_order
+from test.test_fake_jira import DOCUMENT, _call, _fields, _writes
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+@pytest.fixture
+def export(make_md2jira, tmp_path, monkeypatch):
+    """export(jira, jql='project = TEST', **args) -> the Markdown exported from `jira`"""
+    def run(jira, jql='project = TEST', **overrides):
+        monkeypatch.chdir(tmp_path)
+        output = tmp_path / 'export.md'
+        md2j   = make_md2jira([str(tmp_path / 'doc.md')], jira, **overrides)
+        md2j.export_markdown(jql, str(output))
+        return output.read_text(encoding='utf-8')
+    return run
+
+
+def _headers(text):
+    return [line for line in text.split('\n') if line.startswith('#')]
+
+
+def _add(jira, summary, issue_type='Task', **fields):
+    status, created = _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields(summary, issue_type, **fields)})
+    assert status == 201
+    return created['key']
+
+
+# ---------------------------------------------------------------------------
+# Ordering
+# ---------------------------------------------------------------------------
+
+class TestOrder:
+    def test_export_order(self):
+        nodes = {
+            'P-10': ('Subtask', 'P-3'),
+            'P-1':  ('Epic', None),
+            'P-2':  ('Task', None),
+            'P-3':  ('Task', 'P-1'),
+            'P-4':  ('Subtask', 'P-9'),
+            'P-5':  ('Epic', None),
+        }
+        order, skipped = export_order(nodes)
+        assert order == [('P-2', 2), ('P-1', 1), ('P-3', 2), ('P-10', 3), ('P-5', 1)]
+        assert skipped == ['P-4']
+
+    def test_groups_hierarchy(self, jira, sync, export):
+        sync(jira, DOCUMENT)
+        _add(jira, 'Loose task')
+        epic = _add(jira, 'Epic B', 'Epic')
+        _add(jira, 'Task B1', customfield_10014=epic)
+        text = export(jira)
+        assert _headers(text) == [
+            '## Loose task',
+            '# Epic A', '## Task A1 - with "quotes"!', '### Sub-task A1a',
+            '# Epic B', '## Task B1',
+        ]
+
+    def test_skips_subtask_without_task(self, jira, capsys, sync, export):
+        sync(jira, DOCUMENT)
+        text = export(jira, jql='issuetype = Sub-task')
+        assert text == ''
+        assert 'TEST-3 skipped' in capsys.readouterr().out
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+class TestConversion:
+    @pytest.mark.parametrize('adf', [False, True])
+    def test_description_to_markdown(self, jira, adf, sync, export):
+        body = ('Some **bold** and `code`\n\n- one\n  - two\n\n#### Notes\n\n'
+                '```python\n# not a header\n```\n')
+        sync(jira, '# Epic\n\n' + body, adf=adf)
+        text = export(jira)
+        assert text == '# Epic\n\n' + body + '\n'
+
+    def test_checklist_items(self, jira, monkeypatch, export):
+        _add(jira, 'With checklist', customfield_10100='# Default Checklist\n* [done] A\n* [open] B\n')
+        monkeypatch.setenv('JIRA_CHECKLIST_CUSTOMFIELD', 'customfield_10100')
+        text = export(jira)
+        assert text.endswith('* [x] A\n* [ ] B\n\n')
+
+
+# ---------------------------------------------------------------------------
+# Paging and cache seeding
+# ---------------------------------------------------------------------------
+
+class TestExport:
+    def test_batches_in_parallel(self, jira, export):
+        epic = _add(jira, 'Epic', 'Epic')
+        for n in range(250):
+            _add(jira, 'Task {}'.format(n), customfield_10014=epic)
+        text = export(jira, jobs=4)
+        # One listing page, then three batches of full issues
+        assert jira.requests['POST search/jql'] == 4
+        assert _headers(text) == ['# Epic'] + ['## Task {}'.format(n) for n in range(250)]
+
+    def test_round_trip_sends_nothing(self, jira, tmp_path, make_md2jira, sync, export):
+        sync(jira, DOCUMENT)
+        (tmp_path / '.md2jira_cache.py.tsv').unlink()
+        export(jira)
+
+        requests = sum(jira.requests.values())
+        md2j = make_md2jira([str(tmp_path / 'export.md')], jira)
+        md2j.parse_markdown()
+        assert sum(jira.requests.values()) == requests
+        assert sum(counts['unchanged'] for counts in md2j.stats.values()) == 3
+
+    def test_edit_after_export_syncs(self, jira, tmp_path, make_md2jira, sync, export):
+        sync(jira, DOCUMENT)
+        export(jira)
+        path = tmp_path / 'export.md'
+        path.write_text(path.read_text().replace('Epic description', 'Changed'))
+        writes = _writes(jira)
+        make_md2jira([str(path)], jira).parse_markdown()
+        assert _writes(jira) == writes + 1
+        assert 'Changed' in jira.issues['TEST-1']['fields']['description']
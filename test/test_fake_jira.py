@@ -0,0 +1,203 @@
+"""Tests for the in-process fake Jira server and syncs against it.
+
+These run md2jira over real HTTP against src/fake_jira.py, so they need
+no credentials or network.  They verify that:
+  - issue create/read/update/delete and bulk create behave like Jira
+  - search/jql pages with nextPageToken and understands md2jira's JQL
+  - a sync creates the hierarchy, and a re-sync sends no writes
+  - injected 429s and 5xx errors are retried through the transport
+"""
+
+import json
+
+import pytest
+import urllib3
+
+from src.fake_jira import FakeJira, JqlError, evaluate_jql
+from src.md2jira import MD2Jira
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+DOCUMENT = '''# Epic A
+
+Epic description
+
+## Task A1 - with "quotes"!
+
+Task description
+
+* [ ] First item
+* [x] Second item
+
+### Sub-task A1a
+
+Sub-task description
+'''
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+def _call(jira, verb, path, body=None):
+    resp = urllib3.PoolManager().request(
+        verb, jira.url + path, body=json.dumps(body) if body is not None else None,
+        headers={'Content-Type': 'application/json'}, retries=False)
+    return resp.status, json.loads(resp.data) if resp.data else None
+
+
+def _fields(summary, issue_type='Task', **extra):
+    return dict(summary=summary, issuetype={'name': issue_type}, project={'key': 'TEST'}, **extra)
+
+
+def _writes(jira):
+    return sum(count for name, count in jira.requests.items() if not name.startswith('GET ')
+               and not name.endswith('search/jql'))
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+class TestEndpoints:
+    def test_crud(self, jira):
+        status, created = _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('One', description='h1. Hi')})
+        assert status == 201 and created['key'] == 'TEST-1'
+
+        status, issue = _call(jira, 'GET', '/rest/api/2/issue/TEST-1?fields=summary,description')
+        assert issue['fields'] == {'summary': 'One', 'description': 'h1. Hi'}
+
+        status, issue = _call(jira, 'GET', '/rest/api/3/issue/TEST-1?fields=description')
+        assert issue['fields']['description']['content'][0]['type'] == 'heading'
+
+        assert _call(jira, 'PUT', '/rest/api/2/issue/TEST-1', {'fields': {'summary': 'Uno'}})[0] == 204
+        assert jira.issues['TEST-1']['fields']['summary'] == 'Uno'
+
+        assert _call(jira, 'DELETE', '/rest/api/2/issue/TEST-1')[0] == 204
+        assert _call(jira, 'GET', '/rest/api/2/issue/TEST-1')[0] == 404
+
+    def test_validation(self, jira):
+        status, body = _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('', 'Sub-task')})
+        assert status == 400
+        assert set(body['errors']) == {'summary', 'parent'}
+
+        status, body = _call(jira, 'POST', '/rest/api/3/issue', {'fields': _fields('One', description='text')})
+        assert status == 400 and 'description' in body['errors']
+
+    def test_bulk_create(self, jira):
+        updates = [{'fields': _fields('One')}, {'fields': _fields('Two', 'Sub-task')}, {'fields': _fields('Three')}]
+        status, body = _call(jira, 'POST', '/rest/api/2/issue/bulk', {'issueUpdates': updates})
+        assert status == 201
+        assert [i['key'] for i in body['issues']] == ['TEST-1', 'TEST-2']
+        assert [e['failedElementNumber'] for e in body['errors']] == [1]
+
+    def test_search_paging(self, jira):
+        for n in range(5):
+            _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('Issue {}'.format(n))})
+        keys, token = [], None
+        while True:
+            status, page = _call(jira, 'POST', '/rest/api/3/search/jql',
+                                 {'jql': 'project = TEST', 'fields': ['summary'], 'maxResults': 2, 'nextPageToken': token})
+            keys.extend(i['key'] for i in page['issues'])
+            if page['isLast']:
+                break
+            token = page['nextPageToken']
+        assert keys == ['TEST-{}'.format(n) for n in range(1, 6)]
+
+
+# ---------------------------------------------------------------------------
+# JQL
+# ---------------------------------------------------------------------------
+
+class TestJql:
+    ISSUES = [
+        {'id': '1', 'key': 'TEST-1', 'fields': _fields('Fix the login-page!', updated='2025-01-02T10:00:00.000+0000')},
+        {'id': '2', 'key': 'TEST-2', 'fields': _fields('Say "hello"', 'Epic', updated='2025-03-01T10:00:00.000+0000')},
+        {'id': '3', 'key': 'OTHER-1', 'fields': dict(_fields('Say "hello"'), project={'key': 'OTHER'})},
+    ]
+
+    def keys(self, jql):
+        return [i['key'] for i in evaluate_jql(jql, self.ISSUES)]
+
+    def test_escaped_text_search(self):
+        escaped = MD2Jira._jql_escape('login-page!')
+        assert self.keys('project = TEST AND summary ~ "{}"'.format(escaped)) == ['TEST-1']
+        assert self.keys('project = TEST AND (summary ~ "nope" OR summary ~ "{}")'.format(
+            MD2Jira._jql_escape('Say "hello"'))) == ['TEST-2']
+
+    def test_operators(self):
+        assert self.keys('issuetype in (Epic, Story)') == ['TEST-2']
+        assert self.keys('project = TEST AND updated > "2025/02/01 00:00"') == ['TEST-2']
+        assert self.keys('project = TEST ORDER BY key DESC') == ['TEST-2', 'TEST-1']
+
+    def test_invalid(self):
+        with pytest.raises(JqlError):
+            evaluate_jql('project = ', self.ISSUES)
+
+
+# ---------------------------------------------------------------------------
+# Syncing against the server
+# ---------------------------------------------------------------------------
+
+class TestSync:
+    def test_sync_and_resync(self, jira, sync):
+        sync(jira, DOCUMENT)
+        issues = {i['fields']['summary']: i for i in jira.issues.values()}
+        assert set(issues) == {'Epic A', 'Task A1 - with "quotes"!', 'Sub-task A1a'}
+        epic, task, subtask = (issues[s] for s in ('Epic A', 'Task A1 - with "quotes"!', 'Sub-task A1a'))
+        assert task['fields']['customfield_10014'] == epic['key']
+        assert subtask['fields']['parent']['key'] == task['key']
+
+        writes = _writes(jira)
+        sync(jira, DOCUMENT, full=True)
+        assert _writes(jira) == writes
+
+        sync(jira, DOCUMENT.replace('Epic description', 'Changed'))
+        assert jira.requests['PUT issue/{key}'] == 1
+        assert len(jira.issues) == 3
+
+    def test_sync_writes_adf(self, jira, sync):
+        sync(jira, DOCUMENT, adf=True)
+        assert all(isinstance(i['fields']['description'], dict) for i in jira.issues.values())
+        writes = _writes(jira)
+        sync(jira, DOCUMENT, adf=True, full=True)
+        assert _writes(jira) == writes
+
+    def test_bulk_sync(self, jira, sync):
+        sync(jira, DOCUMENT, bulk=True)
+        assert len(jira.issues) == 3
+        assert jira.requests['POST issue/bulk'] == 3
+
+
+class TestFaults:
+    def test_throttling_and_errors_are_retried(self, jira, sync):
+        jira.inject(429, headers={'Retry-After': '0'})
+        jira.inject(503)
+        md2j = sync(jira, DOCUMENT)
+        assert len(jira.issues) == 3
+        report = md2j.transport.report()
+        assert report['throttled'] == 1
+        assert report['retries'] == 2
+
+    def test_failed_create_is_not_retried(self, jira, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / 'doc.md'
+        path.write_text('# Epic A\n\nText\n', encoding='utf-8')
+        md2j = make_md2jira([str(path)], jira)
+        md2j.transport.backoff_base = 0
+        jira.inject(200, body={'issues': [], 'isLast': True})   # the lookup
+        jira.inject(500)                                       # the create
+        md2j.parse_markdown()
+        assert jira.issues == {}
+        assert jira.requests['POST issue'] == 1
+
+    def test_rate_limit(self):
+        with FakeJira(rate_limit=1, retry_after=0) as jira:
+            statuses = [_call(jira, 'GET', '/rest/api/2/issue/TEST-1')[0] for _ in range(5)]
+        assert statuses.count(429) >= 1
+        assert jira.throttled >= 1
@@ -0,0 +1,131 @@
+"""Unit tests for the zero-request fast path.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - the parser records each issue's source file and header path
+  - a section synced before with identical content needs no HTTP request
+  - changed or unknown sections still go to the network
+  - a no-op re-run of a whole document sends no requests at all
+"""
+
+import json
+from unittest.mock import patch, MagicMock
+
+from src.md2jira import DocumentTree, MD2Jira, Issue, IssueType
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+DOCUMENT = '''# Epic A
+
+Epic description
+
+## Task A1
+
+Task description
+
+### Sub A1a
+
+Sub-task description
+'''
+
+
+class FakeJira:
+    """Creates every issue it is asked to and never finds anything."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, verb='GET', body=''):
+        self.calls.append((verb, url))
+        resp        = MagicMock()
+        resp.status = 201
+        if 'search' in url:
+            resp.data = json.dumps({'issues': [], 'isLast': True}).encode('utf-8')
+        else:
+            resp.data = json.dumps({'key': 'TEST-{}'.format(len(self.calls))}).encode('utf-8')
+        return resp
+
+
+# ---------------------------------------------------------------------------
+# Parser identity
+# ---------------------------------------------------------------------------
+
+class TestHeaderPath:
+    def test_header_paths(self, make_md2jira):
+        md2j   = make_md2jira()
+        issues = list(md2j.iter_issues(DOCUMENT.splitlines(True), 'doc.md'))
+
+        assert [i.header_path for i in issues] == [
+            'Epic A',
+            'Epic A > Task A1',
+            'Epic A > Task A1 > Sub A1a',
+        ]
+        assert all(i.source_file == 'doc.md' for i in issues)
+
+
+# ---------------------------------------------------------------------------
+# find_cached_issue / process_issue
+# ---------------------------------------------------------------------------
+
+class TestFastPath:
+    def _synced_issue(self, md2j, description='desc'):
+        issue = Issue(IssueType.Epic, 'TEST-1', 'Epic A', description)
+        issue.source_file = 'doc.md'
+        issue.header_path = 'Epic A'
+        md2j.update_issue_cache(issue)
+        local = Issue(IssueType.Epic, '', 'Epic A', 'desc')
+        local.source_file = 'doc.md'
+        local.header_path = 'Epic A'
+        return local
+
+    def test_unchanged_section_needs_no_request(self, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        md2j  = make_md2jira()
+        local = self._synced_issue(md2j)
+
+        with patch.object(MD2Jira, 'jira_http_call') as mock_call:
+            md2j.process_issue(local)
+
+        mock_call.assert_not_called()
+        assert local.key == 'TEST-1'
+        # Its Tasks link to the key through the document tree
+        task = Issue(IssueType.Task, '', 'Task A1')
+        DocumentTree([local, task])
+        assert md2j.parent_link(task) == 'TEST-1'
+
+    def test_changed_section_goes_to_network(self, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        md2j  = make_md2jira()
+        local = self._synced_issue(md2j, description='old desc')
+
+        with patch.object(MD2Jira, 'find_issue', return_value=None) as mock_find, \
+             patch.object(MD2Jira, 'create_issue', return_value=None):
+            md2j.process_issue(local)
+
+        mock_find.assert_called_once()
+
+    def test_other_project_is_a_miss(self, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        md2j  = make_md2jira()
+        local = self._synced_issue(md2j)
+        md2j.PROJECT_KEY = 'OTHER'
+        assert md2j.find_cached_issue(local) is None
+
+
+class TestNoOpRerun:
+    def test_second_run_sends_no_requests(self, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+
+        first = FakeJira()
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=first):
+            make_md2jira().parse_markdown()
+        assert len(first.calls) > 0
+
+        second = FakeJira()
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=second):
+            make_md2jira().parse_markdown()
+        assert second.calls == []
@@ -0,0 +1,140 @@
+"""Unit tests for section-level incremental re-parsing.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - iter_sections() splits a file into header blocks with byte offsets
+  - unchanged blocks are neither tokenized nor converted on the next run
+  - an edited block is re-parsed and linked to its unchanged parent
+  - --full re-parses everything
+"""
+
+import io
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.md2jira import MD2Jira, MarkdownParser, IssueType
+from src.sync_cache import SectionIndex
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+DOCUMENT = '''# Epic A
+
+Epic [link](https://example.com)
+
+## Task A1
+
+Task description
+
+## Task A2
+
+Other task
+'''
+
+
+class FakeJira:
+    """Creates every issue it is asked to and never finds anything."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, verb='GET', body=''):
+        self.calls.append((verb, url, body))
+        resp        = MagicMock()
+        resp.status = 201
+        if 'search' in url:
+            resp.data = json.dumps({'issues': [], 'isLast': True}).encode('utf-8')
+        else:
+            resp.data = json.dumps({'key': 'TEST-{}'.format(len(self.calls))}).encode('utf-8')
+        return resp
+
+
+@pytest.fixture
+def run(make_md2jira):
+    """run(**args) -> (FakeJira, mocked md2wiki) after syncing doc.md"""
+    def run(**overrides):
+        api = FakeJira()
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=api), \
+             patch.object(MarkdownParser, 'md2wiki', side_effect=lambda text: text) as mock_convert:
+            make_md2jira(**overrides).parse_markdown()
+        return api, mock_convert
+    return run
+
+
+# ---------------------------------------------------------------------------
+# iter_sections
+# ---------------------------------------------------------------------------
+
+class TestIterSections:
+    def test_blocks_and_offsets(self):
+        data     = DOCUMENT.encode('utf-8')
+        sections = list(MarkdownParser().iter_sections(io.BytesIO(data)))
+
+        assert [(t, p) for t, _s, p, _o, _b in sections] == [
+            (IssueType.Epic, 'Epic A'),
+            (IssueType.Task, 'Epic A > Task A1'),
+            (IssueType.Task, 'Epic A > Task A2'),
+        ]
+        for _type, _summary, _path, offset, block in sections:
+            assert data[offset:offset + len(block)] == block
+        assert b''.join(block for *_rest, block in sections) == data
+
+    def test_preamble_is_ignored(self):
+        sections = list(MarkdownParser().iter_sections(io.BytesIO(b'intro\n# Epic\n')))
+        assert len(sections) == 1
+        assert sections[0][3] == len(b'intro\n')
+
+
+# ---------------------------------------------------------------------------
+# Incremental runs
+# ---------------------------------------------------------------------------
+
+class TestIncrementalSync:
+    def test_unchanged_blocks_are_not_converted(self, tmp_path, monkeypatch, run):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+        run()
+        assert (tmp_path / '.md2jira_sections.json').exists()
+
+        api, convert = run()
+        assert api.calls == []
+        convert.assert_not_called()
+
+    def test_only_edited_block_is_reparsed(self, tmp_path, monkeypatch, run):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+        run()
+
+        (tmp_path / 'doc.md').write_text(DOCUMENT.replace('Other task', 'Other task, edited'), encoding='utf-8')
+        api, convert = run()
+
+        converted = '\n'.join(call.args[0] for call in convert.call_args_list)
+        assert 'Other task, edited' in converted
+        assert 'Task description' not in converted
+        assert 'example.com' not in converted
+
+        # The edited Task is still linked to the (skipped) Epic
+        index = SectionIndex()
+        epic  = index.sections('doc.md')['Epic A']
+        posts = [json.loads(body) for verb, url, body in api.calls if verb == 'POST' and url.endswith('/issue')]
+        assert posts[0]['fields']['customfield_10014'] == epic['key']
+
+    def test_full_reparses_everything(self, tmp_path, monkeypatch, run):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+        run()
+
+        _api, convert = run(full=True)
+        assert convert.call_count > 0
+
+    def test_removed_sections_are_forgotten(self, tmp_path, monkeypatch, run):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+        run()
+
+        (tmp_path / 'doc.md').write_text(DOCUMENT.split('## Task A2')[0], encoding='utf-8')
+        run()
+        assert 'Epic A > Task A2' not in SectionIndex().sections('doc.md')
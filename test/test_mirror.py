@@ -0,0 +1,148 @@
+"""Tests for the local issue mirror (--mirror).
+
+These run against the in-process fake Jira server.  They verify that:
+  - the first run scans the whole project, later runs only ask for issues
+    updated since the last scan
+  - summaries are resolved from the mirror, and only issues whose content
+    may need comparing are fetched, by key
+  - remote edits since the last scan are reported as drift, while
+    md2jira's own writes are not
+  - find_issue() without a mirror follows nextPageToken
+  - IssueMirror keeps its watermark and summary index across runs
+"""
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.md2jira import Issue, IssueType
+from src.sync_cache import IssueMirror
+from test.test_fake_jira import DOCUMENT, _call, _fields
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+@pytest.fixture
+def run(make_md2jira, tmp_path, monkeypatch):
+    """run(jira, name='doc.md', text=DOCUMENT, **args) -> (md2j, JQL of every search): sync `text` as `name` with --mirror"""
+    def run(jira, name='doc.md', text=DOCUMENT, **overrides):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        md2j   = make_md2jira([str(path)], jira, mirror=str(tmp_path / 'mirror.json'), **overrides)
+        jql    = []
+        search = md2j.search_issues
+        md2j.search_issues = lambda query, *args, **kwargs: jql.append(query) or search(query, *args, **kwargs)
+        md2j.parse_markdown()
+        return md2j, jql
+    return run
+
+
+def _forget_sync_state(tmp_path):
+    for name in ('.md2jira_cache.py.tsv', '.md2jira_sections.json'):
+        (tmp_path / name).unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+class TestRefresh:
+    def test_full_then_incremental(self, jira, tmp_path, run):
+        _md2j, jql = run(jira)
+        assert jql == ['project = TEST']
+        assert len(jira.issues) == 3
+
+        _forget_sync_state(tmp_path)
+        _md2j, jql = run(jira)
+        assert jql[0].startswith('project = TEST AND updated >= "')
+        # Nothing is searched by summary: the mirror knows every key
+        assert jql[1:] and all(query.startswith('key in (') for query in jql[1:])
+        assert len(jira.issues) == 3
+
+    def test_full_rescans(self, jira, run):
+        run(jira)
+        _md2j, jql = run(jira, full=True)
+        assert jql == ['project = TEST']
+
+    def test_unchanged_content_needs_no_fetch(self, jira, tmp_path, run):
+        run(jira)
+        # Another file with the same sections: no section identity, same content
+        md2j, jql = run(jira, name='copy.md')
+        assert len(jql) == 1
+        assert md2j.stats[str(tmp_path / 'copy.md')]['unchanged'] == 3
+
+    def test_existing_issues_are_found(self, jira, run):
+        for n in range(3):
+            _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('Other {}'.format(n))})
+        _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('Epic A', 'Epic', description='Old')})
+        run(jira)
+        assert len(jira.issues) == 6
+        assert jira.issues['TEST-4']['fields']['description'] == 'Epic description'
+
+
+class TestDrift:
+    def test_remote_edit_is_drift(self, jira, capsys, run):
+        run(jira)
+        # The second scan records fingerprints of what md2jira wrote
+        run(jira)
+        assert 'edited in Jira' not in capsys.readouterr().out
+
+        _call(jira, 'PUT', '/rest/api/2/issue/TEST-2', {'fields': {'description': 'Edited in Jira'}})
+        _call(jira, 'PUT', '/rest/api/2/issue/TEST-3', {'fields': {'labels': ['not content']}})
+        md2j, _jql = run(jira)
+        out = capsys.readouterr().out
+        assert 'WARNING: 1 issue(s) edited in Jira since the last sync:' in out
+        assert '  TEST-2: "Task A1 - with "quotes"!"' in out
+        assert '  TEST-3:' not in out
+
+
+# ---------------------------------------------------------------------------
+# find_issue without a mirror
+# ---------------------------------------------------------------------------
+
+class TestFindIssuePaging:
+    def test_follows_next_page_token(self, jira, tmp_path, monkeypatch, make_md2jira):
+        for n in range(120):
+            _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('Common {}'.format(n))})
+        _call(jira, 'POST', '/rest/api/2/issue', {'fields': _fields('Common')})
+        monkeypatch.chdir(tmp_path)
+        md2j = make_md2jira([str(tmp_path / 'doc.md')], jira)
+        assert md2j.find_issue(Issue(IssueType.Task, '', 'Common')).key == 'TEST-121'
+
+
+# ---------------------------------------------------------------------------
+# IssueMirror
+# ---------------------------------------------------------------------------
+
+class TestIssueMirror:
+    def test_round_trip(self, tmp_path):
+        path   = str(tmp_path / 'mirror.json')
+        mirror = IssueMirror(path, 'site', 'TEST')
+        assert mirror.last_sync is None
+        drifted = mirror.update({
+            'TEST-2': ['Task', 'Task', 'TEST-1', '2025-01-31T10:05:30.000+1000', 'b'],
+            'TEST-1': ['Epic', 'Epic', None, '2025-01-31T09:00:00.000+1000', 'a'],
+        }, full=True)
+        assert drifted == []
+        mirror.flush()
+
+        mirror = IssueMirror(path, 'site', 'TEST')
+        assert mirror.last_sync == '2025/01/31 10:05'
+        assert mirror.find('Task') == 'TEST-2'
+        assert IssueMirror(path, 'site', 'OTHER').last_sync is None
+
+    def test_drift_and_own_writes(self, tmp_path):
+        mirror = IssueMirror(str(tmp_path / 'mirror.json'), 'site', 'TEST')
+        mirror.update({'TEST-1': ['Epic', 'Epic', None, None, 'a'],
+                       'TEST-2': ['Task', 'Task', 'TEST-1', None, 'b']}, full=True)
+        mirror.put('TEST-2', 'Renamed', 'Task')
+        assert mirror.get('TEST-2') == ['Renamed', 'Task', 'TEST-1', None, None]
+        assert mirror.find('Renamed') == 'TEST-2' and mirror.find('Task') is None
+
+        drifted = mirror.update({'TEST-1': ['Epic', 'Epic', None, None, 'changed'],
+                                 'TEST-2': ['Renamed', 'Task', 'TEST-1', None, 'c']})
+        assert drifted == ['TEST-1']
@@ -0,0 +1,192 @@
+"""Tests for the Issue / Checklist data model.
+
+They verify that:
+  - Issue, Checklist and ChecklistItem are slotted, and `issue_key` still
+    aliases `key`
+  - checkbox markers and spelled-out statuses map to the same statuses
+  - checklist text is rendered from the items once, and checklist fields
+    read back from Jira (text, or the dict/list form) parse into items,
+    with statuses other apps write read as open rather than failing
+  - checklists are compared item by item: adds, removals, status changes
+  - the checklist field is only sent when its items changed
+  - Sub-tasks without children share an empty tuple
+"""
+
+import io
+import json
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.md2jira import (Checklist, ChecklistItem, ChecklistItemStatus, Issue, IssueType, MarkdownParser,
+                         MD2Jira, diff_checklists)
+
+
+FIELD = '# Default Checklist\n* [done] A\n* [in progress] B\n* [open] C\n'
+
+
+class TestModel:
+    def test_slotted(self):
+        issue = Issue(IssueType.Task, 'TEST-1', 'Task', 'desc', FIELD)
+        for obj in (issue, issue.checklist, issue.checklist.items[0]):
+            assert not hasattr(obj, '__dict__')
+        with pytest.raises(AttributeError):
+            issue.misspelled = True
+
+    def test_issue_key_alias(self):
+        issue = Issue(IssueType.Task, 'TEST-1')
+        issue.issue_key = 'TEST-2'
+        assert issue.key == issue.issue_key == 'TEST-2'
+
+    @pytest.mark.parametrize('marker, status', [
+        ('x', ChecklistItemStatus.DONE),
+        (' ', ChecklistItemStatus.OPEN),
+        ('', ChecklistItemStatus.OPEN),
+        ('>', ChecklistItemStatus.IN_PROGRESS),
+        ('in progress', ChecklistItemStatus.IN_PROGRESS),
+        ('skipped', ChecklistItemStatus.SKIPPED),
+    ])
+    def test_statuses(self, marker, status):
+        item = ChecklistItem('Item', marker)
+        assert item.status is status
+        assert item.checked is (status is ChecklistItemStatus.DONE)
+
+    def test_unknown_status(self):
+        with pytest.raises(KeyError):
+            ChecklistItem('Item', '?')
+
+
+class TestChecklistText:
+    def test_rendered_from_items(self):
+        checklist = Checklist('')
+        assert checklist.text == ''
+        for marker, text in (('x', 'A'), ('>', 'B'), (' ', 'C')):
+            checklist.append(ChecklistItem(text, marker))
+        assert checklist.text == repr(checklist) == FIELD
+
+    def test_field_round_trip(self):
+        issue = Issue(IssueType.Task, 'TEST-1', 'Task', '', FIELD)
+        assert [(i.text, i.status) for i in issue.checklist.items] == [
+            ('A', ChecklistItemStatus.DONE), ('B', ChecklistItemStatus.IN_PROGRESS), ('C', ChecklistItemStatus.OPEN)]
+        assert issue.checklist.text == FIELD
+
+    def test_rendered_once(self):
+        checklist = Checklist(FIELD)
+        assert checklist.text is checklist.text
+        checklist.append(ChecklistItem('D', 'x'))
+        assert checklist.text.endswith('* [done] D\n')
+
+    def test_notes_and_headers_ignored(self):
+        field = '# Backend\n* [x] A\n---\n> a note\n# Frontend\n* [open] B ] C\n'
+        assert [(i.text, i.status.name) for i in Checklist(field).items] == [('A', 'DONE'), ('B ] C', 'OPEN')]
+
+    def test_statuses_from_other_apps(self):
+        field = '# Default Checklist\n* [X] A\n* [In Progress] B\n* [blocked] C\n* [To Do] D\n'
+        assert [(i.text, i.status.name) for i in Issue(IssueType.Task, 'TEST-1', 'Task', '', field).checklist.items] == [
+            ('A', 'DONE'), ('B', 'IN_PROGRESS'), ('C', 'OPEN'), ('D', 'OPEN')]
+
+    @pytest.mark.parametrize('field', [
+        [{'name': 'A', 'checked': True}, {'name': 'B', 'status': {'name': 'In Progress'}}, {'name': 'C'}],
+        {'items': [{'text': 'A', 'status': 'done'}, {'text': 'B', 'status': 'in progress'},
+                   {'text': 'C', 'checked': False}]},
+    ])
+    def test_json_field(self, field):
+        assert Issue(IssueType.Task, 'TEST-1', 'Task', '', field).checklist.text == FIELD
+
+
+def _items(*pairs):
+    return [ChecklistItem(text, marker) for text, marker in pairs]
+
+
+class TestChecklistDiff:
+    def test_item_level(self):
+        local  = _items(('A', 'x'), ('B', ' '), ('D', ' '))
+        remote = _items(('A', ' '), ('B', ' '), ('C', ' '))
+        assert diff_checklists(local, remote) == {
+            'added': ['D'], 'removed': ['C'],
+            'status': [('A', ChecklistItemStatus.OPEN, ChecklistItemStatus.DONE)], 'reordered': False}
+
+    def test_repeated_items_pair_up(self):
+        diff = diff_checklists(_items(('A', ' '), ('A', 'x')), _items(('A', ' ')))
+        assert diff['added'] == ['A'] and diff['status'] == [] and diff['removed'] == []
+
+    def test_reordered(self):
+        diff = diff_checklists(_items(('A', ' '), ('B', ' ')), _items(('B', ' '), ('A', ' ')))
+        assert diff == {'added': [], 'removed': [], 'status': [], 'reordered': True}
+
+
+class TestHierarchy:
+    def test_leaves_share_empty_children(self):
+        text   = '# Epic\n## Task\n### Sub 1\n### Sub 2\n'
+        issues = list(MarkdownParser().iter_issues(io.StringIO(text)))
+        MD2Jira.link_hierarchy(issues)
+        epic, task, first, second = issues
+        assert epic.children == [task] and task.children == [first, second]
+        assert first.children == second.children == ()
+
+
+# ---------------------------------------------------------------------------
+# Checklist field writes
+# ---------------------------------------------------------------------------
+
+DOCUMENT = '''# Epic
+
+Epic description
+
+## Task
+
+Task description
+
+* [ ] First
+* [x] Second
+'''
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+class TestChecklistWrites:
+    @pytest.fixture
+    def updates(self, make_md2jira, tmp_path):
+        """updates(jira, text) -> the fields sent in each update while syncing `text`"""
+        def run(jira, text):
+            path = tmp_path / 'doc.md'
+            path.write_text(text, encoding='utf-8')
+            md2j = make_md2jira([str(path)], jira)
+            sent = []
+            update_issue = md2j.update_issue
+            md2j.update_issue = lambda issue, data: sent.append(json.loads(data)['fields']) or update_issue(issue, data)
+            md2j.parse_markdown()
+            return sent
+        return run
+
+    @pytest.fixture(autouse=True)
+    def checklist_field(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv('JIRA_CHECKLIST_CUSTOMFIELD', 'customfield_10100')
+
+    def test_only_changed_checklist_is_written(self, jira, tmp_path, updates):
+        updates(jira, DOCUMENT)
+        assert jira.issues['TEST-2']['fields']['customfield_10100'].endswith('* [done] Second\n')
+        (tmp_path / '.md2jira_cache.py.tsv').unlink()
+        (tmp_path / '.md2jira_sections.json').unlink()
+
+        sent = updates(jira, DOCUMENT.replace('Task description', 'Changed'))
+        assert len(sent) == 1 and 'customfield_10100' not in sent[0]
+
+        sent = updates(jira, DOCUMENT.replace('* [ ] First', '* [x] First'))
+        assert len(sent) == 1 and 'customfield_10100' in sent[0]
+        assert '* [done] First' in jira.issues['TEST-2']['fields']['customfield_10100']
+
+    def test_plan_reason(self, jira, tmp_path, make_md2jira, updates):
+        updates(jira, DOCUMENT)
+        (tmp_path / 'doc.md').write_text(DOCUMENT.replace('* [ ] First', '* [x] First') + '* [ ] Third\n')
+        md2j = make_md2jira([str(tmp_path / 'doc.md')], jira, full=True)
+        (tmp_path / '.md2jira_cache.py.tsv').unlink()
+        md2j.plan_markdown(str(tmp_path / 'plan.json'))
+        with open(tmp_path / 'plan.json') as fh:
+            update = next(e for e in json.load(fh)['issues'] if e['action'] == 'update')
+        assert update['reasons'] == [{'field': 'checklist', 'reason': 'items 1 added, 1 status changed'}]
@@ -0,0 +1,98 @@
+"""Unit tests for multi-file and directory input.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - files, globs and directories expand to an ordered list of documents
+  - parse_file() produces the same issues as the in-process parser
+  - several files are synced through one instance with a combined summary
+"""
+
+import json
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.md2jira import MD2Jira, expand_inputs, parse_file
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class FakeJira:
+    """Creates every issue it is asked to and never finds anything."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, verb='GET', body=''):
+        self.calls.append((verb, url))
+        resp        = MagicMock()
+        resp.status = 201
+        if 'search' in url:
+            resp.data = json.dumps({'issues': [], 'isLast': True}).encode('utf-8')
+        else:
+            resp.data = json.dumps({'key': 'TEST-{}'.format(len(self.calls))}).encode('utf-8')
+        return resp
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'roadmap' / 'q1').mkdir(parents=True)
+    (tmp_path / 'roadmap' / 'a.md').write_text('# Epic A\n\n## Task A1\n', encoding='utf-8')
+    (tmp_path / 'roadmap' / 'q1' / 'b.md').write_text('# Epic B\n', encoding='utf-8')
+    (tmp_path / 'roadmap' / 'notes.txt').write_text('# Not markdown\n', encoding='utf-8')
+    (tmp_path / 'c.md').write_text('# Epic C\n', encoding='utf-8')
+    return tmp_path
+
+
+# ---------------------------------------------------------------------------
+# expand_inputs
+# ---------------------------------------------------------------------------
+
+class TestExpandInputs:
+    def test_single_string(self, docs):
+        assert expand_inputs('c.md') == ['c.md']
+
+    def test_directory_is_recursive(self, docs):
+        assert expand_inputs(['roadmap']) == [
+            os.path.join('roadmap', 'a.md'),
+            os.path.join('roadmap', 'q1', 'b.md'),
+        ]
+
+    def test_glob_and_duplicates(self, docs):
+        assert expand_inputs(['*.md', 'c.md', 'roadmap/*.md']) == ['c.md', os.path.join('roadmap', 'a.md')]
+
+    def test_nothing_matches(self, docs):
+        with pytest.raises(FileNotFoundError):
+            expand_inputs(['missing/*.md'])
+
+
+# ---------------------------------------------------------------------------
+# parse_file / sync_files
+# ---------------------------------------------------------------------------
+
+class TestMultiFileSync:
+    def test_parse_file(self, docs):
+        issues = parse_file(os.path.join('roadmap', 'a.md'))
+        assert [i.header_path for i in issues] == ['Epic A', 'Epic A > Task A1']
+        assert issues[0].source_file == os.path.join('roadmap', 'a.md')
+
+    def test_files_share_one_instance_and_summarise(self, docs, capsys, make_md2jira):
+        md2j = make_md2jira(['roadmap', 'c.md'])
+        api  = FakeJira()
+
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=api):
+            md2j.parse_markdown()
+
+        out = capsys.readouterr().out
+        assert 'Summary: 3 files, 4 issues: 4 created, 0 updated, 0 unchanged, 0 failed' in out
+        # One batched lookup per file plus one create per issue
+        assert len(api.calls) == 3 + 4
+
+    def test_single_file_prints_no_summary(self, docs, capsys, make_md2jira):
+        md2j = make_md2jira(['c.md'])
+        with patch.object(MD2Jira, 'jira_http_call', side_effect=FakeJira()):
+            md2j.parse_markdown()
+        assert 'Summary:' not in capsys.readouterr().out
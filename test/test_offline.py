@@ -0,0 +1,133 @@
+"""Tests for the network-free commands (validate, convert, plan --offline).
+
+They verify that:
+  - validate reports orphan Sub-tasks as errors, and duplicate summaries
+    and unclosed code blocks as warnings
+  - convert writes each issue's wiki or ADF description and checklist
+  - plan --offline sends no requests, plans edited sections as updates of
+    the issues they were synced to, and cannot be applied
+  - the validate command does not import the HTTP stack
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.plan import PlanError, load_plan
+from test.test_fake_jira import DOCUMENT
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+@pytest.fixture
+def md2jira(make_md2jira, tmp_path, monkeypatch):
+    """md2jira(jira, text=DOCUMENT, **args): write `text` to doc.md and return the MD2Jira for it"""
+    def make(jira, text=DOCUMENT, **overrides):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / 'doc.md'
+        path.write_text(text, encoding='utf-8')
+        return make_md2jira([str(path)], jira, **overrides)
+    return make
+
+
+# ---------------------------------------------------------------------------
+# validate
+# ---------------------------------------------------------------------------
+
+class TestValidate:
+    def test_valid_document(self, jira, capsys, md2jira):
+        assert md2jira(jira).validate_markdown() == 0
+        assert capsys.readouterr().out == '1 files, 3 issues: 0 errors, 0 warnings\n'
+        assert sum(jira.requests.values()) == 0
+
+    def test_orphan_subtask(self, jira, capsys, md2jira):
+        md2j = md2jira(jira, '# Epic\n\n### Orphan\n')
+        assert md2j.validate_markdown() == 1
+        assert 'doc.md: Epic > Orphan: Sub-task has no Task above it' in capsys.readouterr().out
+
+    def test_warnings(self, jira, capsys, md2jira):
+        text = '# Epic\n\n## Task\n\n# Other\n\n## Task\n\n```\nnever closed\n'
+        assert md2jira(jira, text).validate_markdown() == 0
+        out = capsys.readouterr().out
+        assert 'doc.md: Other > Task: summary also used at' in out
+        assert 'a code block is never closed' in out
+        assert out.endswith('0 errors, 2 warnings\n')
+
+
+# ---------------------------------------------------------------------------
+# convert
+# ---------------------------------------------------------------------------
+
+class TestConvert:
+    @pytest.mark.parametrize('adf', [False, True])
+    def test_convert(self, jira, tmp_path, adf, md2jira):
+        output = str(tmp_path / 'out.json')
+        md2jira(jira, adf=adf).convert_markdown(output)
+        with open(output) as fh:
+            converted = json.load(fh)
+        assert [(c['type'], c['header_path']) for c in converted] == [
+            ('Epic', 'Epic A'),
+            ('Task', 'Epic A > Task A1 - with "quotes"!'),
+            ('Subtask', 'Epic A > Task A1 - with "quotes"! > Sub-task A1a'),
+        ]
+        description = converted[0]['description']
+        if adf:
+            assert description['type'] == 'doc'
+        else:
+            assert description == 'Epic description'
+        assert sum(jira.requests.values()) == 0
+
+
+# ---------------------------------------------------------------------------
+# plan --offline
+# ---------------------------------------------------------------------------
+
+class TestOfflinePlan:
+    def test_offline_plan(self, jira, tmp_path, make_md2jira, sync, md2jira):
+        sync(jira, DOCUMENT)
+        requests = sum(jira.requests.values())
+        text = DOCUMENT.replace('Sub-task description', 'Changed') + '\n## Task A2\n\nNew task\n'
+        output = str(tmp_path / 'plan.json')
+        md2jira(jira, text, offline=True).plan_markdown(output)
+        assert sum(jira.requests.values()) == requests
+
+        plan = load_plan(output)
+        assert plan['offline'] is True
+        assert plan['summary'] == {'create': 1, 'update': 1, 'skip': 2}
+        update = next(e for e in plan['issues'] if e['action'] == 'update')
+        assert update['key'] == 'TEST-3'
+        assert update['fields']['parent'] == {'key': 'TEST-2'}
+
+        with pytest.raises(PlanError):
+            make_md2jira([str(tmp_path / 'doc.md')], jira).apply_plan(plan)
+
+
+# ---------------------------------------------------------------------------
+# Startup
+# ---------------------------------------------------------------------------
+
+class TestStartup:
+    def test_validate_skips_http_stack(self, tmp_path):
+        (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+        script = ('import runpy, sys\n'
+                  'sys.path.insert(0, {root!r})\n'
+                  'sys.argv = ["main.py", "validate", "-i", "doc.md"]\n'
+                  'try:\n'
+                  '    runpy.run_path({main!r}, run_name="__main__")\n'
+                  'except SystemExit as e:\n'
+                  '    print("exit", e.code)\n'
+                  'print(sorted(m for m in ("urllib3", "dotenv", "sqlite3") if m in sys.modules))\n'
+                  ).format(root=ROOT, main=os.path.join(ROOT, 'main.py'))
+        result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path),
+                                capture_output=True, text=True, timeout=60)
+        assert result.stdout.splitlines()[-2:] == ['exit 0', '[]']
@@ -0,0 +1,84 @@
+"""Tests for field-level partial updates.
+
+These run against the in-process fake Jira server.  They verify that:
+  - an update sends only the fields that differ from Jira
+  - moving a Task to another Epic sends only the Epic link, also when
+    the sync state from the previous run is kept
+  - fields md2jira does not own are left alone
+  - the transport counts the bytes sent, and partial updates send fewer
+"""
+
+import json
+
+import pytest
+
+from src.fake_jira import FakeJira
+from test.test_fake_jira import DOCUMENT
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+@pytest.fixture
+def resync(make_md2jira, tmp_path):
+    """resync(jira, text): sync `text` with the sync state cleared, so every issue is compared with Jira
+
+    Returns (md2j, {key: fields sent in its update}).
+    """
+    def run(jira, text):
+        for name in ('.md2jira_cache.py.tsv', '.md2jira_sections.json'):
+            (tmp_path / name).unlink(missing_ok=True)
+        path = tmp_path / 'doc.md'
+        path.write_text(text, encoding='utf-8')
+        md2j = make_md2jira([str(path)], jira)
+        sent = {}
+        update_issue = md2j.update_issue
+        def spy(issue, data):
+            sent[issue.key] = json.loads(data)['fields']
+            return update_issue(issue, data)
+        md2j.update_issue = spy
+        md2j.parse_markdown()
+        return md2j, sent
+    return run
+
+
+class TestPartialUpdates:
+    def test_description_only(self, jira, sync, resync):
+        sync(jira, DOCUMENT)
+        _md2j, sent = resync(jira, DOCUMENT.replace('Sub-task description', 'Changed'))
+        assert sent == {'TEST-3': {'description': 'Changed'}}
+        assert jira.issues['TEST-3']['fields']['parent'] == {'key': 'TEST-2'}
+
+    def test_task_moved_to_other_epic(self, jira, sync, resync):
+        sync(jira, DOCUMENT + '\n# Epic B\n\nOther epic\n')
+        moved = '# Epic A\n\nEpic description\n\n# Epic B\n\nOther epic\n\n' + DOCUMENT[DOCUMENT.index('## '):]
+        _md2j, sent = resync(jira, moved)
+        assert sent == {'TEST-2': {'customfield_10014': 'TEST-4'}}
+
+    @pytest.mark.parametrize('options', [{}, {'jobs': 4}, {'bulk': True}])
+    def test_task_moved_with_sync_state(self, jira, sync, options):
+        sync(jira, DOCUMENT + '\n# Epic B\n\nOther epic\n', **options)
+        keys  = {i['fields']['summary']: key for key, i in jira.issues.items()}
+        moved = '# Epic A\n\nEpic description\n\n# Epic B\n\nOther epic\n\n' + DOCUMENT[DOCUMENT.index('## '):]
+        sync(jira, moved, **options)
+        task = jira.issues[keys['Task A1 - with "quotes"!']]['fields']
+        assert task['customfield_10014'] == keys['Epic B']
+        # The Sub-task keeps its parent Task, so it is not rewritten
+        assert jira.requests['PUT issue/{key}'] == 1
+
+    def test_foreign_fields_untouched(self, jira, sync, resync):
+        sync(jira, DOCUMENT)
+        jira.issues['TEST-1']['fields']['labels'] = ['keep']
+        _md2j, sent = resync(jira, DOCUMENT.replace('Epic description', 'Changed'))
+        assert sent == {'TEST-1': {'description': 'Changed'}}
+        assert jira.issues['TEST-1']['fields']['labels'] == ['keep']
+
+    def test_bytes_sent(self, jira, sync, resync):
+        sync(jira, DOCUMENT)
+        md2j, sent = resync(jira, DOCUMENT.replace('Epic description', 'Changed'))
+        epic = next(md2j.parser.iter_issues(['# Epic A\n', '\n', 'Changed\n']))
+        assert len(json.dumps({'fields': sent['TEST-1']})) < len(md2j.prepare_issue(epic)) / 2
+        assert md2j.transport.report()['bytes_sent'] > 0
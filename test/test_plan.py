@@ -0,0 +1,162 @@
+"""Tests for plan/apply.
+
+These run against the in-process fake Jira server.  They verify that:
+  - plan resolves remote state without writing to Jira or the caches
+  - entries carry create/update/skip actions with field-level reasons
+  - the plan states how many requests apply will send, and apply sends that many
+  - apply links new children to parents created in the same run
+  - a plan made for another project is refused
+"""
+
+import json
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.plan import PlanError, load_plan
+from test.test_fake_jira import DOCUMENT, _writes
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+@pytest.fixture
+def make_plan(make_md2jira, tmp_path, monkeypatch):
+    """make_plan(jira, text=DOCUMENT, **args) -> the plan for syncing `text` into `jira`"""
+    def make(jira, text=DOCUMENT, **overrides):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / 'doc.md'
+        path.write_text(text, encoding='utf-8')
+        output = str(tmp_path / 'plan.json')
+        make_md2jira([str(path)], jira, **overrides).plan_markdown(output)
+        return load_plan(output)
+    return make
+
+
+@pytest.fixture
+def apply_plan(make_md2jira, tmp_path):
+    """apply_plan(jira, plan, **args) -> the MD2Jira that applied `plan`"""
+    def run(jira, plan, **overrides):
+        md2j = make_md2jira([str(tmp_path / 'doc.md')], jira, **overrides)
+        md2j.apply_plan(plan)
+        return md2j
+    return run
+
+
+def _actions(plan):
+    return {entry['summary']: entry['action'] for entry in plan['issues']}
+
+
+# ---------------------------------------------------------------------------
+# plan
+# ---------------------------------------------------------------------------
+
+class TestPlan:
+    def test_plan_writes_nothing(self, jira, tmp_path, make_plan):
+        plan = make_plan(jira)
+        assert set(_actions(plan).values()) == {'create'}
+        assert plan['summary'] == {'create': 3, 'update': 0, 'skip': 0}
+        assert plan['requests']['create'] == 3
+        assert plan['requests']['lookup'] == jira.requests['POST search/jql'] == 1
+        assert _writes(jira) == 0
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['doc.md', 'plan.json']
+
+    def test_field_level_reasons(self, jira, sync, make_plan):
+        sync(jira, DOCUMENT)
+        plan = make_plan(jira, DOCUMENT.replace('Sub-task description', 'Changed')
+                         + '\n## Task A2\n\nNew task\n')
+        update = next(e for e in plan['issues'] if e['action'] == 'update')
+        assert update['key'] == 'TEST-3'
+        assert [r['field'] for r in update['reasons']] == ['description']
+        assert list(update['fields']) == ['description']
+        create = next(e for e in plan['issues'] if e['action'] == 'create')
+        assert create['summary'] == 'Task A2' and create['fields']['customfield_10014'] == 'TEST-1'
+        assert plan['summary'] == {'create': 1, 'update': 1, 'skip': 2}
+        assert plan['requests']['total'] == 2
+
+    def test_moved_task_is_relinked(self, jira, sync, make_plan):
+        sync(jira, DOCUMENT + '\n# Epic B\n\nOther epic\n')
+        plan = make_plan(jira, '# Epic A\n\nEpic description\n\n# Epic B\n\nOther epic\n\n'
+                         + DOCUMENT[DOCUMENT.index('## '):])
+        update = next(e for e in plan['issues'] if e['action'] == 'update')
+        assert update['key'] == 'TEST-2' and update['fields'] == {'customfield_10014': 'TEST-4'}
+        assert plan['summary'] == {'create': 0, 'update': 1, 'skip': 3}
+
+    def test_skip_when_matching_jira(self, jira, tmp_path, sync, make_plan):
+        sync(jira, DOCUMENT)
+        (tmp_path / '.md2jira_cache.py.tsv').unlink()
+        plan = make_plan(jira, full=True)
+        assert plan['summary']['skip'] == 3
+        assert {e['reasons'][0]['reason'] for e in plan['issues']} == {'matches Jira'}
+
+
+# ---------------------------------------------------------------------------
+# apply
+# ---------------------------------------------------------------------------
+
+class TestApply:
+    def test_apply_creates_hierarchy(self, jira, sync, make_plan, apply_plan):
+        plan = make_plan(jira)
+        before = sum(jira.requests.values())
+        apply_plan(jira, plan, jobs=4)
+        assert sum(jira.requests.values()) - before == plan['requests']['total']
+
+        issues = {i['fields']['summary']: i for i in jira.issues.values()}
+        epic, task, subtask = (issues[s] for s in ('Epic A', 'Task A1 - with "quotes"!', 'Sub-task A1a'))
+        assert task['fields']['customfield_10014'] == epic['key']
+        assert subtask['fields']['parent']['key'] == task['key']
+
+        # The caches were seeded: the next sync sends nothing
+        writes = _writes(jira)
+        searches = jira.requests['POST search/jql']
+        sync(jira, DOCUMENT)
+        assert _writes(jira) == writes
+        assert jira.requests['POST search/jql'] == searches
+
+    def test_apply_updates(self, jira, sync, make_plan, apply_plan):
+        sync(jira, DOCUMENT)
+        plan = make_plan(jira, DOCUMENT.replace('Epic description', 'Changed'))
+        apply_plan(jira, plan)
+        assert jira.requests['PUT issue/{key}'] == 1
+        assert 'Changed' in jira.issues['TEST-1']['fields']['description']
+
+    @pytest.mark.parametrize('cached', [True, False])
+    def test_existing_task_under_new_epic(self, jira, tmp_path, capsys, sync, make_plan, apply_plan, cached):
+        sync(jira, '## Lonely Task\n\nTask description\n')
+        if not cached:
+            (tmp_path / '.md2jira_cache.py.tsv').unlink()
+        text = '# New Epic\n\nEpic description\n\n## Lonely Task\n\nTask description\n'
+        plan = make_plan(jira, text)
+        assert _actions(plan) == {'New Epic': 'create', 'Lonely Task': 'update'}
+        apply_plan(jira, plan)
+        assert jira.issues['TEST-1']['fields']['customfield_10014'] == 'TEST-2'
+
+        # The link was written, so the next sync has nothing to do
+        writes = _writes(jira)
+        capsys.readouterr()
+        sync(jira, text)
+        assert _writes(jira) == writes
+        assert 'TEST-1: "Lonely Task" up to date' in capsys.readouterr().out
+
+    def test_failed_parent_skips_children(self, jira, capsys, make_plan, apply_plan):
+        plan = make_plan(jira)
+        for entry in plan['issues']:
+            if entry['type'] == 'Epic':
+                entry['fields']['summary'] = ''
+        md2j = apply_plan(jira, plan)
+        assert jira.issues == {}
+        assert sum(counts['failed'] for counts in md2j.stats.values()) == 3
+
+    def test_refuses_other_project(self, jira, make_plan, apply_plan):
+        plan = make_plan(jira)
+        plan['project'] = 'OTHER'
+        with pytest.raises(PlanError):
+            apply_plan(jira, plan)
+
+    def test_plan_is_json(self, jira, tmp_path, make_plan):
+        make_plan(jira)
+        with open(tmp_path / 'plan.json') as fh:
+            assert json.load(fh)['version'] == 1
@@ -0,0 +1,87 @@
+"""Tests for the --profile report.
+
+These sync against the in-process fake Jira server.  They verify that:
+  - phases, per-endpoint request metrics and cache counters are reported
+  - request counts match what the server received
+  - cache misses that turned into updates are counted
+  - without --profile nothing is recorded or written
+"""
+
+import json
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.profiler import NullProfiler, Profiler, endpoint_path, percentile
+from test.test_fake_jira import DOCUMENT
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+# ---------------------------------------------------------------------------
+# Profiler
+# ---------------------------------------------------------------------------
+
+class TestProfiler:
+    def test_endpoint_path(self):
+        assert endpoint_path('https://x.atlassian.net/rest/api/2/issue/TEST-12?fields=a') == '/rest/api/2/issue/{key}'
+        assert endpoint_path('http://127.0.0.1:80/rest/api/3/search/jql?jql=x') == '/rest/api/3/search/jql'
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([7], 95) == 7
+
+    def test_parse_excludes_convert(self):
+        profiler = Profiler(clock=lambda: 0)
+        profiler.add('parse', 5)
+        profiler.add('convert', 2)
+        assert profiler.report()['phases']['parse'] == {'seconds': 3, 'calls': 1}
+
+    def test_null_profiler(self):
+        profiler = NullProfiler()
+        function = len
+        assert profiler.timed('convert', function) is function
+        items = [1, 2]
+        assert profiler.timed_iter('parse', items) is items
+        with profiler.phase('diff'):
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Syncing with --profile
+# ---------------------------------------------------------------------------
+
+class TestReport:
+    def test_report(self, jira, tmp_path, sync):
+        path = tmp_path / 'profile.json'
+        sync(jira, DOCUMENT, profile=str(path))
+        report = json.loads(path.read_text())
+
+        assert set(report['phases']) >= {'parse', 'convert', 'lookup', 'write', 'cache_flush'}
+        assert report['requests']['POST /rest/api/2/issue']['count'] == jira.requests['POST issue'] == 3
+        search = report['requests']['POST /rest/api/3/search/jql']
+        assert search['count'] == jira.requests['POST search/jql']
+        assert search['bytes_sent'] > 0 and search['bytes_received'] > 0
+        assert search['p50_ms'] <= search['p95_ms'] <= search['max_ms']
+        assert report['outcomes'] == {'created': 3}
+        assert report['transport']['requests'] == sum(jira.requests.values())
+
+    def test_cache_misses_updated(self, jira, tmp_path, sync):
+        sync(jira, DOCUMENT)
+        path = tmp_path / 'profile.json'
+        sync(jira, DOCUMENT.replace('Epic description', 'Changed'), profile=str(path))
+        report = json.loads(path.read_text())
+        assert report['cache'] == {'section_hits': 2, 'hits': 0, 'misses': 1, 'misses_updated': 1}
+        assert report['phases']['diff']['calls'] == 1
+        assert report['requests']['PUT /rest/api/2/issue/{key}']['count'] == 1
+
+    def test_disabled(self, jira, tmp_path, sync):
+        md2j = sync(jira, DOCUMENT)
+        assert isinstance(md2j.profiler, NullProfiler)
+        assert not list(tmp_path.glob('*profile*.json'))
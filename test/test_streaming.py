@@ -0,0 +1,133 @@
+"""Unit tests for the streaming parse -> sync pipeline.
+
+These tests mock the JIRA API so they can run without credentials.
+They verify that:
+  - iter_issues() yields each issue as soon as the next header is read
+  - sync_stream() syncs in windows while parsing continues
+  - parser errors surface in the sync stage
+  - the parser never runs more than PIPELINE_QUEUE_SIZE issues ahead
+  - syncing a file holds no more memory for a longer document
+"""
+
+import pytest
+import threading
+import tracemalloc
+from unittest.mock import patch
+
+from src.md2jira import MD2Jira, Issue, IssueType, PIPELINE_QUEUE_SIZE, SEARCH_BATCH_SIZE
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _epics(count):
+    for i in range(count):
+        yield '# Epic {}\n'.format(i)
+        yield 'description {}\n'.format(i)
+
+
+# ---------------------------------------------------------------------------
+# iter_issues
+# ---------------------------------------------------------------------------
+
+class TestIterIssues:
+    def test_yields_before_reading_rest_of_input(self, make_md2jira):
+        md2j  = make_md2jira()
+        read  = []
+
+        def lines():
+            for line in ['# First\n', 'desc\n', '# Second\n', 'never read yet\n']:
+                read.append(line)
+                yield line
+
+        first = next(md2j.iter_issues(lines()))
+        assert first.summary == 'First'
+        assert first.description == 'desc\n'
+        assert read[-1] == '# Second\n'
+
+    def test_final_issue_is_yielded(self, make_md2jira):
+        md2j   = make_md2jira()
+        issues = list(md2j.iter_issues(['# A\n', '## B\n', 'text\n']))
+        assert [i.summary for i in issues] == ['A', 'B']
+        assert issues[1].description == 'text\n'
+
+    def test_empty_input(self, make_md2jira):
+        md2j = make_md2jira()
+        assert list(md2j.iter_issues([])) == []
+
+
+# ---------------------------------------------------------------------------
+# sync_stream
+# ---------------------------------------------------------------------------
+
+class TestSyncStream:
+    def test_all_issues_synced_in_order(self, make_md2jira):
+        md2j    = make_md2jira()
+        synced  = []
+        windows = []
+
+        def fake_sync(window):
+            windows.append(len(window))
+            synced.extend(i.summary for i in window)
+
+        with patch.object(md2j, 'sync_issues', side_effect=fake_sync):
+            md2j.sync_stream(md2j.iter_issues(_epics(100)))
+
+        assert synced == ['Epic {}'.format(i) for i in range(100)]
+        assert max(windows) <= SEARCH_BATCH_SIZE
+
+    def test_parser_error_is_raised(self, make_md2jira):
+        md2j = make_md2jira()
+
+        def broken():
+            yield Issue(IssueType.Epic, '', 'ok')
+            raise UnicodeDecodeError('utf-8', b'', 0, 1, 'bad byte')
+
+        with patch.object(md2j, 'sync_issues'):
+            with pytest.raises(UnicodeDecodeError):
+                md2j.sync_stream(broken())
+
+    def test_parser_is_bounded_by_queue(self, make_md2jira):
+        md2j     = make_md2jira()
+        produced = []
+        release  = threading.Event()
+        maximum  = []
+
+        def source():
+            for i in range(PIPELINE_QUEUE_SIZE * 4):
+                produced.append(i)
+                yield Issue(IssueType.Epic, '', 'Epic {}'.format(i))
+
+        def slow_sync(window):
+            if not release.is_set():
+                # Give the parser time to fill the queue, then measure
+                release.wait(0.3)
+                maximum.append(len(produced))
+                release.set()
+
+        with patch.object(md2j, 'sync_issues', side_effect=slow_sync):
+            md2j.sync_stream(source())
+
+        # First window + full queue + the item blocked in put()
+        assert maximum[0] <= SEARCH_BATCH_SIZE + PIPELINE_QUEUE_SIZE + 2
+        assert len(produced) == PIPELINE_QUEUE_SIZE * 4
+
+    def test_memory_stays_flat(self, make_md2jira, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        def peak(tasks):
+            # One Epic: its Tasks must not be kept alive by the Epic or the run
+            text = '# Epic\n\n' + ''.join('## Task {}\n\nDescription {}\n\n'.format(i, i) for i in range(tasks))
+            (tmp_path / 'doc.md').write_text(text, encoding='utf-8')
+            md2j = make_md2jira('doc.md')
+            # A plain function: a mock would keep every window it was called with
+            with patch.object(MD2Jira, 'sync_issues', lambda self, issues: None):
+                tracemalloc.start()
+                try:
+                    md2j.sync_file('doc.md')
+                    return tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+        assert peak(8000) < 2 * peak(2000)
@@ -0,0 +1,197 @@
+"""Unit tests for the in-memory sync cache.
+
+They verify that:
+  - the TSV file is read once and lookups are served from memory
+  - updates are only written back by flush(), atomically
+  - an existing cache file keeps its format
+  - MD2Jira flushes the cache even when a sync is interrupted
+  - the SQLite backend isolates targets, tolerates concurrent writers and
+    migrates legacy TSV caches
+"""
+
+import builtins
+import os
+import pytest
+from unittest.mock import patch
+
+from src.md2jira import Issue, IssueType
+from src.sync_cache import SyncCache, SqliteSyncCache, HASH_VERSION
+
+
+# ---------------------------------------------------------------------------
+# SyncCache
+# ---------------------------------------------------------------------------
+
+class TestSyncCache:
+    def test_missing_file_is_empty(self, tmp_path):
+        cache = SyncCache(str(tmp_path / 'cache.tsv'))
+        assert cache.get_hash('TEST-1') is None
+        assert not (tmp_path / 'cache.tsv').exists()
+
+    def test_reads_existing_file_once(self, tmp_path):
+        path = tmp_path / 'cache.tsv'
+        path.write_text('TEST-1\t"Epic"\tabc\nTEST-2\t"Task"\tdef\n', encoding='utf-8')
+        cache = SyncCache(str(path))
+
+        real_open = builtins.open
+        with patch('builtins.open', side_effect=real_open) as mock_open:
+            assert cache.is_current('TEST-1', 'abc')
+            assert cache.is_current('TEST-2', 'def')
+            assert not cache.is_current('TEST-2', 'xyz')
+        assert mock_open.call_count == 1
+
+    def test_put_is_not_written_until_flush(self, tmp_path):
+        path  = tmp_path / 'cache.tsv'
+        cache = SyncCache(str(path))
+        cache.put('TEST-1', 'Epic', 'abc')
+        assert not path.exists()
+
+        cache.flush()
+        assert path.read_text(encoding='utf-8') == 'TEST-1\t"Epic"\tabc\n'
+
+    def test_flush_replaces_entries_and_keeps_others(self, tmp_path):
+        path = tmp_path / 'cache.tsv'
+        path.write_text('TEST-1\t"Epic"\tabc\nTEST-10\t"Other"\tzzz\n', encoding='utf-8')
+        cache = SyncCache(str(path))
+        cache.put('TEST-1', 'Epic', 'new')
+        cache.flush()
+
+        reloaded = SyncCache(str(path))
+        assert reloaded.get_hash('TEST-1') == 'new'
+        assert reloaded.get_hash('TEST-10') == 'zzz'
+
+    def test_flush_leaves_no_temp_files(self, tmp_path):
+        cache = SyncCache(str(tmp_path / 'cache.tsv'))
+        cache.put('TEST-1', 'Epic', 'abc')
+        cache.flush()
+        assert os.listdir(tmp_path) == ['cache.tsv']
+
+    def test_identity_round_trip(self, tmp_path):
+        path  = tmp_path / 'cache.tsv'
+        cache = SyncCache(str(path))
+        cache.put('TEST-1', 'Task', 'abc', source_file='doc.md', header_path='Epic > Task')
+        cache.flush()
+
+        reloaded = SyncCache(str(path))
+        assert reloaded.find_by_identity('doc.md', 'Epic > Task') == ('TEST-1', 'abc')
+        assert reloaded.find_by_identity('doc.md', 'Task') is None
+
+    def test_identity_kept_when_put_without_one(self, tmp_path):
+        cache = SyncCache(str(tmp_path / 'cache.tsv'))
+        cache.put('TEST-1', 'Task', 'abc', source_file='doc.md', header_path='Task')
+        cache.put('TEST-1', 'Task', 'def')
+        assert cache.find_by_identity('doc.md', 'Task') == ('TEST-1', 'def')
+
+    def test_unchanged_put_does_not_dirty(self, tmp_path):
+        path = tmp_path / 'cache.tsv'
+        path.write_text('TEST-1\t"Epic"\tabc\n', encoding='utf-8')
+        cache = SyncCache(str(path))
+        cache.put('TEST-1', 'Epic', 'abc')
+        assert cache.dirty == set()
+
+
+# ---------------------------------------------------------------------------
+# MD2Jira integration
+# ---------------------------------------------------------------------------
+
+class TestCacheFlushOnRun:
+    def test_interrupted_sync_still_flushes(self, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'doc.md').write_text('# Epic\n\n## Task\n', encoding='utf-8')
+        md2j = make_md2jira('doc.md')
+
+        def interrupt(issues):
+            md2j.update_issue_cache(Issue(IssueType.Epic, 'TEST-1', 'Epic'))
+            raise KeyboardInterrupt
+
+        with patch.object(md2j, 'sync_issues', side_effect=interrupt):
+            with pytest.raises(KeyboardInterrupt):
+                md2j.parse_markdown()
+
+        assert SyncCache(str(tmp_path / '.md2jira_cache.py.tsv')).get_hash('TEST-1') is not None
+
+
+# ---------------------------------------------------------------------------
+# SqliteSyncCache
+# ---------------------------------------------------------------------------
+
+class TestSqliteSyncCache:
+    def _open(self, tmp_path, project='TEST', site='fake.atlassian.net', tsv=None):
+        return SqliteSyncCache(str(tmp_path / 'state.db'), site, project, tsv_path=tsv)
+
+    def test_put_get_round_trip(self, tmp_path):
+        cache = self._open(tmp_path)
+        cache.put('TEST-1', 'Epic', 'abc', source_file='doc.md', header_path='Epic')
+        assert cache.is_current('TEST-1', 'abc')
+        cache.flush()
+
+        reopened = self._open(tmp_path)
+        entry    = reopened.get('TEST-1')
+        assert entry['hash'] == 'abc'
+        assert entry['source_file'] == 'doc.md'
+        assert entry['hash_version'] == HASH_VERSION
+        assert entry['last_sync'] is not None
+
+    def test_wal_mode(self, tmp_path):
+        cache = self._open(tmp_path)
+        assert cache.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def test_targets_are_isolated(self, tmp_path):
+        first = self._open(tmp_path, project='TEST')
+        first.put('TEST-1', 'Epic', 'abc')
+        first.flush()
+
+        other_site = self._open(tmp_path, site='other.atlassian.net')
+        assert other_site.get_hash('TEST-1') is None
+
+    def test_stale_hash_version_is_a_miss(self, tmp_path):
+        cache = self._open(tmp_path)
+        cache.put('TEST-1', 'Epic', 'abc')
+        cache.flush()
+        cache.conn.execute('UPDATE sync_state SET hash_version = 0')
+        assert cache.get_hash('TEST-1') is None
+
+    def test_find_by_indexed_columns(self, tmp_path):
+        cache = self._open(tmp_path)
+        cache.put('TEST-1', 'Epic', 'abc', source_file='a.md', header_path='Epic')
+        cache.put('TEST-2', 'Task', 'def', source_file='a.md', header_path='Epic > Task')
+        cache.put('TEST-3', 'Other', 'ghi', source_file='b.md', header_path='Other')
+
+        assert [r['issue_key'] for r in cache.find(source_file='a.md', header_path='Epic > Task')] == ['TEST-2']
+        assert len(cache.find(source_file='a.md')) == 2
+        with pytest.raises(ValueError):
+            cache.find(colour='red')
+
+    def test_concurrent_writers_do_not_clobber(self, tmp_path):
+        job_a = self._open(tmp_path)
+        job_b = self._open(tmp_path)
+        job_a.put('TEST-1', 'From A', 'aaa')
+        job_b.put('TEST-2', 'From B', 'bbb')
+        job_a.flush()
+        job_b.flush()
+
+        reader = self._open(tmp_path)
+        assert reader.get_hash('TEST-1') == 'aaa'
+        assert reader.get_hash('TEST-2') == 'bbb'
+
+    def test_find_by_identity(self, tmp_path):
+        cache = self._open(tmp_path)
+        cache.put('TEST-1', 'Task', 'abc', source_file='a.md', header_path='Epic > Task')
+        assert cache.find_by_identity('a.md', 'Epic > Task') == ('TEST-1', 'abc')
+        cache.flush()
+        assert self._open(tmp_path).find_by_identity('a.md', 'Epic > Task') == ('TEST-1', 'abc')
+
+    def test_migrates_tsv_once(self, tmp_path):
+        tsv = tmp_path / 'cache.tsv'
+        tsv.write_text('TEST-1\t"Epic"\tabc\nOTHER-1\t"Elsewhere"\tzzz\n', encoding='utf-8')
+
+        cache = self._open(tmp_path, tsv=str(tsv))
+        assert cache.get_hash('TEST-1') == 'abc'
+        assert cache.get('OTHER-1') is None
+        assert cache.get('TEST-1')['summary'] == 'Epic'
+
+        # A second open must not overwrite newer state with the TSV content
+        cache.put('TEST-1', 'Epic', 'newer')
+        cache.flush()
+        reopened = self._open(tmp_path, tsv=str(tsv))
+        assert reopened.get_hash('TEST-1') == 'newer'
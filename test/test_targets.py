@@ -0,0 +1,144 @@
+"""Tests for multi-target sync (md2jira targets CONFIG).
+
+These run against several in-process fake Jira servers.  They verify that:
+  - one config syncs the same documents into every (site, project) target
+  - every target has its own credentials, rate limit, connection pool and
+    sync state, including its issue mirror
+  - targets run at the same time, and a failing target does not stop the
+    others
+  - invalid configs are rejected before anything is synced
+"""
+
+import argparse
+import json
+import os
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.targets import TargetError, load_targets, run_targets, sync_targets, target_md2jira
+from test.test_fake_jira import DOCUMENT
+
+
+@pytest.fixture
+def sites():
+    with FakeJira(project='PLAN', latency=0.02) as plan, FakeJira(project='OPS', latency=0.02) as ops:
+        yield plan, ops
+
+
+def _cli(**overrides):
+    defaults = {'JIRA_PROJECT_KEY': None, 'verbose': False, 'bulk': False, 'jobs': 1, 'state_db': None,
+                'mirror': None, 'full': False, 'adf': False, 'rate': None, 'profile': None}
+    defaults.update(overrides)
+    return argparse.Namespace(**defaults)
+
+
+def _config(tmp_path, monkeypatch, sites, **extra):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('PLAN_AUTH', 'cGxhbjp0b2tlbg==')
+    monkeypatch.setenv('OPS_AUTH', 'b3BzOnRva2Vu')
+    (tmp_path / 'doc.md').write_text(DOCUMENT, encoding='utf-8')
+    plan, ops = sites
+    config = {
+        'inputs':  ['doc.md'],
+        'targets': [
+            {'name': 'plan', 'base_url': plan.url, 'project': 'PLAN', 'auth_env': 'PLAN_AUTH', 'rate': 50},
+            {'name': 'ops', 'base_url': ops.url, 'project': 'OPS', 'auth_env': 'OPS_AUTH', 'jobs': 2},
+        ],
+    }
+    config.update(extra)
+    path = tmp_path / 'targets.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+    return str(path)
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+class TestSyncTargets:
+    def test_every_target_is_synced(self, sites, tmp_path, monkeypatch, capsys):
+        path = _config(tmp_path, monkeypatch, sites)
+        assert sync_targets(path, _cli()) == 0
+
+        plan, ops = sites
+        assert sorted(plan.issues) == ['PLAN-1', 'PLAN-2', 'PLAN-3']
+        assert sorted(ops.issues) == ['OPS-1', 'OPS-2', 'OPS-3']
+        assert ops.issues['OPS-3']['fields']['parent'] == {'key': 'OPS-2'}
+        out = capsys.readouterr().out
+        assert '[plan] Created issue PLAN-1' in out and '[ops] Created issue OPS-1' in out
+        assert 'plan: 3 issues: 3 created' in out and 'Targets: 2 synced' in out
+
+        # State is kept per target, so the second run is a no-op everywhere
+        for directory in ('plan', 'ops'):
+            assert os.path.exists(os.path.join('.md2jira', directory, '.md2jira_cache.py.tsv'))
+        requests = sum(plan.requests.values()) + sum(ops.requests.values())
+        assert sync_targets(path, _cli()) == 0
+        assert sum(plan.requests.values()) + sum(ops.requests.values()) == requests
+
+    def test_targets_are_separate(self, sites, tmp_path, monkeypatch):
+        path    = _config(tmp_path, monkeypatch, sites)
+        targets = [target_md2jira(settings, _cli()) for settings in load_targets(path)]
+        plan, ops = targets
+        assert (plan.PROJECT_KEY, plan.auth_key, plan.transport.rate) == ('PLAN', 'cGxhbjp0b2tlbg==', 50)
+        assert (ops.PROJECT_KEY, ops.auth_key, ops.jobs) == ('OPS', 'b3BzOnRva2Vu', 2)
+        assert plan.transport is not ops.transport
+        assert plan.site != ops.site
+
+    def test_mirror_is_kept_per_target(self, sites, tmp_path, monkeypatch):
+        path = _config(tmp_path, monkeypatch, sites)
+        monkeypatch.setenv('MD2JIRA_MIRROR', 'shared.json')
+        assert sync_targets(path, _cli(mirror='.md2jira_mirror.json')) == 0
+        assert not os.path.exists('.md2jira_mirror.json') and not os.path.exists('shared.json')
+        for directory in ('plan', 'ops'):
+            with open(os.path.join('.md2jira', directory, 'mirror.json'), encoding='utf-8') as fh:
+                targets = json.load(fh)['targets']
+            assert len(targets) == 1
+            assert len(next(iter(targets.values()))['issues']) == 3
+
+    def test_targets_run_at_once(self, sites, tmp_path, monkeypatch):
+        path    = _config(tmp_path, monkeypatch, sites)
+        targets = [(s['name'], target_md2jira(s, _cli())) for s in load_targets(path)]
+        spans   = {}
+        for name, md2j in targets:
+            sync_file = md2j.sync_file
+            def timed(path, name=name, sync_file=sync_file):
+                spans[name] = [os.times().elapsed]
+                sync_file(path)
+                spans[name].append(os.times().elapsed)
+            md2j.sync_file = timed
+        run_targets(targets)
+        # Each target started before the other one finished
+        assert spans['plan'][0] < spans['ops'][1] and spans['ops'][0] < spans['plan'][1]
+
+    def test_failing_target_does_not_stop_others(self, sites, tmp_path, monkeypatch):
+        path = _config(tmp_path, monkeypatch, sites, targets=[
+            {'name': 'plan', 'base_url': sites[0].url, 'project': 'PLAN', 'auth_env': 'PLAN_AUTH'},
+            {'name': 'broken', 'base_url': sites[1].url, 'project': 'OPS', 'auth_env': 'OPS_AUTH',
+             'inputs': ['missing.md']},
+        ])
+        assert sync_targets(path, _cli()) == 1
+        assert len(sites[0].issues) == 3
+
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+
+class TestConfig:
+    @pytest.mark.parametrize('targets, message', [
+        ([{'project': 'PLAN', 'colour': 'red'}], 'unknown setting(s): colour'),
+        ([{'name': 'a'}], 'no "project"'),
+        ([{'project': 'PLAN'}, {'project': 'PLAN'}], 'is used twice'),
+    ])
+    def test_rejected(self, tmp_path, monkeypatch, sites, targets, message):
+        path = _config(tmp_path, monkeypatch, sites, targets=targets)
+        with pytest.raises(TargetError, match=message.replace('(', r'\(').replace(')', r'\)')):
+            load_targets(path)
+
+    def test_missing_credentials(self, tmp_path, monkeypatch, sites):
+        path = _config(tmp_path, monkeypatch, sites)
+        monkeypatch.delenv('OPS_AUTH')
+        with pytest.raises(TargetError, match='OPS_AUTH is not set'):
+            sync_targets(path, _cli())
+        assert not sites[0].issues
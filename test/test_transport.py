@@ -0,0 +1,177 @@
+"""Unit tests for the rate-limit-aware transport.
+
+These tests use a fake connection pool so they can run without credentials.
+They verify that:
+  - 429 responses are retried after the Retry-After delay, for any verb
+  - 5xx responses and connection errors are retried for idempotent
+    requests only, with bounded jittered backoff
+  - an exhausted X-RateLimit-Remaining pauses until X-RateLimit-Reset
+  - the token bucket spaces requests at the configured rate
+  - the in-flight limit halves on throttling and grows back on success
+  - MD2Jira treats search POSTs as idempotent and reports throttled time
+"""
+
+from datetime import datetime, timedelta, timezone
+import pytest
+import urllib3
+from unittest.mock import MagicMock
+
+from src.transport import JiraTransport
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _resp(status, headers=None, data=b'{}'):
+    resp         = MagicMock()
+    resp.status  = status
+    resp.headers = headers or {}
+    resp.data    = data
+    return resp
+
+
+class FakePool:
+    """Returns (or raises) the queued responses in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls     = []
+
+    def request(self, verb, url, headers=None, body=None, retries=None):
+        self.calls.append((verb, url))
+        item = self.responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+class FakeClock:
+    def __init__(self):
+        self.now    = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _transport(pool, **kwargs):
+    clock = FakeClock()
+    return JiraTransport(pool, sleep=clock.sleep, clock=clock, **kwargs), clock
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+class TestRetries:
+    def test_429_waits_for_retry_after(self):
+        pool             = FakePool(_resp(429, {'Retry-After': '3'}), _resp(201))
+        transport, clock = _transport(pool)
+
+        resp = transport.request('POST', 'https://x/issue', body=b'{}')
+        assert resp.status == 201
+        assert len(pool.calls) == 2
+        assert 3 <= sum(clock.sleeps) <= 3.3
+        assert transport.report()['throttled'] == 1
+        assert transport.report()['throttled_seconds'] >= 3
+
+    def test_5xx_retried_for_idempotent_only(self):
+        pool         = FakePool(_resp(503), _resp(200))
+        transport, _ = _transport(pool)
+        assert transport.request('GET', 'https://x/issue/TEST-1').status == 200
+
+        pool         = FakePool(_resp(503))
+        transport, _ = _transport(pool)
+        assert transport.request('POST', 'https://x/issue').status == 503
+        assert len(pool.calls) == 1
+
+    def test_connection_errors(self):
+        error        = urllib3.exceptions.NewConnectionError(None, 'refused')
+        pool         = FakePool(error, _resp(200))
+        transport, _ = _transport(pool)
+        assert transport.request('PUT', 'https://x/issue/TEST-1').status == 200
+
+        transport, _ = _transport(FakePool(error))
+        with pytest.raises(urllib3.exceptions.HTTPError):
+            transport.request('POST', 'https://x/issue')
+
+    def test_gives_up_after_max_retries(self):
+        pool             = FakePool(*[_resp(503)] * 4)
+        transport, clock = _transport(pool, max_retries=3, backoff_base=1, backoff_max=2)
+        assert transport.request('GET', 'https://x').status == 503
+        assert len(pool.calls) == 4
+        assert all(0 <= s <= 2 for s in clock.sleeps)
+
+    def test_exhausted_budget_pauses_until_reset(self):
+        reset            = (datetime.now(timezone.utc) + timedelta(seconds=10)).isoformat()
+        headers          = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}
+        pool             = FakePool(_resp(200, headers), _resp(200))
+        transport, clock = _transport(pool)
+
+        transport.request('GET', 'https://x/1')
+        transport.request('GET', 'https://x/2')
+        assert 8 <= sum(clock.sleeps) <= 11.5
+
+
+# ---------------------------------------------------------------------------
+# Pacing
+# ---------------------------------------------------------------------------
+
+class TestPacing:
+    def test_token_bucket(self):
+        pool             = FakePool(*[_resp(200)] * 5)
+        transport, clock = _transport(pool, rate=2, burst=1)
+        for _ in range(5):
+            transport.request('GET', 'https://x')
+        # First request uses the initial token, the rest wait 0.5s each
+        assert clock.now == pytest.approx(2.0)
+
+    def test_aimd_limit(self):
+        headers          = {'Retry-After': '0.1'}
+        pool             = FakePool(_resp(429, headers), _resp(200), *[_resp(200)] * 20)
+        transport, _     = _transport(pool, max_in_flight=8)
+
+        transport.request('GET', 'https://x')
+        after_throttle = transport.limit
+        assert after_throttle <= 8
+        for _ in range(20):
+            transport.request('GET', 'https://x')
+        assert transport.limit > after_throttle
+
+    def test_near_limit_halves(self):
+        transport, _ = _transport(FakePool(_resp(200, {'X-RateLimit-NearLimit': 'true'})), max_in_flight=8)
+        transport.request('GET', 'https://x')
+        assert transport.limit < 8
+
+
+# ---------------------------------------------------------------------------
+# MD2Jira integration
+# ---------------------------------------------------------------------------
+
+class TestJiraHttpCall:
+    def test_search_post_is_retried(self, make_md2jira):
+        md2j      = make_md2jira()
+        md2j.http = FakePool(_resp(503), _resp(200, data=b'{"issues": [], "isLast": true}'))
+        md2j.transport.http  = md2j.http
+        md2j.transport.sleep = lambda seconds: None
+
+        assert list(md2j.search_issues('project = TEST')) == []
+        assert len(md2j.http.calls) == 2
+
+    def test_rate_option(self, make_md2jira):
+        assert make_md2jira(rate=5).transport.rate == 5.0
+
+    def test_report_printed_when_throttled(self, capsys, make_md2jira):
+        md2j = make_md2jira()
+        md2j.transport.throttled_seconds = 4.2
+        md2j.print_transport_report()
+        assert '4.2s spent waiting on rate limits' in capsys.readouterr().out
+
+        md2j.transport.throttled_seconds = 0
+        md2j.print_transport_report()
+        assert capsys.readouterr().out == ''
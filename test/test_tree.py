@@ -0,0 +1,141 @@
+"""Tests for the document tree and parent linking.
+
+These run against the in-process fake Jira server.  They verify that:
+  - the tree holds each node's parent and children by index, and its key
+    is pending until set
+  - Tasks and Sub-tasks of an Epic that failed to sync fail too, instead
+    of being linked to the previous Epic
+  - streamed windows still link to parents parsed in earlier windows
+  - nodes can be synced in any order once their parents have keys
+  - plan entries number the nodes of each file's tree in turn
+"""
+
+import io
+import json
+
+import pytest
+
+import src.md2jira
+from src.fake_jira import FakeJira
+from src.md2jira import DocumentTree, IssueType, MarkdownParser
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+def _tree(text):
+    return DocumentTree(MarkdownParser().iter_issues(io.StringIO(text)))
+
+
+@pytest.fixture
+def md2jira(make_md2jira, tmp_path, monkeypatch):
+    """md2jira(jira, text, name='doc.md'): write `text` to `name` and return the MD2Jira for it"""
+    def make(jira, text, name='doc.md'):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        return make_md2jira([str(path)], jira)
+    return make
+
+
+TWO_EPICS = '# Epic A\n\n## Task A1\n\n# Epic B\n\n## Task B1\n\n### Sub-task B1a\n'
+
+
+# ---------------------------------------------------------------------------
+# DocumentTree
+# ---------------------------------------------------------------------------
+
+class TestDocumentTree:
+    def test_indices(self):
+        tree = _tree(TWO_EPICS)
+        assert [issue.summary for issue in tree.nodes] == ['Epic A', 'Task A1', 'Epic B', 'Task B1', 'Sub-task B1a']
+        assert tree.parents == [None, 0, None, 2, 3]
+        assert tree.children == [[1], (), [3], [4], ()]
+        assert tree.roots() == [0, 2]
+        assert tree.level(IssueType.Task) == [1, 3]
+        assert list(tree.descendants(2)) == [3, 4]
+        assert tree.nodes[4].header_path == 'Epic B > Task B1 > Sub-task B1a'
+
+    def test_pending_and_resolved_keys(self):
+        tree = _tree(TWO_EPICS)
+        assert not tree.resolved(0)
+        tree.nodes[0].key = 'TEST-1'
+        assert tree.resolved(0)
+
+    def test_parent_link(self, make_md2jira):
+        tree = _tree(TWO_EPICS)
+        task = tree.nodes[3]
+        md2j = make_md2jira()
+        assert md2j.parent_link(task) is None
+        tree.nodes[2].key = 'TEST-2'
+        assert md2j.parent_link(task) == 'TEST-2'
+        task.epic_id = 'TEST-9'
+        assert md2j.parent_link(task) == 'TEST-9'
+
+    def test_link_errors(self):
+        tree = _tree('# Epic\n\n### Orphan\n\n## Task\n')
+        assert DocumentTree.link_error(tree.nodes[1]) == 'no parent Task'
+        assert DocumentTree.link_error(tree.nodes[2]) == 'parent "Epic" was not synced'
+        tree.nodes[0].key = 'TEST-1'
+        assert DocumentTree.link_error(tree.nodes[2]) is None
+
+    def test_stream_links_without_holding_the_tree(self):
+        issues = list(DocumentTree.stream(MarkdownParser().iter_issues(io.StringIO(TWO_EPICS))))
+        epic_a, task_a1, epic_b, task_b1, sub_b1a = issues
+        assert [i.parent for i in issues] == [None, epic_a, None, epic_b, task_b1]
+        assert all(i.children == () for i in issues)
+
+
+# ---------------------------------------------------------------------------
+# Syncing
+# ---------------------------------------------------------------------------
+
+class TestParentLinks:
+    def test_failed_epic_does_not_mislink(self, jira, capsys, md2jira):
+        md2j = md2jira(jira, TWO_EPICS)
+        create_issue = md2j.create_issue
+        md2j.create_issue = lambda issue, data: None if issue.summary == 'Epic B' else create_issue(issue, data)
+        md2j.parse_markdown()
+
+        assert sorted(i['fields']['summary'] for i in jira.issues.values()) == ['Epic A', 'Task A1']
+        out = capsys.readouterr().out
+        assert 'unable to sync "Task B1": parent "Epic B" was not synced' in out
+        assert 'unable to sync "Sub-task B1a": parent "Task B1" was not synced' in out
+
+    def test_links_across_stream_windows(self, jira, monkeypatch, md2jira):
+        monkeypatch.setattr(src.md2jira, 'SEARCH_BATCH_SIZE', 2)
+        text = '# Epic\n\n' + ''.join('## Task {}\n\n'.format(n) for n in range(5))
+        md2jira(jira, text).parse_markdown()
+        links = [i['fields'].get('customfield_10014') for i in jira.issues.values()
+                 if i['fields']['issuetype']['name'] == 'Task']
+        assert links == ['TEST-1'] * 5
+
+    def test_any_order(self, jira, capsys, md2jira):
+        md2j = md2jira(jira, TWO_EPICS)
+        tree = _tree(TWO_EPICS)
+        # A Task before its Epic fails rather than being created unlinked
+        md2j.process_issue(tree.nodes[3])
+        assert 'parent "Epic B" was not synced' in capsys.readouterr().out
+        assert not jira.issues
+
+        for index in (2, 3, 0, 4, 1):
+            md2j.process_issue(tree.nodes[index])
+        fields = {i['fields']['summary']: i['fields'] for i in jira.issues.values()}
+        assert fields['Task A1']['customfield_10014'] == tree.nodes[0].key
+        assert fields['Task B1']['customfield_10014'] == tree.nodes[2].key
+        assert fields['Sub-task B1a']['parent'] == {'key': tree.nodes[3].key}
+
+
+class TestPlanIds:
+    def test_ids_per_file(self, jira, tmp_path, md2jira):
+        md2j = md2jira(jira, TWO_EPICS)
+        (tmp_path / 'other.md').write_text('# Epic C\n\n## Task C1\n', encoding='utf-8')
+        md2j.args.INFILE = [str(tmp_path / 'doc.md'), str(tmp_path / 'other.md')]
+        md2j.plan_markdown(str(tmp_path / 'plan.json'))
+        with open(tmp_path / 'plan.json') as fh:
+            entries = json.load(fh)['issues']
+        assert [(e['id'], e['parent']) for e in entries] == [
+            (1, None), (2, 1), (3, None), (4, 3), (5, 4), (6, None), (7, 6)]
@@ -0,0 +1,164 @@
+"""Tests for --watch.
+
+They verify that:
+  - the polling and inotify watchers notice a saved file
+  - a burst of writes is debounced into a single re-sync
+  - files added to a watched directory are picked up, also in
+    subdirectories created while watching
+  - a save re-syncs only the edited section, with one lookup and one
+    update, well within a second
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from src.fake_jira import FakeJira
+from src.watch import (InotifyWatcher, PollingWatcher, input_directories, snapshot, watch_changes,
+                       watch_directories)
+from test.test_fake_jira import DOCUMENT, _writes
+
+
+@pytest.fixture
+def jira():
+    with FakeJira() as fake:
+        yield fake
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _collect(expand, watcher):
+    """Run watch_changes() in a thread; returns (list of yielded batches, stop event, thread)"""
+    batches = []
+    stop    = threading.Event()
+    state   = snapshot(expand())
+    thread  = threading.Thread(target=lambda: batches.extend(watch_changes(expand, watcher, state, stop=stop)),
+                               daemon=True)
+    thread.start()
+    return batches, stop, thread
+
+
+# ---------------------------------------------------------------------------
+# Watchers
+# ---------------------------------------------------------------------------
+
+class TestWatchers:
+    def test_polling(self, tmp_path):
+        path = tmp_path / 'doc.md'
+        path.write_text('# One\n')
+        watcher = PollingWatcher(lambda: [str(path)], interval=0.01)
+        assert watcher.wait(0.05) is False
+        path.write_text('# One changed\n')
+        assert watcher.wait(1.0) is True
+
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is Linux only')
+    def test_inotify(self, tmp_path):
+        path = tmp_path / 'doc.md'
+        path.write_text('# One\n')
+        watcher = InotifyWatcher([str(tmp_path)])
+        try:
+            assert watcher.wait(0.05) is False
+            path.write_text('# One changed\n')
+            assert watcher.wait(1.0) is True
+            assert watcher.wait(0.05) is False
+        finally:
+            watcher.close()
+
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is Linux only')
+    def test_inotify_follows_new_directories(self, tmp_path):
+        watcher = InotifyWatcher(watch_directories([str(tmp_path)], []), input_directories([str(tmp_path)]))
+        try:
+            (tmp_path / 'new' / 'nested').mkdir(parents=True)
+            assert watcher.wait(1.0) is True
+            while watcher.wait(0.05):
+                pass
+            (tmp_path / 'new' / 'nested' / 'doc.md').write_text('# One\n')
+            assert watcher.wait(1.0) is True
+            # Both new directories are watched, the nested one found by walking
+            assert sorted(watcher.directories.values()) == [
+                str(tmp_path), str(tmp_path / 'new'), str(tmp_path / 'new' / 'nested')]
+        finally:
+            watcher.close()
+
+    def test_watch_directories(self, tmp_path):
+        (tmp_path / 'sub').mkdir()
+        dirs = watch_directories([str(tmp_path)], [str(tmp_path / 'sub' / 'a.md')])
+        assert dirs == [str(tmp_path), str(tmp_path / 'sub')]
+
+
+# ---------------------------------------------------------------------------
+# Change detection
+# ---------------------------------------------------------------------------
+
+class TestWatchChanges:
+    def test_burst_is_debounced(self, tmp_path):
+        path = tmp_path / 'doc.md'
+        path.write_text('# One\n')
+        expand = lambda: [str(path)]
+        batches, stop, thread = _collect(expand, PollingWatcher(expand, interval=0.01))
+        try:
+            for n in range(3):
+                path.write_text('# One\n' + 'x' * (n + 1))
+                time.sleep(0.02)
+            assert _wait_for(lambda: batches)
+            time.sleep(0.3)
+        finally:
+            stop.set()
+            thread.join()
+        assert batches == [[str(path)]]
+
+    def test_new_file_is_picked_up(self, tmp_path):
+        (tmp_path / 'a.md').write_text('# A\n')
+        expand = lambda: sorted(str(p) for p in tmp_path.glob('*.md'))
+        batches, stop, thread = _collect(expand, PollingWatcher(expand, interval=0.01))
+        try:
+            (tmp_path / 'b.md').write_text('# B\n')
+            assert _wait_for(lambda: batches)
+        finally:
+            stop.set()
+            thread.join()
+        assert batches == [[str(tmp_path / 'b.md')]]
+
+
+# ---------------------------------------------------------------------------
+# Daemon
+# ---------------------------------------------------------------------------
+
+class TestWatchMode:
+    def test_save_resyncs_changed_section(self, jira, tmp_path, monkeypatch, make_md2jira):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / 'doc.md'
+        path.write_text(DOCUMENT, encoding='utf-8')
+        md2j   = make_md2jira([str(path)], jira)
+        stop   = threading.Event()
+        thread = threading.Thread(target=md2j.watch_markdown, kwargs={'stop': stop}, daemon=True)
+        thread.start()
+        try:
+            assert _wait_for(lambda: md2j.watching)
+            assert len(jira.issues) == 3
+            writes   = _writes(jira)
+            searches = jira.requests['POST search/jql']
+
+            saved = time.monotonic()
+            path.write_text(DOCUMENT.replace('Sub-task description', 'Changed'), encoding='utf-8')
+            assert _wait_for(lambda: jira.requests['PUT issue/{key}'] == 1)
+            assert time.monotonic() - saved < 1.0
+            assert 'Changed' in jira.issues['TEST-3']['fields']['description']
+            assert _writes(jira) == writes + 1
+            assert jira.requests['POST search/jql'] == searches + 1
+        finally:
+            stop.set()
+            thread.join()
+        # The round was persisted: a fresh process finds everything in sync
+        before = sum(jira.requests.values())
+        make_md2jira([str(path)], jira).parse_markdown()
+        assert sum(jira.requests.values()) == before
@@ -0,0 +1,162 @@
+"""Unit tests for the Markdown -> Jira wiki converter.
+
+They verify that:
+  - inline markup (links, bold, inline code, strikethrough, images) converts
+  - headings, nested lists, tables, quotes and rules convert
+  - fenced code is passed through verbatim as a {code} block
+  - Jira markup already in the document is left alone
+  - the parser never takes lines inside code blocks for headers
+  - wiki_to_md() turns wiki markup back into Markdown that converts
+    back to the same wiki markup
+"""
+
+import io
+
+from src.md2jira import MarkdownParser
+from src.wiki import md_to_wiki, wiki_to_md, track_fence
+
+
+def _convert(text):
+    return md_to_wiki(text.split('\n'))
+
+
+# ---------------------------------------------------------------------------
+# Inline markup
+# ---------------------------------------------------------------------------
+
+class TestInline:
+    def test_link(self):
+        assert _convert('See [docs](https://x.y/a) now') == ['See [docs|https://x.y/a] now']
+
+    def test_bold_code_strike(self):
+        assert _convert('**bold**, `a*b`, ~~old~~') == ['*bold*, {{a*b}}, -old-']
+
+    def test_bold_link(self):
+        assert _convert('**see [it](u)**') == ['*see [it|u]*']
+
+    def test_image_and_autolink(self):
+        assert _convert('![alt](http://i/p.png) <https://x.y>') == ['!http://i/p.png! [https://x.y]']
+
+    def test_identifiers_are_not_emphasis(self):
+        assert _convert('call my_var_name or a * b') == ['call my_var_name or a * b']
+
+    def test_jira_markup_is_kept(self):
+        assert _convert('h3. Title\n*As a user*, I want\n* item') == ['h3. Title', '*As a user*, I want', '* item']
+
+
+# ---------------------------------------------------------------------------
+# Block markup
+# ---------------------------------------------------------------------------
+
+class TestBlocks:
+    def test_heading(self):
+        assert _convert('#### Details ##') == ['h4. Details']
+
+    def test_nested_lists(self):
+        text = '- one\n  - two\n    1. three\n  - back\n- top'
+        assert _convert(text) == ['* one', '** two', '**# three', '** back', '* top']
+
+    def test_table(self):
+        text = '| A | B |\n|---|:-:|\n| 1 | **2** |\n\nafter'
+        assert _convert(text) == ['||A||B||', '|1|*2*|', '', 'after']
+
+    def test_pipe_line_without_separator_is_kept(self):
+        assert _convert('||A||B||\n|1|2|') == ['||A||B||', '|1|2|']
+
+    def test_quote_and_rule(self):
+        assert _convert('> quoted\n---') == ['bq. quoted', '----']
+
+    def test_fenced_code(self):
+        text = '```python\n# comment\n    x = **y**\n```'
+        assert _convert(text) == ['{code:python}', '# comment', '    x = **y**', '{code}']
+
+    def test_unclosed_fence_is_closed(self):
+        assert _convert('~~~\ncode') == ['{code}', 'code', '{code}']
+
+    def test_wiki_code_block_is_verbatim(self):
+        text = '{code:sql}\nSELECT **x** FROM [t](u);\n{code}\n**after**'
+        assert _convert(text) == ['{code:sql}', 'SELECT **x** FROM [t](u);', '{code}', '*after*']
+
+    def test_track_fence(self):
+        fence = track_fence(None, '```js')
+        assert fence == '```'
+        assert track_fence(fence, '{code}') == '```'
+        assert track_fence(fence, '```') is None
+        assert track_fence(None, '{code}inline{code}') is None
+
+
+# ---------------------------------------------------------------------------
+# Parser integration
+# ---------------------------------------------------------------------------
+
+DOCUMENT = '''# Epic
+
+{code:python}
+# Only admins can delete users
+{code}
+
+## Task
+
+```
+## not a task
+* [ ] not a checklist item
+```
+'''
+
+
+class TestParserFences:
+    def test_headers_inside_code_are_description(self):
+        issues = list(MarkdownParser(checklist_enabled=True).iter_issues(io.StringIO(DOCUMENT)))
+        assert [i.summary for i in issues] == ['Epic', 'Task']
+        assert '# Only admins can delete users' in issues[0].description
+        assert '## not a task' in issues[1].description
+        assert issues[1].checklist.items == []
+
+    def test_sections_ignore_headers_inside_code(self):
+        sections = MarkdownParser().iter_sections(io.BytesIO(DOCUMENT.encode('utf-8')))
+        assert [path for _t, _s, path, _o, _b in sections] == ['Epic', 'Epic > Task']
+
+
+# ---------------------------------------------------------------------------
+# Wiki -> Markdown (export)
+# ---------------------------------------------------------------------------
+
+WIKI = '''h4. Heading
+h2. Second level stays wiki markup
+Some *bold*, -struck- and {{code *x*}} with [a link|https://x.y] and [https://z.y]
+!https://x.y/a.png!
+* one
+** nested
+# first
+||A||B||
+|1|[l|https://x.y]|
+bq. quoted
+----
+{code:python}
+# not a header
+{code}
+{noformat}
+*raw*
+{noformat}
+_em_ +underline+ well-known a - b'''
+
+
+class TestWikiToMarkdown:
+    def test_constructs(self):
+        md = wiki_to_md(WIKI.split('\n'))
+        assert md[:4] == [
+            '#### Heading',
+            'h2. Second level stays wiki markup',
+            'Some **bold**, ~~struck~~ and `code *x*` with [a link](https://x.y) and <https://z.y>',
+            '![](https://x.y/a.png)',
+        ]
+        assert md[4:9] == ['- one', '  - nested', '1. first', '| A | B |', '|---|---|']
+        assert md[11:14] == ['---', '```python', '# not a header']
+
+    def test_round_trip(self):
+        assert md_to_wiki(wiki_to_md(WIKI.split('\n'))) == WIKI.split('\n')
+
+    def test_no_issue_headers_in_output(self):
+        parser = MarkdownParser()
+        md     = wiki_to_md(['h1. Title', '# numbered', '## nested', '* [ ] not a checklist'])
+        assert [parser.detect_issue(line) for line in md] == [parser.detect_issue('text')] * 4